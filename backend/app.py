@@ -1,20 +1,30 @@
 from __future__ import annotations
 
 import os
-from typing import Any
+from typing import Any, Dict
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, verify_jwt_in_request, get_jwt
 
 from .config import AppConfig
+from .content_catalog import load_catalog, resource_cache_stats
 from .db import Database
+from .pathway_export import ExportCache
+from .services.chat_sessions import ChatSessionStore
 from .services.gemini_client import GeminiClient
+from .services.job_queue import JobQueue, QueueFull
+from .services.pathway_cache import build_pathway_cache
+from .services.pathway_pipeline import create_pathway, fill_pathway_days, pending_days
+from .services.pathway_repository import PathwayRepository
+from .services.rate_limiter import RateLimited
+from .warmup import start_background_warmup
 from .routes.auth import auth_bp
 from .routes.pathway import pathway_bp
 from .routes.chat import chat_bp
 from .routes.motivation import motivation_bp
-from .utils.firebase_auth import FirebaseVerifier
+from .utils.firebase_auth import OPTIONAL, PUBLIC, FirebaseVerifier, auth_policy, authenticate, policy_for_request
+from .utils.lazy import LazyService, init_timings
 
 
 jwt = JWTManager()
@@ -31,43 +41,120 @@ def create_app(config: AppConfig | None = None) -> Flask:
 
     jwt.init_app(app)
 
-    # Initialize services
-    db = Database(cfg)
-    gemini = GeminiClient(cfg)
-    firebase = FirebaseVerifier(cfg)
+    if cfg.content_catalog_path:
+        load_catalog(cfg.content_catalog_path)
+
+    # Services are built on first use (thread-safe), so cold starts and requests that
+    # need none of them (/health, /api/motivation) skip the SDK imports and clients
+    db: Any = LazyService("db", lambda: Database(cfg))
+    gemini: Any = LazyService("gemini", lambda: GeminiClient(cfg, pathway_cache=build_pathway_cache(cfg, db)))
+    firebase: Any = LazyService("firebase", lambda: FirebaseVerifier(cfg))
+    pathways = PathwayRepository(db, maxsize=cfg.pathway_read_cache_size, ttl=cfg.pathway_read_cache_ttl)
+    chat_sessions = ChatSessionStore(
+        db, maxsize=cfg.chat_session_max, idle_ttl=cfg.chat_session_idle_ttl, window=cfg.chat_history_turns
+    )
+
+    def run_generation_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+        if payload.get("kind") == "fill":
+            # Remaining days of a progressively delivered pathway
+            record = fill_pathway_days(db, gemini, pathways, cfg, payload["uid"], payload["pathwayId"])
+            left = len(pending_days(record or {}))
+            if left:
+                # Retried with backoff; /days still generates any range on demand meanwhile
+                raise RuntimeError(f"{left} days still pending")
+            return {"pathwayId": payload["pathwayId"]}
+        pathway_id, _ = create_pathway(
+            db, gemini, pathways, cfg, payload["uid"], payload.get("questionnaire") or {},
+            user_email=payload.get("email"), user_name=payload.get("name"),
+        )
+        return {"pathwayId": pathway_id}
+
+    if cfg.gemini_api_key and (cfg.pathway_warmup_top_n > 0 or os.path.exists(cfg.pathway_warmup_path)):
+        start_background_warmup(cfg, gemini, db)
+
+    exports = ExportCache(maxsize=cfg.export_cache_size, max_bytes=cfg.export_cache_max_bytes)
+
+    # Opens a new SQLite queue (and runs its DDL) on the first job request, not at boot
+    jobs: Any = LazyService("jobs", lambda: JobQueue(
+        cfg.pathway_jobs_path,
+        run_generation_job,
+        workers=cfg.pathway_job_workers,
+        max_queue=cfg.pathway_job_max_queue,
+        lease=cfg.pathway_job_lease,
+    ))
+    # A queue file left by an earlier run may hold queued fill jobs; resume them now
+    if os.path.exists(cfg.pathway_jobs_path):
+        jobs.start()
 
     @app.before_request
     def inject_services() -> None:  # type: ignore[override]
+        view = app.view_functions.get(request.endpoint or "")
+        # Unrouted paths (404s) need no services or identity either
+        policy = policy_for_request(view) if view is not None else PUBLIC
+        if policy == PUBLIC:
+            return
         # Attach per-request references
         setattr(request, "app_ctx_db", db)
         setattr(request, "app_ctx_gemini", gemini)
         setattr(request, "app_ctx_firebase", firebase)
-
-        # If an Authorization header contains a Firebase ID token, accept it and mint a short-lived JWT for internal usage
-        auth_header = request.headers.get("Authorization", "")
-        if auth_header.startswith("Bearer ") and not request.path.startswith("/api/auth/"):
-            token = auth_header.split(" ", 1)[1]
-            # Attempt to detect Firebase token by structure (contains '.') and 'kid' header, but here we optimistically verify
-            try:
-                if firebase.enabled:
-                    payload = firebase.verify(token)
-                    # Put derived identity into flask-jwt-extended context via custom claims
-                    request.firebase_user = {
-                        "uid": payload.get("user_id"),
-                        "email": payload.get("email"),
-                        "name": payload.get("name"),
-                    }
-            except Exception:
-                # Ignore; normal JWT may still validate in route decorators
-                pass
+        setattr(request, "app_ctx_pathways", pathways)
+        setattr(request, "app_ctx_chat_sessions", chat_sessions)
+        setattr(request, "app_ctx_jobs", jobs)
+        setattr(request, "app_ctx_exports", exports)
+        setattr(request, "app_ctx_config", cfg)
+
+        # Required-auth views verify in their decorator; optional ones get the identity
+        # here. Either way the token is checked at most once per request.
+        if policy == OPTIONAL and cfg.firebase_project_id:
+            authenticate()
+
+    @app.errorhandler(RateLimited)
+    def rate_limited(exc: RateLimited):
+        response = jsonify({"error": "Too many requests", "reason": exc.reason, "retryAfter": exc.retry_after})
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response, 429
+
+    @app.errorhandler(QueueFull)
+    def queue_full(exc: QueueFull):
+        response = jsonify({"error": "Too many pending jobs", "queueDepth": exc.depth, "retryAfter": exc.retry_after})
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response, 503
 
     @app.get("/health")
+    @auth_policy(PUBLIC)
     def health():
-        return jsonify({
+        body: Dict[str, Any] = {
             "ok": True,
-            "geminiEnabled": gemini.enabled,
-            "firebaseEnabled": firebase.enabled,
-        }), 200
+            # Configured-or-live flags; reading them must not build the services
+            "geminiEnabled": gemini.enabled if gemini.is_initialized else bool(cfg.gemini_api_key),
+            "firebaseEnabled": bool(cfg.firebase_project_id),
+            "pathwayReadCache": pathways.stats(),
+            "resourceCache": resource_cache_stats(),
+            "chatSessions": chat_sessions.stats(),
+            "exportCache": exports.stats(),
+            "services": {
+                name: {"initialized": svc.is_initialized}
+                for name, svc in (("db", db), ("gemini", gemini), ("firebase", firebase), ("jobs", jobs))
+            },
+            "initMs": {name: round(1000 * secs, 1) for name, secs in init_timings().items()},
+        }
+        if firebase.is_initialized:
+            body["firebaseTokenCache"] = firebase.cache_stats()
+        if db.is_initialized:
+            body["writeBehind"] = db.write_stats()
+        if jobs.is_initialized:
+            # stats() starts the workers, so only report a queue that is already running
+            body["pathwayJobs"] = jobs.stats()
+        if gemini.is_initialized:
+            body.update({
+                "pathwayCache": gemini.cache_stats(),
+                "geminiLimiter": gemini.limiter_stats(),
+                "geminiBreaker": gemini.breaker_stats(),
+                "responseCache": gemini.response_cache_stats(),
+                "chatContext": gemini.context_stats(),
+                "pathwayGeneration": gemini.generation_stats(),
+            })
+        return jsonify(body), 200
 
     # Blueprints
     app.register_blueprint(auth_bp)
@@ -78,7 +165,46 @@ def create_app(config: AppConfig | None = None) -> Flask:
     return app
 
 
+def serve() -> None:
+    """Production entry point: gunicorn with threaded workers.
+
+    LLM-bound handlers spend nearly all their time waiting on the network with the
+    GIL released, so each worker process runs many threads. WEB_CONCURRENCY sets the
+    number of processes and GUNICORN_THREADS the in-flight requests per process.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class _Server(BaseApplication):
+        def load_config(self) -> None:
+            options = {
+                "bind": f"0.0.0.0:{int(os.getenv('PORT', '8080'))}",
+                "workers": int(os.getenv("WEB_CONCURRENCY", "2")),
+                "worker_class": os.getenv("GUNICORN_WORKER_CLASS", "gthread"),
+                "threads": int(os.getenv("GUNICORN_THREADS", "64")),
+                "worker_connections": int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "256")),
+                "backlog": int(os.getenv("GUNICORN_BACKLOG", "2048")),
+                # Long model generations must not be killed as hung workers
+                "timeout": int(os.getenv("GUNICORN_TIMEOUT", "120")),
+                "graceful_timeout": int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30")),
+                "keepalive": 5,
+                "max_requests": int(os.getenv("GUNICORN_MAX_REQUESTS", "2000")),
+                "max_requests_jitter": 200,
+                "accesslog": "-",
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Flask:
+            # Build the app inside each worker so gRPC channels are never shared across a fork
+            return create_app()
+
+    _Server().run()
+
+
 if __name__ == "__main__":
-    application = create_app()
-    port = int(os.getenv("PORT", "8080"))
-    application.run(host="0.0.0.0", port=port)
\ No newline at end of file
+    if os.getenv("APP_ENV", "production").lower() == "development":
+        application = create_app()
+        port = int(os.getenv("PORT", "8080"))
+        application.run(host="0.0.0.0", port=port)
+    else:
+        serve()
\ No newline at end of file
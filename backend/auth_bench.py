@@ -0,0 +1,120 @@
+"""Latency of mixed public/authenticated traffic through the auth hook.
+
+    python -m backend.auth_bench [--requests 3000] [--threads 16] [--verify-ms 1.0]
+
+Token verification is replaced by a fixed-cost fake (`--verify-ms`, roughly an
+uncached RS256 check) that counts its calls, so the run needs no Firebase
+project. Reports p50/p99 per route and verifications per request: public routes
+should show 0 and authenticated routes exactly 1.
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_MIX: Tuple[Tuple[str, float], ...] = (
+    ("/health", 0.4),
+    ("/api/motivation", 0.3),
+    ("/api/pathway/jobs/bench", 0.3),  # authenticated; answers 404 without touching Firestore
+)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(total: int, threads: int, verify_ms: float) -> Dict[str, Dict[str, Any]]:
+    from .app import create_app
+    from .config import AppConfig
+    from .utils.firebase_auth import FirebaseVerifier
+
+    # Test-client requests run on the calling thread, so a thread-local count is per request
+    calls = threading.local()
+
+    def fake_verify(self: FirebaseVerifier, token: str) -> Dict[str, Any]:
+        calls.verify = getattr(calls, "verify", 0) + 1
+        time.sleep(verify_ms / 1000.0)
+        return {"user_id": "bench-user", "email": "bench@example.com", "name": "Bench"}
+
+    FirebaseVerifier.verify = fake_verify  # type: ignore[assignment]
+    workdir = tempfile.mkdtemp(prefix="auth-bench-")
+    cfg = dataclasses.replace(
+        AppConfig.from_env(),
+        firebase_project_id="bench",
+        pathway_jobs_path=os.path.join(workdir, "jobs.sqlite3"),
+        pathway_warmup_path=os.path.join(workdir, "warmup.json"),
+    )
+    app = create_app(cfg)
+    paths = [p for p, _ in _MIX]
+    weights = [w for _, w in _MIX]
+    plan = random.Random(7).choices(paths, weights=weights, k=total)
+    results: Dict[str, List[float]] = {p: [] for p in paths}
+    verifications: Dict[str, int] = {p: 0 for p in paths}
+    lock = threading.Lock()
+
+    def worker(chunk: List[str]) -> None:
+        client = app.test_client()
+        headers = {"Authorization": "Bearer bench-token"}
+        for path in chunk:
+            before = getattr(calls, "verify", 0)
+            started = time.perf_counter()
+            client.get(path, headers=headers)
+            elapsed = time.perf_counter() - started
+            used = getattr(calls, "verify", 0) - before
+            with lock:
+                results[path].append(elapsed)
+                verifications[path] += used
+
+    chunks = [plan[i::threads] for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        samples = results[path]
+        report[path] = {
+            "requests": len(samples),
+            "p50Ms": round(1000 * _percentile(samples, 50), 2),
+            "p99Ms": round(1000 * _percentile(samples, 99), 2),
+            "verifyPerRequest": round(verifications[path] / len(samples), 2) if samples else 0.0,
+        }
+    everything = [s for samples in results.values() for s in samples]
+    report["all"] = {
+        "requests": len(everything),
+        "p50Ms": round(1000 * _percentile(everything, 50), 2),
+        "p99Ms": round(1000 * _percentile(everything, 99), 2),
+        "verifyPerRequest": round(sum(verifications.values()) / len(everything), 2) if everything else 0.0,
+    }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mixed-traffic latency through the auth hook.")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--verify-ms", type=float, default=1.0, help="simulated cost of one token check")
+    args = parser.parse_args(argv)
+    report = run(args.requests, args.threads, args.verify_ms)
+    print(f"{'route':<28} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'verify/req':>10}")
+    for path, row in report.items():
+        print(
+            f"{path:<28} {row['requests']:>8} {row['p50Ms']:>8} {row['p99Ms']:>8} {row['verifyPerRequest']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -17,6 +17,52 @@ class AppConfig:
     model_name: str
     firebase_project_id: Optional[str]
     firebase_credentials_file: Optional[str]
+    firebase_token_cache_size: int = 1024
+    pathway_cache_backends: str = "memory"
+    pathway_cache_size: int = 256
+    pathway_cache_ttl: int = 24 * 60 * 60
+    pathway_cache_path: str = "/tmp/career-prep/pathway_cache.sqlite3"
+    pathway_lock_dir: str = "/tmp/career-prep/locks"
+    pathway_read_cache_size: int = 2048
+    pathway_read_cache_ttl: int = 60
+    content_catalog_path: Optional[str] = None
+    pathway_compress_threshold: int = 64 * 1024
+    write_behind_max_queue: int = 10_000
+    write_behind_batch_size: int = 500
+    write_behind_flush_ms: int = 250
+    gemini_global_rate: float = 0
+    gemini_global_burst: float = 0
+    gemini_user_rate: float = 0.5
+    gemini_user_burst: float = 5
+    gemini_max_inflight: int = 48
+    gemini_max_wait: float = 2.0
+    gemini_timeout: float = 20.0
+    gemini_max_retries: int = 2
+    gemini_latency_budget: float = 30.0
+    gemini_breaker_threshold: int = 5
+    gemini_breaker_cooldown: float = 30.0
+    response_cache_size: int = 4096
+    response_cache_ttl: int = 6 * 60 * 60
+    response_cache_threshold: float = 0.75
+    chat_context_max_chars: int = 2000
+    chat_session_max: int = 10000
+    chat_session_idle_ttl: int = 1800
+    chat_history_turns: int = 6
+    pathway_jobs_path: str = "/tmp/career-prep/jobs.sqlite3"
+    pathway_job_workers: int = 4
+    pathway_job_max_queue: int = 200
+    pathway_job_lease: int = 300
+    pathway_warmup_path: str = "/tmp/career-prep/pathway_warmup.json"
+    pathway_warmup_top_n: int = 0
+    pathway_warmup_interval: int = 6 * 60 * 60
+    export_cache_size: int = 64
+    export_cache_max_bytes: int = 2 * 1024 * 1024
+    gemini_json_schema: bool = True
+    pathway_chunk_days: int = 7
+    pathway_chunk_min_days: int = 15
+    pathway_chunk_workers: int = 4
+    pathway_progressive_days: int = 7
+    pathway_progressive_min_days: int = 15
 
     @staticmethod
     def from_env() -> "AppConfig":
@@ -27,4 +73,50 @@ class AppConfig:
             model_name=os.getenv("MODEL_NAME", "gemini-1.5-flash"),
             firebase_project_id=os.getenv("FIREBASE_PROJECT_ID"),
             firebase_credentials_file=os.getenv("GOOGLE_APPLICATION_CREDENTIALS"),
-        )
\ No newline at end of file
+            firebase_token_cache_size=int(os.getenv("FIREBASE_TOKEN_CACHE_SIZE", "1024")),
+            pathway_cache_backends=os.getenv("PATHWAY_CACHE_BACKENDS", "memory"),
+            pathway_cache_size=int(os.getenv("PATHWAY_CACHE_SIZE", "256")),
+            pathway_cache_ttl=int(os.getenv("PATHWAY_CACHE_TTL", str(24 * 60 * 60))),
+            pathway_cache_path=os.getenv("PATHWAY_CACHE_PATH", "/tmp/career-prep/pathway_cache.sqlite3"),
+            pathway_lock_dir=os.getenv("PATHWAY_LOCK_DIR", "/tmp/career-prep/locks"),
+            pathway_read_cache_size=int(os.getenv("PATHWAY_READ_CACHE_SIZE", "2048")),
+            pathway_read_cache_ttl=int(os.getenv("PATHWAY_READ_CACHE_TTL", "60")),
+            content_catalog_path=os.getenv("CONTENT_CATALOG_PATH"),
+            pathway_compress_threshold=int(os.getenv("PATHWAY_COMPRESS_THRESHOLD", str(64 * 1024))),
+            write_behind_max_queue=int(os.getenv("WRITE_BEHIND_MAX_QUEUE", "10000")),
+            write_behind_batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500")),
+            write_behind_flush_ms=int(os.getenv("WRITE_BEHIND_FLUSH_MS", "250")),
+            gemini_global_rate=float(os.getenv("GEMINI_GLOBAL_RATE", "0")),
+            gemini_global_burst=float(os.getenv("GEMINI_GLOBAL_BURST", "0")),
+            gemini_user_rate=float(os.getenv("GEMINI_USER_RATE", "0.5")),
+            gemini_user_burst=float(os.getenv("GEMINI_USER_BURST", "5")),
+            gemini_max_inflight=int(os.getenv("GEMINI_MAX_INFLIGHT", "48")),
+            gemini_max_wait=float(os.getenv("GEMINI_MAX_WAIT", "2")),
+            gemini_timeout=float(os.getenv("GEMINI_TIMEOUT", "20")),
+            gemini_max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "2")),
+            gemini_latency_budget=float(os.getenv("GEMINI_LATENCY_BUDGET", "30")),
+            gemini_breaker_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5")),
+            gemini_breaker_cooldown=float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30")),
+            response_cache_size=int(os.getenv("RESPONSE_CACHE_SIZE", "4096")),
+            response_cache_ttl=int(os.getenv("RESPONSE_CACHE_TTL", str(6 * 60 * 60))),
+            response_cache_threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.75")),
+            chat_context_max_chars=int(os.getenv("CHAT_CONTEXT_MAX_CHARS", "2000")),
+            chat_session_max=int(os.getenv("CHAT_SESSION_MAX", "10000")),
+            chat_session_idle_ttl=int(os.getenv("CHAT_SESSION_IDLE_TTL", "1800")),
+            chat_history_turns=int(os.getenv("CHAT_HISTORY_TURNS", "6")),
+            pathway_jobs_path=os.getenv("PATHWAY_JOBS_PATH", "/tmp/career-prep/jobs.sqlite3"),
+            pathway_job_workers=int(os.getenv("PATHWAY_JOB_WORKERS", "4")),
+            pathway_job_max_queue=int(os.getenv("PATHWAY_JOB_MAX_QUEUE", "200")),
+            pathway_job_lease=int(os.getenv("PATHWAY_JOB_LEASE", "300")),
+            pathway_warmup_path=os.getenv("PATHWAY_WARMUP_PATH", "/tmp/career-prep/pathway_warmup.json"),
+            pathway_warmup_top_n=int(os.getenv("PATHWAY_WARMUP_TOP_N", "0")),
+            pathway_warmup_interval=int(os.getenv("PATHWAY_WARMUP_INTERVAL", str(6 * 60 * 60))),
+            export_cache_size=int(os.getenv("EXPORT_CACHE_SIZE", "64")),
+            export_cache_max_bytes=int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(2 * 1024 * 1024))),
+            gemini_json_schema=os.getenv("GEMINI_JSON_SCHEMA", "1").lower() not in ("0", "false", "no"),
+            pathway_chunk_days=int(os.getenv("PATHWAY_CHUNK_DAYS", "7")),
+            pathway_chunk_min_days=int(os.getenv("PATHWAY_CHUNK_MIN_DAYS", "15")),
+            pathway_chunk_workers=int(os.getenv("PATHWAY_CHUNK_WORKERS", "4")),
+            pathway_progressive_days=int(os.getenv("PATHWAY_PROGRESSIVE_DAYS", "7")),
+            pathway_progressive_min_days=int(os.getenv("PATHWAY_PROGRESSIVE_MIN_DAYS", "15")),
+        )
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from urllib.parse import quote_plus
 
 
@@ -93,51 +100,188 @@ _DEFAULT: Dict[str, List[Dict[str, Any]]] = {
 }
 
 
-def get_curated_sections(questionnaire: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+_SECTION_PREFIXES = (("codingProblems", "cp"), ("youtubeReferences", "yt"), ("theoryContent", "th"))
+_HOURS_BUCKETS = ("1-2", "2-3", "3-4", ">4")
+_HOURS_SUFFIX_RE = re.compile(r"(h|hr|hrs|hour|hours)$")
+_RELOAD_CHECK_INTERVAL = 5.0  # seconds between mtime checks of the external catalog file
+
+Sections = Dict[str, List[Dict[str, Any]]]
+# Read-only form kept in the index; callers get a fresh `Sections` copy
+_FrozenSections = Mapping[str, Tuple[Mapping[str, Any], ...]]
+
+
+def hours_bucket(value: Any) -> str:
+    """Map free-form hoursPerDay ("2h", "2", "1-2 hours", ">4") onto a catalog bucket."""
+    hours = _HOURS_SUFFIX_RE.sub("", "".join(str(value if value is not None else "").lower().split()))
+    if hours in _HOURS_BUCKETS:
+        return hours
+    if hours.startswith(">"):
+        return ">4"
+    try:
+        n = float(hours.split("-")[-1])
+    except ValueError:
+        return "1-2"
+    if n <= 2:
+        return "1-2"
+    if n <= 3:
+        return "2-3"
+    if n <= 4:
+        return "3-4"
+    return ">4"
+
+
+def _compile_sections(c: Dict[str, List[Dict[str, Any]]]) -> _FrozenSections:
+    return MappingProxyType({
+        key: tuple(MappingProxyType(it) for it in _assign_ids(c.get(key, []), prefix))
+        for key, prefix in _SECTION_PREFIXES
+    })
+
+
+def _thaw(sections: _FrozenSections) -> Sections:
+    # Items are flat (id/title/url), so one dict() per item is a full copy
+    return {key: [dict(it) for it in items] for key, items in sections.items()}
+
+
+class _CatalogIndex:
+    """Catalog with every fallback resolved and IDs assigned up front.
+
+    Entries are frozen (mapping proxies and tuples) because they are shared
+    by every lookup.
+    """
+
+    def __init__(
+        self,
+        catalog: Dict[Tuple[str, str, str], Dict[str, List[Dict[str, Any]]]],
+        level_lang: Dict[Tuple[str, str], Dict[str, List[Dict[str, Any]]]],
+        level: Dict[str, Dict[str, List[Dict[str, Any]]]],
+        generic_lang: Dict[str, Dict[str, List[Dict[str, Any]]]],
+        default: Dict[str, List[Dict[str, Any]]],
+    ) -> None:
+        self.level_lang = {k: _compile_sections(v) for k, v in level_lang.items()}
+        self.level = {k: _compile_sections(v) for k, v in level.items()}
+        self.generic_lang = {k: _compile_sections(v) for k, v in generic_lang.items()}
+        self.default = _compile_sections(default)
+
+        exact = {(lvl, hours_bucket(hrs), lang): _compile_sections(v) for (lvl, hrs, lang), v in catalog.items()}
+        levels = {k[0] for k in exact} | {k[0] for k in self.level_lang} | set(self.level)
+        languages = {k[2] for k in exact} | {k[1] for k in self.level_lang} | set(self.generic_lang)
+        # Every known (level, bucket, language) resolves in a single lookup
+        self.resolved: Dict[Tuple[str, str, str], _FrozenSections] = {}
+        for lvl in levels:
+            for bucket in _HOURS_BUCKETS:
+                for lang in languages:
+                    key = (lvl, bucket, lang)
+                    self.resolved[key] = exact.get(key) or self._fallback(lvl, lang)
+
+    def _fallback(self, level: str, language: str) -> _FrozenSections:
+        if (level, language) in self.level_lang:
+            return self.level_lang[(level, language)]
+        if level in self.level:
+            return self.level[level]
+        if language in self.generic_lang:
+            return self.generic_lang[language]
+        return self.default
+
+    def lookup(self, level: str, bucket: str, language: str) -> _FrozenSections:
+        sections = self.resolved.get((level, bucket, language))
+        if sections is None:
+            sections = self._fallback(level, language)
+        return sections
+
+
+def _index_from_file(path: str) -> _CatalogIndex:
+    """Build an index from a JSON catalog file; omitted tables keep the built-in content."""
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    catalog = _CATALOG
+    if "catalog" in data:
+        catalog = {
+            (str(e["level"]).lower(), str(e["hours"]), str(e["language"]).lower()): e["sections"]
+            for e in data["catalog"]
+        }
+    level_lang = _FALLBACK_LEVEL_LANG
+    if "levelLanguage" in data:
+        level_lang = {
+            (str(e["level"]).lower(), str(e["language"]).lower()): e["sections"]
+            for e in data["levelLanguage"]
+        }
+    level = {str(k).lower(): v for k, v in data["level"].items()} if "level" in data else _FALLBACK_LEVEL
+    generic = {str(k).lower(): v for k, v in data["language"].items()} if "language" in data else _GENERIC_LANG
+    return _CatalogIndex(catalog, level_lang, level, generic, data.get("default", _DEFAULT))
+
+
+_INDEX = _CatalogIndex(_CATALOG, _FALLBACK_LEVEL_LANG, _FALLBACK_LEVEL, _GENERIC_LANG, _DEFAULT)
+_source_path: Optional[str] = None
+_source_mtime: float = 0.0
+_last_check: float = 0.0
+_reload_lock = threading.Lock()
+
+
+def load_catalog(path: Optional[str]) -> None:
+    """Swap in a catalog compiled from `path` (JSON); None restores the built-in catalog.
+
+    The file is watched afterwards, so edits are picked up without a restart.
+    """
+    global _INDEX, _source_path, _source_mtime, _last_check
+    with _reload_lock:
+        if path:
+            mtime = os.path.getmtime(path)
+            index = _index_from_file(path)
+        else:
+            mtime = 0.0
+            index = _CatalogIndex(_CATALOG, _FALLBACK_LEVEL_LANG, _FALLBACK_LEVEL, _GENERIC_LANG, _DEFAULT)
+        _INDEX, _source_path, _source_mtime, _last_check = index, path, mtime, time.monotonic()
+
+
+def _maybe_reload() -> None:
+    global _last_check
+    if not _source_path:
+        return
+    now = time.monotonic()
+    if now - _last_check < _RELOAD_CHECK_INTERVAL:
+        return
+    _last_check = now
+    try:
+        if os.path.getmtime(_source_path) != _source_mtime:
+            load_catalog(_source_path)
+    except Exception:
+        # Keep serving the last good catalog if the file is missing or mid-edit
+        pass
+
+
+def get_curated_sections(questionnaire: Dict[str, Any]) -> Sections:
+    """Curated sections for the questionnaire; a fresh copy the caller may modify."""
+    _maybe_reload()
     level = str(questionnaire.get("skillLevel", "beginner")).lower()
-    hours = str(questionnaire.get("hoursPerDay", "1-2"))
+    bucket = hours_bucket(questionnaire.get("hoursPerDay", "1-2"))
     language = str(questionnaire.get("programmingLanguage", "python")).lower()
+    return _thaw(_INDEX.lookup(level, bucket, language))
 
-    for key in [
-        (level, hours, language),
-    ]:
-        if key in _CATALOG:
-            c = _CATALOG[key]
-            return {
-                "codingProblems": _assign_ids(c.get("codingProblems", []), "cp"),
-                "youtubeReferences": _assign_ids(c.get("youtubeReferences", []), "yt"),
-                "theoryContent": _assign_ids(c.get("theoryContent", []), "th"),
-            }
-
-    if (level, language) in _FALLBACK_LEVEL_LANG:
-        c = _FALLBACK_LEVEL_LANG[(level, language)]
-        return {
-            "codingProblems": _assign_ids(c.get("codingProblems", []), "cp"),
-            "youtubeReferences": _assign_ids(c.get("youtubeReferences", []), "yt"),
-            "theoryContent": _assign_ids(c.get("theoryContent", []), "th"),
-        }
 
-    if level in _FALLBACK_LEVEL:
-        c = _FALLBACK_LEVEL[level]
-        return {
-            "codingProblems": _assign_ids(c.get("codingProblems", []), "cp"),
-            "youtubeReferences": _assign_ids(c.get("youtubeReferences", []), "yt"),
-            "theoryContent": _assign_ids(c.get("theoryContent", []), "th"),
-        }
+_TopicBlock = Tuple[Tuple[Dict[str, Any], ...], Tuple[Dict[str, Any], ...], Tuple[Dict[str, Any], ...]]
 
-    if language in _GENERIC_LANG:
-        c = _GENERIC_LANG[language]
-        return {
-            "codingProblems": _assign_ids(c.get("codingProblems", []), "cp"),
-            "youtubeReferences": _assign_ids(c.get("youtubeReferences", []), "yt"),
-            "theoryContent": _assign_ids(c.get("theoryContent", []), "th"),
-        }
 
-    return {
-        "codingProblems": _assign_ids(_DEFAULT.get("codingProblems", []), "cp"),
-        "youtubeReferences": _assign_ids(_DEFAULT.get("youtubeReferences", []), "yt"),
-        "theoryContent": _assign_ids(_DEFAULT.get("theoryContent", []), "th"),
-    }
+@lru_cache(maxsize=4096)
+def _topic_block(language: str, topic: str) -> _TopicBlock:
+    """Interned LC/GfG/YT link records for one topic; shared, treat as read-only."""
+    q = quote_plus(topic)
+    q_lang = quote_plus(f"{language} {topic} DSA")
+    practice = (
+        {"title": f"{topic} - LeetCode search", "url": f"https://leetcode.com/problemset/?search={q}"},
+        {"title": f"{topic} - GfG search", "url": f"https://www.geeksforgeeks.org/?s={q}"},
+    )
+    youtube = ({"title": f"{topic} - YouTube", "url": f"https://www.youtube.com/results?search_query={q_lang}"},)
+    theory = ({"title": f"{topic} - GfG topics", "url": f"https://www.geeksforgeeks.org/?s={q}"},)
+    return practice, youtube, theory
+
+
+def resource_cache_stats() -> Dict[str, int]:
+    info = _topic_block.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize or 0}
+
+
+def _day_topics(topics: Any) -> List[str]:
+    return [str(t) for t in topics[:3]] if isinstance(topics, list) else []
 
 
 def build_daily_resources(language: str, topics: List[str]) -> Dict[str, List[Dict[str, Any]]]:
@@ -146,28 +290,56 @@ def build_daily_resources(language: str, topics: List[str]) -> Dict[str, List[Di
     items_youtube: List[Dict[str, Any]] = []
     items_theory: List[Dict[str, Any]] = []
 
-    for t in topics[:3]:
-        q = quote_plus(t)
-        q_lang = quote_plus(f"{language} {t} DSA")
-        items_problems.append({
-            "title": f"{t} - LeetCode search",
-            "url": f"https://leetcode.com/problemset/?search={q}",
-        })
-        items_problems.append({
-            "title": f"{t} - GfG search",
-            "url": f"https://www.geeksforgeeks.org/?s={q}",
-        })
-        items_youtube.append({
-            "title": f"{t} - YouTube",
-            "url": f"https://www.youtube.com/results?search_query={q_lang}",
-        })
-        items_theory.append({
-            "title": f"{t} - GfG topics",
-            "url": f"https://www.geeksforgeeks.org/?s={q}",
-        })
+    for t in _day_topics(topics):
+        practice, youtube, theory = _topic_block(language, t)
+        items_problems.extend(practice)
+        items_youtube.extend(youtube)
+        items_theory.extend(theory)
 
     return {
         "practice": _assign_ids(items_problems, "dpr"),
         "youtube": _assign_ids(items_youtube, "dyt"),
         "theory": _assign_ids(items_theory, "dth"),
-    }
\ No newline at end of file
+    }
+
+
+def build_schedule_resources(language: str, daily: List[Dict[str, Any]]) -> List[Dict[str, List[Dict[str, Any]]]]:
+    """Resources for every day of a schedule, in order, building each distinct topic once."""
+    by_topics: Dict[Tuple[str, ...], Dict[str, List[Dict[str, Any]]]] = {}
+    out: List[Dict[str, List[Dict[str, Any]]]] = []
+    for day in daily:
+        key = tuple(_day_topics(day.get("topics")))
+        resources = by_topics.get(key)
+        if resources is None:
+            resources = build_daily_resources(language, list(key))
+            by_topics[key] = resources
+        out.append(resources)
+    return out
+
+
+def compact_schedule_resources(language: str, daily: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Deduplicated form: each distinct topic's link block is stored once in `topics`
+    and days reference it by id. `expand_schedule_resources` reverses it."""
+    topic_ids: Dict[str, str] = {}
+    topics: Dict[str, Dict[str, Any]] = {}
+    days: List[List[str]] = []
+    for day in daily:
+        refs: List[str] = []
+        for t in _day_topics(day.get("topics")):
+            tid = topic_ids.get(t)
+            if tid is None:
+                tid = f"t{len(topic_ids) + 1}"
+                topic_ids[t] = tid
+                topics[tid] = {"topic": t}
+            refs.append(tid)
+        days.append(refs)
+    return {"language": language, "topics": topics, "days": days}
+
+
+def expand_schedule_resources(compact: Dict[str, Any]) -> List[Dict[str, List[Dict[str, Any]]]]:
+    language = str(compact.get("language", "python"))
+    topics = compact.get("topics") or {}
+    return [
+        build_daily_resources(language, [topics[tid]["topic"] for tid in refs if tid in topics])
+        for refs in (compact.get("days") or [])
+    ]
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
-
-import firebase_admin
-from firebase_admin import credentials, firestore
+from typing import Any, Dict
 
 from .config import AppConfig
+from .services.write_behind import WriteBehindQueue
+from .utils.lazy import LazyModule
+
+
+# Imported on first use: the Firestore client pulls in the whole gRPC stack
+fa_firestore = LazyModule("firebase_admin.firestore")
+api_exceptions = LazyModule("google.api_core.exceptions")
 
 
 class Database:
     def __init__(self, config: AppConfig) -> None:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
         if not firebase_admin._apps:
             if config.firebase_credentials_file:
                 cred = credentials.Certificate(config.firebase_credentials_file)
@@ -20,6 +27,12 @@ class Database:
                 # Uses GOOGLE_APPLICATION_CREDENTIALS or default cred if running on GCP
                 firebase_admin.initialize_app()
         self._db = firestore.client()
+        self._writer = WriteBehindQueue(
+            self._db,
+            max_queue=config.write_behind_max_queue,
+            batch_size=config.write_behind_batch_size,
+            flush_interval=config.write_behind_flush_ms / 1000.0,
+        )
 
     # Collections
     @property
@@ -30,10 +43,48 @@ class Database:
     def pathways(self):
         return self._db.collection('pathways')
 
+    @property
+    def user_pathways(self):
+        # Every users/{uid}/pathways subcollection at once
+        return self._db.collection_group('pathways')
+
     @property
     def chats(self):
         return self._db.collection('chats')
 
+    @property
+    def pathway_cache(self):
+        return self._db.collection('pathwayCache')
+
     @property
     def motivation(self):
-        return self._db.collection('motivation')
\ No newline at end of file
+        return self._db.collection('motivation')
+
+    # Batched writes
+    def batch(self):
+        """WriteBatch for handlers that need several writes committed together (read-your-writes)."""
+        return self._db.batch()
+
+    def transaction(self):
+        """Firestore transaction for read-modify-write updates (see `fa_firestore.transactional`)."""
+        return self._db.transaction()
+
+    def get_all(self, doc_refs: Any, field_paths: Any = None):
+        """Read several documents in one round trip, optionally only `field_paths`."""
+        return self._db.get_all(doc_refs, field_paths=field_paths)
+
+    def set_later(self, doc_ref: Any, data: Dict[str, Any], merge: bool = False) -> None:
+        """Queue a fire-and-forget `set`; committed with others in a background WriteBatch."""
+        self._writer.submit(("set", doc_ref, data, merge))
+
+    def update_later(self, doc_ref: Any, data: Dict[str, Any]) -> None:
+        self._writer.submit(("update", doc_ref, data, False))
+
+    def add_later(self, collection_ref: Any, data: Dict[str, Any]) -> None:
+        self._writer.submit(("create", collection_ref, data, False))
+
+    def flush_writes(self, timeout: float = 10.0) -> bool:
+        return self._writer.flush(timeout)
+
+    def write_stats(self) -> Dict[str, Any]:
+        return self._writer.stats()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import csv
+import io
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from cachetools import LRUCache
+
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "pdf": ("application/pdf", "pdf"),
+    "md": ("text/markdown; charset=utf-8", "md"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+_SECTIONS = (
+    ("codingProblems", "Coding problems"),
+    ("youtubeReferences", "Videos"),
+    ("theoryContent", "Theory"),
+)
+
+
+def _days(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [d for d in (plan.get("schedule") or {}).get("daily", []) if isinstance(d, dict)]
+
+
+def _resource_items(day: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for kind, items in (day.get("resources") or {}).items():
+        for item in items or []:
+            if isinstance(item, dict):
+                yield kind, item
+
+
+def render_markdown(plan: Dict[str, Any], completed: Set[str]) -> Iterator[str]:
+    days = _days(plan)
+    yield f"# {plan.get('title') or 'DSA Pathway'}\n\n{len(days)} days\n"
+    for day in days:
+        yield f"\n## Day {day.get('day')}: {day.get('focus') or ''}\n\n"
+        if day.get("time"):
+            yield f"Time: {day['time']}\n\n"
+        topics = ", ".join(str(t) for t in day.get("topics") or [])
+        if topics:
+            yield f"Topics: {topics}\n\n"
+        if day.get("details"):
+            yield f"{day['details']}\n\n"
+        for kind, item in _resource_items(day):
+            yield f"- [{item.get('title') or item.get('url')}]({item.get('url') or ''}) ({kind})\n"
+    sections = plan.get("sections") or {}
+    for key, label in _SECTIONS:
+        items = [it for it in sections.get(key) or [] if isinstance(it, dict)]
+        if not items:
+            continue
+        yield f"\n## {label}\n\n"
+        for it in items:
+            mark = "x" if it.get("id") in completed else " "
+            title = it.get("title") or it.get("id")
+            yield f"- [{mark}] [{title}]({it['url']})\n" if it.get("url") else f"- [{mark}] {title}\n"
+
+
+def render_csv(plan: Dict[str, Any], completed: Set[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(*values: Any) -> str:
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield row("section", "day", "title", "details", "url", "completed")
+    for day in _days(plan):
+        topics = "; ".join(str(t) for t in day.get("topics") or [])
+        yield row("day", day.get("day"), day.get("focus") or "", topics, "", "")
+        for kind, item in _resource_items(day):
+            yield row(kind, day.get("day"), item.get("title") or "", "", item.get("url") or "", "")
+    sections = plan.get("sections") or {}
+    for key, _ in _SECTIONS:
+        for it in sections.get(key) or []:
+            if isinstance(it, dict):
+                done = "yes" if it.get("id") in completed else "no"
+                yield row(key, "", it.get("title") or it.get("id") or "", "", it.get("url") or "", done)
+
+
+class _PdfWriter:
+    """Minimal text-only PDF (Helvetica, US Letter) written one page at a time.
+
+    Objects are emitted as soon as a page is full; only the page tree, which
+    must list every page, and the xref table wait until the end.
+    """
+
+    _LINES_PER_PAGE = 60
+    _WRAP = 95
+
+    def __init__(self) -> None:
+        self._offset = 0
+        self._xref: Dict[int, int] = {}
+        self._next_id = 4  # 1 catalog, 2 page tree, 3 font
+        self._pages: List[int] = []
+
+    def _emit(self, obj_id: int, body: bytes) -> bytes:
+        self._xref[obj_id] = self._offset
+        data = f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n"
+        self._offset += len(data)
+        return data
+
+    def header(self) -> bytes:
+        data = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        self._offset += len(data)
+        data += self._emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        data += self._emit(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        return data
+
+    @staticmethod
+    def _escape(line: str) -> bytes:
+        raw = line.encode("cp1252", errors="replace")
+        return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def page(self, lines: List[str]) -> bytes:
+        ops = [b"BT /F1 10 Tf 12 TL 50 750 Td"]
+        ops.extend(b"(" + self._escape(line) + b") '" for line in lines)
+        ops.append(b"ET")
+        stream = b"\n".join(ops)
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._pages.append(page_id)
+        data = self._emit(content_id, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        data += self._emit(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R"
+            f" /Resources << /Font << /F1 3 0 R >> >> >>".encode(),
+        )
+        return data
+
+    def trailer(self) -> bytes:
+        kids = " ".join(f"{p} 0 R" for p in self._pages)
+        data = self._emit(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode())
+        xref_at = self._offset
+        size = self._next_id
+        entries = ["0000000000 65535 f "]
+        for obj_id in range(1, size):
+            entries.append(f"{self._xref.get(obj_id, 0):010d} 00000 n ")
+        data += (
+            f"xref\n0 {size}\n" + "\n".join(entries) + "\n"
+            f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n"
+        ).encode()
+        return data
+
+    def render(self, text: Iterable[str]) -> Iterator[bytes]:
+        yield self.header()
+        lines: List[str] = []
+        for chunk in text:
+            for raw in chunk.splitlines():
+                raw = raw.rstrip()
+                while len(raw) > self._WRAP:
+                    lines.append(raw[: self._WRAP])
+                    raw = "    " + raw[self._WRAP:]
+                lines.append(raw)
+                if len(lines) >= self._LINES_PER_PAGE:
+                    yield self.page(lines[: self._LINES_PER_PAGE])
+                    lines = lines[self._LINES_PER_PAGE:]
+        if lines or not self._pages:
+            yield self.page(lines)
+        yield self.trailer()
+
+
+def render_export(plan: Dict[str, Any], completed: Set[str], fmt: str) -> Iterator[bytes]:
+    """Stream the plan day by day as `fmt` ("pdf", "md" or "csv")."""
+    if fmt == "pdf":
+        # The PDF reuses the Markdown text as its body
+        return _PdfWriter().render(render_markdown(plan, completed))
+    text = render_csv(plan, completed) if fmt == "csv" else render_markdown(plan, completed)
+    return (chunk.encode("utf-8") for chunk in text)
+
+
+class ExportCache:
+    """Rendered exports keyed by (uid, pathway id, version, format).
+
+    The version changes with progress, so a hit is always current. Artifacts
+    larger than `max_bytes` are streamed every time rather than cached.
+    """
+
+    def __init__(self, maxsize: int = 64, max_bytes: int = 2 * 1024 * 1024) -> None:
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, ...]) -> Optional[bytes]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def stream_and_store(self, key: Tuple[str, ...], chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass `chunks` through, keeping a copy that is cached once the stream completes."""
+        kept: List[bytes] = []
+        size = 0
+        for chunk in chunks:
+            if size <= self._max_bytes:
+                kept.append(chunk)
+                size += len(chunk)
+            yield chunk
+        if size <= self._max_bytes:
+            with self._lock:
+                self._cache[key] = b"".join(kept)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
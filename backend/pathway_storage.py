@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, Dict, List
+
+from .content_catalog import compact_schedule_resources, expand_schedule_resources
+
+
+# Stored plan layout version. Plans without a "format" key are the original
+# layout with every day's resources expanded inline; both are readable.
+STORAGE_FORMAT = 2
+
+
+def encode_plan(plan: Dict[str, Any], language: str, compress_threshold: int = 0) -> Dict[str, Any]:
+    """Compact a plan for Firestore.
+
+    Per-day `resources` are replaced by topic references (rebuilt on read from the
+    memoized catalog). If the JSON body is larger than `compress_threshold` bytes
+    (0 disables), it is stored zlib-compressed. `title` and `dayCount` always stay
+    readable for listings.
+    """
+    daily: List[Dict[str, Any]] = list((plan.get("schedule") or {}).get("daily", []))
+    body = {
+        "title": plan.get("title"),
+        "schedule": {"daily": [{k: v for k, v in day.items() if k != "resources"} for day in daily]},
+        "sections": plan.get("sections") or {},
+        "resources": compact_schedule_resources(language, daily),
+    }
+    stored: Dict[str, Any] = {"format": STORAGE_FORMAT, "title": plan.get("title"), "dayCount": len(daily)}
+    raw = json.dumps(body, separators=(",", ":")).encode("utf-8")
+    if compress_threshold and len(raw) > compress_threshold:
+        stored["encoding"] = "zlib"
+        stored["blob"] = zlib.compress(raw, 6)
+    else:
+        stored.update(body)
+    return stored
+
+
+def decode_plan(stored: Dict[str, Any] | None) -> Dict[str, Any]:
+    """Inverse of `encode_plan`; legacy (format-less) plans are returned unchanged."""
+    if not stored:
+        return {}
+    if "format" not in stored:
+        return stored
+    body: Dict[str, Any] = stored
+    if stored.get("encoding") == "zlib":
+        body = json.loads(zlib.decompress(bytes(stored["blob"])).decode("utf-8"))
+    daily = list((body.get("schedule") or {}).get("daily", []))
+    resources = expand_schedule_resources(body.get("resources") or {})
+    return {
+        "title": body.get("title"),
+        "schedule": {
+            "daily": [
+                {**day, "resources": resources[idx] if idx < len(resources) else {}}
+                for idx, day in enumerate(daily)
+            ]
+        },
+        "sections": body.get("sections") or {},
+    }
+
+
+def pathway_version(pathway_id: str, record: Dict[str, Any]) -> str:
+    """Cache token for a stored pathway: progress only grows, and plans only grow
+    while a progressively delivered pathway is being filled in."""
+    completed = list((record.get("progress") or {}).get("completedItemIds", []))
+    version = f"{pathway_id}:{len(completed)}:{completed[-1] if completed else ''}"
+    if record.get("fill"):
+        version += f":{plan_summary(record.get('plan'))['dayCount']}"
+    return version
+
+
+def plan_summary(stored: Dict[str, Any] | None) -> Dict[str, Any]:
+    """Title and day count without decompressing or expanding the plan."""
+    stored = stored or {}
+    if "format" in stored:
+        return {"title": stored.get("title"), "dayCount": int(stored.get("dayCount") or 0)}
+    return {
+        "title": stored.get("title"),
+        "dayCount": len((stored.get("schedule") or {}).get("daily", [])),
+    }
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from flask import Blueprint, jsonify
 
+from ..utils.firebase_auth import PUBLIC, set_blueprint_policy
+
 auth_bp = Blueprint("auth_bp", __name__, url_prefix="/api/auth")
+set_blueprint_policy(auth_bp, PUBLIC)
 
 
 @auth_bp.get("/info")
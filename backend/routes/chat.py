@@ -1,20 +1,89 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-from flask import Blueprint, jsonify, request
-from firebase_admin import firestore as fa_firestore
+import json
+from typing import Any, Dict, Iterator, List, Optional
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
-from ..db import Database
+from ..db import Database, fa_firestore
+from ..services.chat_sessions import ChatSessionStore
 from ..services.gemini_client import GeminiClient
-from ..utils.firebase_auth import firebase_required
+from ..services.pathway_repository import PathwayRepository
+from ..services.prompt_context import chat_context
+from ..services.rate_limiter import RateLimited
+from ..utils.firebase_auth import FIREBASE, current_user, firebase_required, set_blueprint_policy
 
 
 chat_bp = Blueprint("chat_bp", __name__, url_prefix="/api/chat")
+set_blueprint_policy(chat_bp, FIREBASE)
 
 
 def _get_uid() -> str | None:
-  fb_user = getattr(request, "firebase_user", None) or {}
-  return fb_user.get("uid")
+  return current_user().get("uid")
+
+
+def _use_cache(payload: Dict[str, Any]) -> bool:
+    # Per-request bypass: {"noCache": true} or Cache-Control: no-cache
+    if payload.get("noCache"):
+        return False
+    return "no-cache" not in request.headers.get("Cache-Control", "").lower()
+
+
+def _load_context(user_uid: str) -> Optional[Dict[str, Any]]:
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
+    return chat_context(pathways.latest(user_uid))
+
+
+def _session_id(payload: Dict[str, Any], user_uid: str) -> str:
+    sessions: ChatSessionStore = request.app_ctx_chat_sessions  # type: ignore[attr-defined]
+    session_id = str(payload.get("sessionId") or "").strip()
+    return session_id or sessions.start(user_uid)
+
+
+def _save_chat(db: Database, user_uid: str, session_id: str, question: str, answer: str) -> None:
+    # Write-behind: chat logs are only read back to rebuild a cold session
+    db.add_later(db.chats, {
+        "userId": user_uid,
+        "sessionId": session_id,
+        "message": question,
+        "answer": answer,
+        "createdAt": fa_firestore.SERVER_TIMESTAMP,
+    })
+
+
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _stream_answer(
+    db: Database, gemini: GeminiClient, user_uid: str, session_id: str, question: str, use_cache: bool = True
+) -> Response:
+    sessions: ChatSessionStore = request.app_ctx_chat_sessions  # type: ignore[attr-defined]
+    context = _load_context(user_uid)
+    messages = sessions.messages(user_uid, session_id, question)
+
+    def events() -> Iterator[str]:
+        chunks: List[str] = []
+        try:
+            for chunk in gemini.chat_stream(messages, context=context, user_id=user_uid, use_cache=use_cache):
+                chunks.append(chunk)
+                yield _sse({"delta": chunk})
+        except RateLimited as exc:
+            yield _sse({"error": "Too many requests", "retryAfter": exc.retry_after}, event="error")
+            return
+        except Exception:
+            yield _sse({"error": "Generation failed"}, event="error")
+            return
+        answer = "".join(chunks)
+        yield _sse({"answer": answer, "sessionId": session_id}, event="done")
+        sessions.record(user_uid, session_id, question, answer)
+        _save_chat(db, user_uid, session_id, question, answer)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @chat_bp.post("")
@@ -29,22 +98,35 @@ def chat():
 
     payload: Dict[str, Any] = request.get_json(silent=True) or {}
     question: str = payload.get("message", "")
+    session_id = _session_id(payload, user_uid)
 
-    user_doc_ref = db.users.document(user_uid)
-    query = user_doc_ref.collection("pathways").order_by(
-        "createdAt", direction=fa_firestore.Query.DESCENDING
-    ).limit(1)
-    docs = list(query.stream())
-    context = {"plan": (docs[0].to_dict() or {}).get("plan")} if docs else None
+    if request.args.get("stream") in ("1", "true"):
+        return _stream_answer(db, gemini, user_uid, session_id, question, use_cache=_use_cache(payload))
 
-    messages: List[Dict[str, str]] = [{"role": "user", "content": question}]
-    answer = gemini.chat(messages, context=context)
+    sessions: ChatSessionStore = request.app_ctx_chat_sessions  # type: ignore[attr-defined]
+    context = _load_context(user_uid)
+
+    messages = sessions.messages(user_uid, session_id, question)
+    answer = gemini.chat(messages, context=context, user_id=user_uid, use_cache=_use_cache(payload))
+
+    sessions.record(user_uid, session_id, question, answer)
+    _save_chat(db, user_uid, session_id, question, answer)
+
+    return jsonify({"answer": answer, "sessionId": session_id}), 200
 
-    db.chats.add({
-        "userId": user_uid,
-        "message": question,
-        "answer": answer,
-        "createdAt": fa_firestore.SERVER_TIMESTAMP,
-    })
 
-    return jsonify({"answer": answer}), 200
\ No newline at end of file
+@chat_bp.post("/stream")
+@firebase_required
+def chat_stream():
+    db: Database = request.app_ctx_db  # type: ignore[attr-defined]
+    gemini: GeminiClient = request.app_ctx_gemini  # type: ignore[attr-defined]
+
+    user_uid = _get_uid()
+    if not user_uid:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    return _stream_answer(
+        db, gemini, user_uid, _session_id(payload, user_uid), payload.get("message", ""),
+        use_cache=_use_cache(payload),
+    )
@@ -4,7 +4,10 @@ from typing import List
 from flask import Blueprint, jsonify
 from cachetools import TTLCache
 
+from ..utils.firebase_auth import PUBLIC, set_blueprint_policy
+
 motivation_bp = Blueprint("motivation_bp", __name__, url_prefix="/api/motivation")
+set_blueprint_policy(motivation_bp, PUBLIC)
 
 _cache = TTLCache(maxsize=1, ttl=60 * 30)  # 30 minutes
 
@@ -1,32 +1,59 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import Any, Dict, List, Optional, Set
 
-from flask import Blueprint, jsonify, request
-from firebase_admin import firestore as fa_firestore
-
-from ..db import Database
-from ..services.gemini_client import GeminiClient
-from ..utils.firebase_auth import firebase_required, get_firebase_email
-from ..content_catalog import get_curated_sections, build_daily_resources
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from ..config import AppConfig
+from ..db import Database, api_exceptions, fa_firestore
+from ..services.gemini_client import GeminiClient, pathway_key
+from ..services.job_queue import JobQueue, QueueFull, TERMINAL_STATES
+from ..services.pathway_pipeline import (
+    create_pathway,
+    create_pathway_progressive,
+    fill_pathway_days,
+    pending_days,
+)
+from ..services.pathway_repository import PathwayRepository
+from ..services.prompt_context import chat_context
+from ..utils.firebase_auth import FIREBASE, current_user, firebase_required, get_firebase_email, set_blueprint_policy
+from ..pathway_export import EXPORT_FORMATS, ExportCache, render_export
+from ..pathway_storage import pathway_version, plan_summary
 
 
 pathway_bp = Blueprint("pathway_bp", __name__, url_prefix="/api/pathway")
+set_blueprint_policy(pathway_bp, FIREBASE)
+
+_MAX_BATCH_ITEMS = 500
+_LIST_DEFAULT_LIMIT = 20
+_LIST_MAX_LIMIT = 100
+_JOB_MAX_WAIT = 25
+_DAYS_MAX_RANGE = 31
 
 
 def _get_uid() -> Optional[str]:
-    fb_user = getattr(request, "firebase_user", None) or {}
-    return fb_user.get("uid")
+    return current_user().get("uid")
+
+
+def _use_cache(payload: Dict[str, Any]) -> bool:
+    # Per-request bypass: {"noCache": true} or Cache-Control: no-cache
+    if payload.get("noCache"):
+        return False
+    return "no-cache" not in request.headers.get("Cache-Control", "").lower()
 
 
 def _merge_completion(plan: Dict[str, Any], completed_ids: Set[str]) -> Dict[str, Any]:
     plan = dict(plan)
-    sections = plan.get("sections") or {}
+    sections = dict(plan.get("sections") or {})
     for key in ("codingProblems", "youtubeReferences", "theoryContent"):
-        items = list((sections.get(key) or []))
-        for it in items:
+        items = []
+        for it in (sections.get(key) or []):
+            # Copy before flagging: the plan may be shared with the read cache
             if isinstance(it, dict) and it.get("id") in completed_ids:
-                it["completed"] = True
+                it = {**it, "completed": True}
+            items.append(it)
         sections[key] = items
     plan["sections"] = sections
     return plan
@@ -37,6 +64,8 @@ def _merge_completion(plan: Dict[str, Any], completed_ids: Set[str]) -> Dict[str
 def generate_pathway():
     db: Database = request.app_ctx_db  # type: ignore[attr-defined]
     gemini: GeminiClient = request.app_ctx_gemini  # type: ignore[attr-defined]
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
+    cfg: AppConfig = request.app_ctx_config  # type: ignore[attr-defined]
 
     questionnaire: Dict[str, Any] = request.get_json(silent=True) or {}
     user_uid = _get_uid()
@@ -44,75 +73,119 @@ def generate_pathway():
     if not user_uid:
         return jsonify({"error": "Unauthorized"}), 401
 
-    # Ensure user document exists (doc id = uid)
-    user_doc_ref = db.users.document(user_uid)
-    user_doc_ref.set(
-        {
-            "email": user_email,
-            "name": getattr(request, "firebase_user", {}).get("name", "User"),
-            "profileComplete": True,
-            "updatedAt": fa_firestore.SERVER_TIMESTAMP,
-            "createdAt": fa_firestore.SERVER_TIMESTAMP,
-        },
-        merge=True,
+    user_name = current_user().get("name") or "User"
+    if _wants_async():
+        jobs: JobQueue = request.app_ctx_jobs  # type: ignore[attr-defined]
+        job, _ = jobs.submit(
+            user_uid,
+            _generate_key(questionnaire),
+            {"uid": user_uid, "questionnaire": questionnaire, "email": user_email, "name": user_name},
+        )
+        response = jsonify({"job": _job_view(job)})
+        response.headers["Location"] = f"/api/pathway/jobs/{job['id']}"
+        return response, 202
+
+    if _wants_progressive():
+        pathway_id, plan, pending = create_pathway_progressive(
+            db, gemini, pathways, cfg, user_uid, questionnaire, user_email=user_email, user_name=user_name
+        )
+        body: Dict[str, Any] = {
+            "pathway": {**plan, "dayCount": len(plan["schedule"]["daily"]) + len(pending)},
+            "pathwayId": pathway_id,
+            "pendingDays": len(pending),
+        }
+        if pending:
+            jobs = request.app_ctx_jobs  # type: ignore[attr-defined]
+            try:
+                job, _ = jobs.submit(
+                    user_uid, _fill_key(pathway_id), {"kind": "fill", "uid": user_uid, "pathwayId": pathway_id}
+                )
+                body["job"] = _job_view(job)
+            except QueueFull:
+                # The days are still generated on demand through /days
+                pass
+        return jsonify(body), 201
+
+    _, plan = create_pathway(
+        db, gemini, pathways, cfg, user_uid, questionnaire, user_email=user_email, user_name=user_name
     )
+    return jsonify({"pathway": plan}), 201
+
+
+def _wants_progressive() -> bool:
+    return request.args.get("progressive") in ("1", "true")
+
+
+def _wants_async() -> bool:
+    return request.args.get("async") in ("1", "true") or "respond-async" in request.headers.get("Prefer", "")
 
-    # Generate schedule/title via LLM
-    plan_llm = gemini.generate_pathway(questionnaire)
-
-    # Enrich each day with day-specific resources
-    language = str(questionnaire.get("programmingLanguage", "python"))
-    daily = list((plan_llm.get("schedule") or {}).get("daily", []))
-    enriched_daily: List[Dict[str, Any]] = []
-    for day in daily:
-        topics = day.get("topics") or []
-        links = build_daily_resources(language, topics if isinstance(topics, list) else [])
-        new_day = dict(day)
-        new_day["resources"] = links
-        enriched_daily.append(new_day)
-
-    # Replace sections with curated content based on combination
-    curated = get_curated_sections(questionnaire)
-    plan = {
-        "title": plan_llm.get("title") or "DSA Pathway",
-        "schedule": {"daily": enriched_daily},
-        "sections": curated,
-    }
 
-    record = {
-        "questionnaire": questionnaire,
-        "plan": plan,
-        "progress": {"completedItemIds": []},
-        "createdAt": fa_firestore.SERVER_TIMESTAMP,
-        "updatedAt": fa_firestore.SERVER_TIMESTAMP,
+def _generate_key(questionnaire: Dict[str, Any]) -> str:
+    # Same normalization as the pathway cache, so "2h" and "2" share one job
+    return "gen:" + "|".join(pathway_key(questionnaire))
+
+
+def _fill_key(pathway_id: str) -> str:
+    return f"fill:{pathway_id}"
+
+
+def _job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    result = job.get("result") or {}
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "pathwayId": result.get("pathwayId"),
+        "error": job["error"] if job["status"] == "failed" else None,
     }
-    # Write into per-user subcollection
-    user_doc_ref.collection("pathways").add(record)
-    # Store snapshot
-    user_doc_ref.set({"currentPathway": plan, "updatedAt": fa_firestore.SERVER_TIMESTAMP}, merge=True)
-    return jsonify({"pathway": plan}), 201
+
+
+@pathway_bp.get("/jobs/<job_id>")
+@firebase_required
+def pathway_job(job_id: str):
+    jobs: JobQueue = request.app_ctx_jobs  # type: ignore[attr-defined]
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
+    user_uid = _get_uid()
+    if not user_uid:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        wait = min(max(float(request.args.get("wait", 0)), 0.0), _JOB_MAX_WAIT)
+    except ValueError:
+        return jsonify({"error": "Invalid wait"}), 400
+    job = jobs.wait(job_id, wait) if wait else jobs.get(job_id)
+    if job is None or job["uid"] != user_uid:
+        return jsonify({"error": "Not found"}), 404
+
+    body: Dict[str, Any] = {"job": _job_view(job)}
+    if job["status"] == "done":
+        latest = pathways.latest(user_uid)
+        if latest and latest["id"] == body["job"]["pathwayId"]:
+            body["pathway"] = latest["data"].get("plan")
+    elif job["status"] not in TERMINAL_STATES:
+        response = jsonify(body)
+        response.headers["Retry-After"] = "2"
+        return response, 200
+    return jsonify(body), 200
 
 
 @pathway_bp.post("/new")
 @firebase_required
 def new_pathway_session():
     db: Database = request.app_ctx_db  # type: ignore[attr-defined]
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
     user_uid = _get_uid()
     if not user_uid:
         return jsonify({"error": "Unauthorized"}), 401
 
     try:
         user_ref = db.users.document(user_uid)
-        # Ensure the user doc exists
-        user_ref.set({"updatedAt": fa_firestore.SERVER_TIMESTAMP}, merge=True)
-        # Remove snapshot field if present (ignore if missing)
-        try:
-            user_ref.update({
-                "currentPathway": fa_firestore.DELETE_FIELD,
-                "updatedAt": fa_firestore.SERVER_TIMESTAMP,
-            })
-        except Exception:
-            pass
+        # Ensure the user doc exists and remove the snapshot field if present, in one write
+        user_ref.set({
+            "currentPathway": fa_firestore.DELETE_FIELD,
+            "updatedAt": fa_firestore.SERVER_TIMESTAMP,
+        }, merge=True)
+        pathways.invalidate(user_uid)
         return jsonify({"ok": True}), 200
     except Exception:
         # Do not block the wizard if reset fails
@@ -122,131 +195,299 @@ def new_pathway_session():
 @pathway_bp.get("/current")
 @firebase_required
 def get_current_pathway():
-    db: Database = request.app_ctx_db  # type: ignore[attr-defined]
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
     user_uid = _get_uid()
     if not user_uid:
         return jsonify({"pathway": None}), 200
 
-    user_doc_ref = db.users.document(user_uid)
     # Read most recent from subcollection to get progress
-    query = user_doc_ref.collection("pathways").order_by(
-        "createdAt", direction=fa_firestore.Query.DESCENDING
-    ).limit(1)
-    docs = list(query.stream())
-    snapshot_plan: Dict[str, Any] | None = None
-    if docs:
-        doc_data = docs[0].to_dict() or {}
+    latest = pathways.latest(user_uid)
+    if latest is not None:
+        doc_data = latest["data"]
         progress = (doc_data.get("progress") or {})
         completed_ids = set(progress.get("completedItemIds", []))
-        plan = doc_data.get("plan") or {}
-        merged = _merge_completion(plan, completed_ids)
-        snapshot_plan = merged
-
-    if snapshot_plan is not None:
-        return jsonify({"pathway": snapshot_plan}), 200
+        plan = _merge_completion(doc_data.get("plan") or {}, completed_ids)
+        if doc_data.get("fill"):
+            # Progressive pathway: the schedule may still be missing days (see /days)
+            plan["dayCount"] = doc_data.get("dayCount")
+        return jsonify({"pathway": plan}), 200
 
     # Fallback to snapshot field
-    snap = user_doc_ref.get()
-    if snap.exists:
-        data = snap.to_dict() or {}
-        if data.get("currentPathway"):
-            return jsonify({"pathway": data.get("currentPathway")}), 200
+    snapshot_plan = pathways.snapshot(user_uid)
+    if snapshot_plan:
+        return jsonify({"pathway": snapshot_plan}), 200
 
     return jsonify({"pathway": None}), 200
 
 
-@pathway_bp.patch("/progress")
-@firebase_required
-def update_progress():
-    db: Database = request.app_ctx_db  # type: ignore[attr-defined]
+def _mark_completed(item_ids: List[str]):
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
     user_uid = _get_uid()
     if not user_uid:
         return jsonify({"error": "Unauthorized"}), 401
 
+    pathway_id = pathways.active_id(user_uid)
+    if not pathway_id:
+        return jsonify({"error": "No pathway"}), 404
+
+    # ArrayUnion is applied server-side: no read-modify-write, concurrent clicks cannot drop updates
+    ref = pathways.doc_ref(user_uid, pathway_id)
+    try:
+        ref.update(
+            {
+                "progress.completedItemIds": fa_firestore.ArrayUnion(item_ids),
+                "updatedAt": fa_firestore.SERVER_TIMESTAMP,
+            }
+        )
+    except api_exceptions.NotFound:
+        # Stale activePathwayId: the pathway doc is gone
+        pathways.invalidate(user_uid)
+        return jsonify({"error": "No pathway"}), 404
+    completed = pathways.record_progress(user_uid, pathway_id, item_ids)
+    if completed is None:
+        # Not in this worker's cache: read back the merged list, and only that field
+        snap = ref.get(field_paths=["progress.completedItemIds"])
+        completed = list(((snap.to_dict() or {}).get("progress") or {}).get("completedItemIds", []))
+    return jsonify({"ok": True, "completedItemIds": completed}), 200
+
+
+@pathway_bp.patch("/progress")
+@firebase_required
+def update_progress():
     payload: Dict[str, Any] = request.get_json(silent=True) or {}
     item_id = payload.get("itemId")
     if not item_id or not isinstance(item_id, str):
         return jsonify({"error": "Missing itemId"}), 400
+    return _mark_completed([item_id])
 
-    user_doc_ref = db.users.document(user_uid)
-    query = user_doc_ref.collection("pathways").order_by(
-        "createdAt", direction=fa_firestore.Query.DESCENDING
-    ).limit(1)
-    docs = list(query.stream())
-    if not docs:
-        return jsonify({"error": "No pathway"}), 404
-
-    doc = docs[0]
-    data = doc.to_dict() or {}
-    progress = (data.get("progress") or {})
-    completed: List[str] = list(progress.get("completedItemIds", []))
-    if item_id not in completed:
-        completed.append(item_id)
 
-    doc.reference.update(
-        {
-            "progress.completedItemIds": completed,
-            "updatedAt": fa_firestore.SERVER_TIMESTAMP,
-        }
-    )
-    return jsonify({"ok": True, "completedItemIds": completed}), 200
+@pathway_bp.patch("/progress/batch")
+@firebase_required
+def update_progress_batch():
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    item_ids = payload.get("itemIds")
+    if (
+        not isinstance(item_ids, list)
+        or not item_ids
+        or not all(isinstance(i, str) and i for i in item_ids)
+    ):
+        return jsonify({"error": "Missing itemIds"}), 400
+    if len(item_ids) > _MAX_BATCH_ITEMS:
+        return jsonify({"error": f"At most {_MAX_BATCH_ITEMS} itemIds per request"}), 400
+    return _mark_completed(list(dict.fromkeys(item_ids)))
 
 
 @pathway_bp.post("/adjust")
 @firebase_required
 def adjust_pathway():
-    db: Database = request.app_ctx_db  # type: ignore[attr-defined]
     gemini: GeminiClient = request.app_ctx_gemini  # type: ignore[attr-defined]
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
     user_uid = _get_uid()
     if not user_uid:
         return jsonify({"error": "Unauthorized"}), 401
 
     payload: Dict[str, Any] = request.get_json(silent=True) or {}
 
-    user_doc_ref = db.users.document(user_uid)
-    query = user_doc_ref.collection("pathways").order_by(
-        "createdAt", direction=fa_firestore.Query.DESCENDING
-    ).limit(1)
-    docs = list(query.stream())
-    if not docs:
+    latest = pathways.latest(user_uid)
+    if latest is None:
         return jsonify({"error": "No pathway"}), 404
 
-    data = docs[0].to_dict() or {}
-    context = {"plan": data.get("plan"), "progress": data.get("progress")}
+    context = chat_context(latest)
     message = {
         "role": "user",
         "content": payload.get("note", "Please adjust my plan based on my progress."),
     }
-    suggestion = gemini.chat([message], context=context)
+    suggestion = gemini.chat([message], context=context, user_id=user_uid, use_cache=_use_cache(payload))
     return jsonify({"adjustment": suggestion}), 200
 
 
+def _iso(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        if hasattr(value, "to_datetime"):
+            return value.to_datetime().isoformat()
+        return value.isoformat()
+    except Exception:
+        return None
+
+
+def _count(query: Any) -> int:
+    results = query.count().get()
+    return int(results[0][0].value) if results and results[0] else 0
+
+
 @pathway_bp.get("/list")
 @firebase_required
 def list_pathways():
     db: Database = request.app_ctx_db  # type: ignore[attr-defined]
     user_uid = _get_uid()
     if not user_uid:
-        return jsonify({"items": [], "total": 0}), 200
-    user_doc_ref = db.users.document(user_uid)
-    query = user_doc_ref.collection("pathways").order_by(
+        return jsonify({"items": [], "count": 0, "total": 0, "nextCursor": None}), 200
+
+    try:
+        limit = min(max(int(request.args.get("limit", _LIST_DEFAULT_LIMIT)), 1), _LIST_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    start_after = request.args.get("startAfter")
+
+    pathways_ref = db.users.document(user_uid).collection("pathways")
+    # Only the summary fields: the plan blob is never transferred
+    query = pathways_ref.order_by(
         "createdAt", direction=fa_firestore.Query.DESCENDING
-    )
+    ).select(["title", "dayCount", "createdAt", "plan.title", "plan.dayCount"])
+    if start_after:
+        # The cursor only needs the ordering field, not the plan blob
+        cursor = pathways_ref.document(start_after).get(field_paths=["createdAt"])
+        if not cursor.exists:
+            return jsonify({"error": "Invalid startAfter"}), 400
+        query = query.start_after(cursor)
+    # One extra row tells us whether another page exists
+    docs = list(query.limit(limit + 1).stream())
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    rows = [(doc.id, doc.to_dict() or {}) for doc in docs]
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for doc_id, data in rows:
+        if data.get("title") is not None and data.get("dayCount") is not None:
+            summaries[doc_id] = {"title": data["title"], "dayCount": data["dayCount"]}
+        elif "dayCount" in (data.get("plan") or {}):
+            summaries[doc_id] = {"title": data["plan"].get("title"), "dayCount": data["plan"]["dayCount"]}
+    legacy = [doc_id for doc_id, _ in rows if doc_id not in summaries]
+    if legacy:
+        # Documents written before the summary fields: one batched read of the plan's title
+        # and days (not its sections), then backfill so the next listing skips this
+        refs = [pathways_ref.document(doc_id) for doc_id in legacy]
+        for snap in db.get_all(refs, field_paths=["plan.title", "plan.schedule.daily"]):
+            summary = plan_summary((snap.to_dict() or {}).get("plan"))
+            summaries[snap.id] = summary
+            db.update_later(pathways_ref.document(snap.id), {"title": summary["title"], "dayCount": summary["dayCount"]})
+
     items: List[Dict[str, Any]] = []
-    for doc in query.stream():
-        data = doc.to_dict() or {}
-        title = (data.get("plan") or {}).get("title", "Untitled Pathway")
-        days = len(((data.get("plan") or {}).get("schedule") or {}).get("daily", []))
-        created_at = data.get("createdAt")
-        created_iso = None
-        try:
-            created_iso = created_at.to_datetime().isoformat() if created_at else None
-        except Exception:
-            created_iso = None
+    for doc_id, data in rows:
+        summary = summaries.get(doc_id) or {}
         items.append({
-            "id": doc.id,
-            "title": title,
-            "days": days,
-            "createdAt": created_iso,
+            "id": doc_id,
+            "title": summary.get("title") or "Untitled Pathway",
+            "days": summary.get("dayCount"),
+            "createdAt": _iso(data.get("createdAt")),
         })
-    return jsonify({"items": items, "total": len(items)}), 200
\ No newline at end of file
+
+    # `total` counts every pathway (an aggregation, billed per 1000 index entries), `count` this page
+    total = len(items) if not start_after and not has_more else _count(pathways_ref)
+    body = {
+        "items": items,
+        "count": len(items),
+        "total": total,
+        "nextCursor": items[-1]["id"] if has_more else None,
+    }
+    etag = hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"})
+    response = jsonify(body)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response, 200
+
+
+@pathway_bp.get("/<pathway_id>/export")
+@firebase_required
+def export_pathway(pathway_id: str):
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
+    exports: ExportCache = request.app_ctx_exports  # type: ignore[attr-defined]
+    user_uid = _get_uid()
+    if not user_uid:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    fmt = (request.args.get("format") or "pdf").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    record = pathways.get(user_uid, pathway_id)
+    if record is None:
+        return jsonify({"error": "No pathway"}), 404
+
+    data = record["data"]
+    version = pathway_version(record["id"], data)
+    etag = hashlib.sha1(f"{version}:{fmt}".encode("utf-8")).hexdigest()
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"})
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="pathway-{record["id"]}.{extension}"',
+    }
+    key = (user_uid, record["id"], version, fmt)
+    cached = exports.get(key)
+    if cached is not None:
+        return Response(cached, mimetype=mimetype, headers=headers)
+
+    completed = set((data.get("progress") or {}).get("completedItemIds", []))
+    chunks = render_export(data.get("plan") or {}, completed, fmt)
+    return Response(stream_with_context(exports.stream_and_store(key, chunks)), mimetype=mimetype, headers=headers)
+
+
+@pathway_bp.get("/<pathway_id>/days")
+@firebase_required
+def pathway_days(pathway_id: str):
+    db: Database = request.app_ctx_db  # type: ignore[attr-defined]
+    gemini: GeminiClient = request.app_ctx_gemini  # type: ignore[attr-defined]
+    pathways: PathwayRepository = request.app_ctx_pathways  # type: ignore[attr-defined]
+    cfg: AppConfig = request.app_ctx_config  # type: ignore[attr-defined]
+    user_uid = _get_uid()
+    if not user_uid:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        first = int(request.args.get("from", 1))
+        last = int(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify({"error": "Invalid from/to"}), 400
+    record = pathways.get(user_uid, pathway_id)
+    if record is None:
+        return jsonify({"error": "No pathway"}), 404
+
+    data = record["data"]
+    total = int(data.get("dayCount") or len(((data.get("plan") or {}).get("schedule") or {}).get("daily", [])))
+    if last is None:
+        last = min(first + 6, total)
+    if not 1 <= first <= last <= total:
+        return jsonify({"error": f"Need 1 <= from <= to <= {total}"}), 400
+    if last - first + 1 > _DAYS_MAX_RANGE:
+        return jsonify({"error": f"At most {_DAYS_MAX_RANGE} days per request"}), 400
+
+    wanted = range(first, last + 1)
+    missing = [n for n in pending_days(data) if first <= n <= last]
+    fill_job = None
+    if missing:
+        jobs: JobQueue = request.app_ctx_jobs  # type: ignore[attr-defined]
+        fill_job = jobs.find_active(user_uid, _fill_key(record["id"]))
+        if fill_job is not None:
+            # The background fill owns these days: move it up rather than paying for them twice
+            jobs.prioritize(fill_job["id"])
+        else:
+            # No fill running (it failed, finished or was never queued). Another worker may
+            # have stored these days since this record was cached, so fill from a fresh read.
+            pathways.invalidate(user_uid)
+            filled = fill_pathway_days(db, gemini, pathways, cfg, user_uid, record["id"], missing, user_id=user_uid)
+            data = filled or data
+    by_day = {
+        day.get("day"): day
+        for day in ((data.get("plan") or {}).get("schedule") or {}).get("daily", [])
+        if isinstance(day, dict)
+    }
+    body = {
+        "pathwayId": record["id"],
+        "dayCount": total,
+        "days": [by_day[n] for n in wanted if n in by_day],
+        # Days the model could not write yet; ask again later
+        "pendingDays": [n for n in wanted if n not in by_day],
+    }
+    if fill_job is not None:
+        body["job"] = _job_view(fill_job)
+    response = jsonify(body)
+    if body["pendingDays"]:
+        response.headers["Retry-After"] = "5"
+    return response, 200
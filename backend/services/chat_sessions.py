@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from cachetools import TTLCache
+
+from ..db import Database, fa_firestore
+
+
+# Characters of each folded question kept in the rolling summary, and of the summary itself
+_SUMMARY_ITEM_CHARS = 120
+_SUMMARY_MAX_CHARS = 800
+
+
+class _Session:
+    __slots__ = ("turns", "summary", "lock")
+
+    def __init__(self) -> None:
+        self.turns: Deque[Tuple[str, str]] = deque()
+        self.summary = ""
+        self.lock = threading.Lock()
+
+
+class ChatSessionStore:
+    """Per-conversation history kept in process with idle eviction.
+
+    Only the last `window` question/answer turns are replayed to the model; older
+    turns are folded into a short summary of what the user asked, so prompt size
+    stays bounded however long the conversation runs. A session that is not in
+    memory (new worker, restart, evicted) is rebuilt once from the `chats`
+    collection. Each worker has its own store, so a session that moved between
+    workers may miss the other worker's most recent turns until it goes idle.
+    """
+
+    def __init__(self, db: Database, maxsize: int = 10_000, idle_ttl: float = 1800, window: int = 6) -> None:
+        self._db = db
+        self._window = max(1, window)
+        self._sessions: TTLCache = TTLCache(maxsize=maxsize, ttl=idle_ttl)
+        self._lock = threading.Lock()
+        self.warm = 0
+        self.cold_loads = 0
+        self.created = 0
+
+    def start(self, uid: str) -> str:
+        """Open a new, empty session; nothing needs to be loaded for it."""
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[(uid, session_id)] = _Session()
+            self.created += 1
+        return session_id
+
+    def _session(self, uid: str, session_id: str) -> _Session:
+        key = (uid, session_id)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self.warm += 1
+                # Re-insert to refresh the idle TTL
+                self._sessions[key] = session
+                return session
+        session = self._load(uid, session_id)
+        with self._lock:
+            # Another thread may have loaded it meanwhile; keep the first one
+            existing = self._sessions.get(key)
+            if existing is not None:
+                return existing
+            self._sessions[key] = session
+            return session
+
+    def _load(self, uid: str, session_id: str) -> _Session:
+        session = _Session()
+        query = (
+            self._db.chats.where("userId", "==", uid)
+            .where("sessionId", "==", session_id)
+            .order_by("createdAt", direction=fa_firestore.Query.DESCENDING)
+            .limit(self._window)
+        )
+        try:
+            docs = list(query.stream())
+        except Exception:
+            # Missing composite index or a transient error: start without history
+            docs = []
+        with self._lock:
+            self.cold_loads += 1
+        for doc in reversed(docs):
+            data = doc.to_dict() or {}
+            session.turns.append((str(data.get("message", "")), str(data.get("answer", ""))))
+        return session
+
+    def messages(self, uid: str, session_id: str, question: str) -> List[Dict[str, str]]:
+        """Prompt messages for the next turn: summary, windowed history, then `question`."""
+        session = self._session(uid, session_id)
+        messages: List[Dict[str, str]] = []
+        with session.lock:
+            if session.summary:
+                messages.append({"role": "system", "content": f"Earlier the user asked about: {session.summary}"})
+            for asked, answered in session.turns:
+                messages.append({"role": "user", "content": asked})
+                messages.append({"role": "model", "content": answered})
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def record(self, uid: str, session_id: str, question: str, answer: str) -> None:
+        session = self._session(uid, session_id)
+        with session.lock:
+            session.turns.append((question, answer))
+            while len(session.turns) > self._window:
+                asked, _ = session.turns.popleft()
+                folded = " ".join(asked.split())[:_SUMMARY_ITEM_CHARS]
+                summary = f"{session.summary}; {folded}" if session.summary else folded
+                # Keep the most recent part when the summary outgrows its budget
+                session.summary = summary[-_SUMMARY_MAX_CHARS:]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "warm": self.warm,
+                "coldLoads": self.cold_loads,
+                "created": self.created,
+            }
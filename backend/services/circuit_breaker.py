@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker.
+
+    closed: calls flow. After `failure_threshold` consecutive failures it opens and
+    refuses calls for `cooldown` seconds, then half-opens to let a single probe
+    through: success closes it again, failure re-opens it for another cool-down.
+    A call that ends with neither (cancelled, client gone) must `release_probe`,
+    or the breaker would wait for that probe forever.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0) -> None:
+        self._threshold = max(1, failure_threshold)
+        self._cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened_count = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._cooldown:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self._threshold:
+                if self._state != self.OPEN:
+                    self.opened_count += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Let the next call probe again; for calls abandoned without an outcome."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == self.OPEN:
+                retry_in = max(0.0, self._cooldown - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutiveFailures": self._failures,
+                "openedCount": self.opened_count,
+                "shortCircuited": self.short_circuited,
+                "retryInSeconds": round(retry_in, 1),
+            }
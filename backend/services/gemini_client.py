@@ -1,13 +1,61 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from ..config import AppConfig
+from .circuit_breaker import CircuitBreaker
+from .pathway_cache import MemoryPathwayCache, PathwayCache, PathwayKey
+from .pathway_schema import (
+    DAYS_SCHEMA,
+    HEAD_SCHEMA,
+    OUTLINE_SCHEMA,
+    PATHWAY_SCHEMA,
+    SECTION_KEYS,
+    SECTIONS_SCHEMA,
+    GenerationStats,
+    chunk_ranges,
+    collect_days,
+    normalize_day,
+    outline_text,
+    parse_pathway,
+    plan_daily,
+)
+from .prompt_context import PromptContextBuilder
+from .rate_limiter import ModelLimiter, RateLimited
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
 
-try:
-    import google.generativeai as genai  # type: ignore
-except Exception:  # pragma: no cover
-    genai = None  # type: ignore
+
+# HTTP-style status codes carried by google.api_core errors that are worth retrying
+_TRANSIENT_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class ModelUnavailable(Exception):
+    """The model backend failed, timed out or is short-circuited by the breaker."""
+
+
+def _is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and code in _TRANSIENT_CODES
+
+
+def _import_genai() -> Any:
+    try:
+        import google.generativeai as genai  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return genai
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform in [0, base * 2^attempt], capped
+    return random.uniform(0, min(4.0, 0.25 * (2 ** attempt)))
 
 
 def _parse_days(questionnaire: Dict[str, Any]) -> int:
@@ -36,6 +84,33 @@ def _parse_days(questionnaire: Dict[str, Any]) -> int:
     return 7
 
 
+_HOURS_SUFFIX_RE = re.compile(r"(h|hr|hrs|hour|hours)$")
+
+
+def _normalize_hours(value: Any) -> str:
+    hours = "".join(str(value if value is not None else "").lower().split())
+    return _HOURS_SUFFIX_RE.sub("", hours)
+
+
+def plan_days(questionnaire: Dict[str, Any]) -> int:
+    """Number of days the questionnaire's prep time asks for."""
+    return _parse_days(questionnaire)
+
+
+def pathway_key(questionnaire: Dict[str, Any]) -> PathwayKey:
+    """Normalized cache key: case/whitespace-insensitive, "2h" == "2", prep time in days."""
+    return (
+        str(questionnaire.get("skillLevel", "")).strip().lower(),
+        f"{_parse_days(questionnaire)}d",
+        _normalize_hours(questionnaire.get("hoursPerDay", "")),
+        str(questionnaire.get("programmingLanguage", "")).strip().lower(),
+    )
+
+
+def _day_outline(known: Dict[int, Dict[str, Any]]) -> str:
+    return "\n".join(f"Day {n}: {known[n].get('focus', '')}" for n in sorted(known))
+
+
 def _ensure_ids(items: List[Dict[str, Any]], prefix: str) -> List[Dict[str, Any]]:
     result: List[Dict[str, Any]] = []
     for idx, it in enumerate(items, start=1):
@@ -47,16 +122,60 @@ def _ensure_ids(items: List[Dict[str, Any]], prefix: str) -> List[Dict[str, Any]
 
 
 class GeminiClient:
-    def __init__(self, config: AppConfig) -> None:
+    def __init__(
+        self,
+        config: AppConfig,
+        pathway_cache: Optional[PathwayCache] = None,
+        model: Any = None,
+    ) -> None:
         self._api_key: Optional[str] = config.gemini_api_key
         self._model_name: str = config.model_name
-        self.enabled: bool = bool(self._api_key and genai is not None)
-        if self.enabled and genai is not None:
+        # The SDK import is slow, so it only happens when a real model will be used
+        genai = _import_genai() if self._api_key and model is None else None
+        self.enabled: bool = bool(self._api_key and genai is not None) or model is not None
+        # Per-call deadline is passed as request_options to the real SDK only
+        self._native_model = model is None
+        if model is not None:
+            # Injected model (tests, alternative backends): anything with generate_content
+            self._model = model
+        elif self.enabled and genai is not None:
             genai.configure(api_key=self._api_key)
             self._model = genai.GenerativeModel(self._model_name)
         else:
             self._model = None
-        self._pathway_cache: dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        self._pathway_cache: PathwayCache = pathway_cache or MemoryPathwayCache(
+            maxsize=config.pathway_cache_size, ttl=config.pathway_cache_ttl
+        )
+        # Waiting on another worker's generation never outlasts the request's own budget
+        self._inflight = SingleFlight(
+            lock_dir=config.pathway_lock_dir or None, lock_timeout=config.gemini_latency_budget
+        )
+        self._limiter = ModelLimiter(
+            global_rate=config.gemini_global_rate,
+            global_burst=config.gemini_global_burst,
+            user_rate=config.gemini_user_rate,
+            user_burst=config.gemini_user_burst,
+            max_inflight=config.gemini_max_inflight,
+            max_wait=config.gemini_max_wait,
+        )
+        self._timeout = config.gemini_timeout
+        self._max_retries = config.gemini_max_retries
+        self._latency_budget = config.gemini_latency_budget
+        self._breaker = CircuitBreaker(config.gemini_breaker_threshold, config.gemini_breaker_cooldown)
+        self._responses = ResponseCache(
+            maxsize=config.response_cache_size,
+            ttl=config.response_cache_ttl,
+            threshold=config.response_cache_threshold,
+        )
+        self._context_builder = PromptContextBuilder(max_chars=config.chat_context_max_chars)
+        # JSON output mode with a response schema; switched off if the model rejects it
+        self._json_schema = config.gemini_json_schema
+        self._generation = GenerationStats()
+        # Long schedules are written a chunk of days at a time, in parallel
+        self._chunk_days = config.pathway_chunk_days
+        self._chunk_min_days = config.pathway_chunk_min_days
+        self._chunk_workers = max(1, config.pathway_chunk_workers)
+        self._chunk_pool = ThreadPoolExecutor(max_workers=self._chunk_workers, thread_name_prefix="pathway-chunk")
 
     def _stub_pathway(self, questionnaire: Dict[str, Any]) -> Dict[str, Any]:
         skill = questionnaire.get("skillLevel", "beginner").title()
@@ -103,24 +222,95 @@ class GeminiClient:
             },
         }
 
-    def generate_pathway(self, questionnaire: Dict[str, Any]) -> Dict[str, Any]:
+    def _call_options(self, timeout: float, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not self._native_model:
+            return {}
+        options: Dict[str, Any] = {"request_options": {"timeout": timeout}}
+        if schema is not None and self._json_schema:
+            options["generation_config"] = {"response_mime_type": "application/json", "response_schema": schema}
+        return options
+
+    def _schema_rejected(self, exc: BaseException, schema: Optional[Dict[str, Any]]) -> bool:
+        # Models without structured output answer 400; fall back to prompt-only JSON for good
+        if schema is not None and self._json_schema and self._native_model and getattr(exc, "code", None) == 400:
+            self._json_schema = False
+            return True
+        return False
+
+    def _generate(
+        self, prompt: str, user_id: Optional[str] = None, schema: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """One logical model call: limiter slot, breaker check, deadline, jittered retries.
+
+        Raises RateLimited when refused locally and ModelUnavailable when the backend
+        cannot answer within the latency budget.
+        """
+        with self._limiter.slot(user_id):
+            if not self._breaker.allow():
+                raise ModelUnavailable("circuit open")
+            settled = False
+            try:
+                deadline = time.monotonic() + self._latency_budget
+                attempt = 0
+                while True:
+                    timeout = min(self._timeout, max(0.1, deadline - time.monotonic()))
+                    try:
+                        response = self._model.generate_content(prompt, **self._call_options(timeout, schema))
+                        settled = True
+                        self._breaker.record_success()
+                        return response
+                    except Exception as exc:
+                        if self._schema_rejected(exc, schema):
+                            continue
+                        delay = _backoff(attempt)
+                        attempt += 1
+                        if (
+                            not _is_transient(exc)
+                            or attempt > self._max_retries
+                            or time.monotonic() + delay >= deadline
+                        ):
+                            settled = True
+                            self._breaker.record_failure()
+                            raise ModelUnavailable(str(exc)) from exc
+                        time.sleep(delay)
+            finally:
+                if not settled:
+                    # Interrupted before an outcome: free the half-open probe
+                    self._breaker.release_probe()
+
+    def generate_pathway(self, questionnaire: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
         if not self.enabled or self._model is None:
             return self._stub_pathway(questionnaire)
 
-        key: Tuple[str, str, str, str] = (
-            str(questionnaire.get("skillLevel", "")),
-            str(questionnaire.get("prepTime", "")),
-            str(questionnaire.get("hoursPerDay", "")),
-            str(questionnaire.get("programmingLanguage", "")),
-        )
+        key = pathway_key(questionnaire)
         cached = self._pathway_cache.get(key)
         if cached:
             return cached
+        # Concurrent identical questionnaires share a single model call
+        return self._inflight.do(key, lambda: self._generate_pathway_locked(questionnaire, key, user_id))
 
-        days = _parse_days(questionnaire)
+    def cached_pathway(self, questionnaire: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._pathway_cache.get(pathway_key(questionnaire))
+
+    def prime_pathway(self, questionnaire: Dict[str, Any], plan: Dict[str, Any]) -> None:
+        """Seed the cache with a precomputed plan (see `backend.warmup`)."""
+        self._pathway_cache.set(pathway_key(questionnaire), plan)
+
+    def _generate_pathway_locked(
+        self, questionnaire: Dict[str, Any], key: PathwayKey, user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        with self._inflight.host_lock(key):
+            # Another worker on this host may have produced it while we waited
+            cached = self._pathway_cache.get(key)
+            if cached:
+                self._inflight.record_host_coalesced()
+                return cached
+            return self._generate_pathway_uncached(questionnaire, key, user_id)
+
+    def _pathway_prompt(self, questionnaire: Dict[str, Any], days: int) -> str:
         language = questionnaire.get("programmingLanguage", "python")
         hours = questionnaire.get("hoursPerDay", "2h")
-        prompt = (
+        return (
             "You are an AI mentor. Create a structured DSA plan. STRICT OUTPUT IN JSON ONLY. "
             "Requirements:\n"
             f"- schedule.daily must have EXACTLY {days} items (day 1..{days}).\n"
@@ -135,53 +325,453 @@ class GeminiClient:
             f"prepTime: {questionnaire.get('prepTime')}\n"
             "Return JSON with keys: title, schedule: { daily: [...] }, sections: { codingProblems: [...], youtubeReferences: [...], theoryContent: [...] }."
         )
-        response = self._model.generate_content(prompt)
-        text = getattr(response, "text", None) or "{}"
-        cleaned = text.strip().strip("` ")
-        import json
+
+    def _days_prompt(
+        self, questionnaire: Dict[str, Any], day_numbers: List[int], title: str, outline: str, total: int
+    ) -> str:
+        return (
+            "You are an AI mentor writing part of a DSA plan. STRICT OUTPUT IN JSON ONLY.\n"
+            f"Plan title: {title}\n"
+            f"Plan length: {total} days\n"
+            f"Outline:\n{outline[:3000] or '(none)'}\n"
+            f"Write ONLY these days: {', '.join(str(n) for n in day_numbers)}.\n"
+            "- Each daily item MUST include: day (number), focus (string), time (string), details (2-4 sentences of what to study and practice), topics (array of 3-5 concrete topics).\n"
+            "- Follow the outline's progression for these days; do not repeat other days.\n"
+            "Context:\n"
+            f"skillLevel: {questionnaire.get('skillLevel')}\n"
+            f"hoursPerDay: {questionnaire.get('hoursPerDay', '2h')}\n"
+            f"programmingLanguage: {questionnaire.get('programmingLanguage', 'python')}\n"
+            'Return JSON: { "daily": [...] }.'
+        )
+
+    def _first_pass(self, text: str, days: int) -> Tuple[Dict[str, Any], Dict[int, Dict[str, Any]], bool]:
+        parsed, complete = parse_pathway(text)
+        return parsed, collect_days(plan_daily(parsed), list(range(1, days + 1))), complete
+
+    def _assemble_pathway(
+        self,
+        questionnaire: Dict[str, Any],
+        parsed: Dict[str, Any],
+        by_day: Dict[int, Dict[str, Any]],
+        days: int,
+    ) -> Dict[str, Any]:
+        hours = questionnaire.get("hoursPerDay", "2h")
+        raw_sections = parsed.get("sections") if isinstance(parsed.get("sections"), dict) else {}
+        sections = {
+            key: _ensure_ids([it for it in raw_sections.get(key) or [] if isinstance(it, dict)], prefix)
+            for key, prefix in zip(SECTION_KEYS, ("cp", "yt", "th"))
+        }
+        return {
+            "title": str(parsed.get("title") or "DSA Pathway"),
+            "schedule": {"daily": [normalize_day(n, by_day.get(n), hours) for n in range(1, days + 1)]},
+            "sections": sections,
+        }
+
+    def _parse_days_reply(self, response: Any, numbers: List[int]) -> Dict[int, Dict[str, Any]]:
+        parsed, _ = parse_pathway(getattr(response, "text", None) or "")
+        return collect_days(plan_daily(parsed), numbers)
+
+    def _record_outcome(
+        self, complete: bool, missing_before: int, missing_after: int, calls: int, chunk_calls: int = 0
+    ) -> None:
+        if complete and not missing_before:
+            self._generation.record("full", chunk_calls=chunk_calls)
+        else:
+            self._generation.record(
+                "repaired",
+                repair_calls=calls,
+                days_repaired=missing_before - missing_after,
+                days_padded=missing_after,
+                chunk_calls=chunk_calls,
+            )
+
+    # Chunked generation: one small outline call (title and weekly themes), then every
+    # chunk of days and the sections concurrently; failed or short chunks retry alone.
+
+    def _chunked(self, days: int) -> bool:
+        return self._chunk_days > 0 and 0 < self._chunk_min_days <= days
+
+    def _outline_prompt(self, questionnaire: Dict[str, Any], days: int) -> str:
+        weeks = (days + 6) // 7
+        return (
+            f"You are an AI mentor outlining a {days}-day DSA plan. STRICT OUTPUT IN JSON ONLY.\n"
+            f"- weeks must have EXACTLY {weeks} items (week 1..{weeks}), each with a one-line theme.\n"
+            "- Themes build on each other, from the fundamentals for this level to its hardest topics.\n"
+            "Context:\n"
+            f"skillLevel: {questionnaire.get('skillLevel')}\n"
+            f"hoursPerDay: {questionnaire.get('hoursPerDay', '2h')}\n"
+            f"programmingLanguage: {questionnaire.get('programmingLanguage', 'python')}\n"
+            f"prepTime: {questionnaire.get('prepTime')}\n"
+            'Return JSON: { "title": "...", "weeks": [{ "week": 1, "theme": "..." }, ...] }.'
+        )
+
+    def _sections_prompt(self, questionnaire: Dict[str, Any], title: str) -> str:
+        return (
+            "You are an AI mentor listing resources for a DSA plan. STRICT OUTPUT IN JSON ONLY.\n"
+            f"Plan title: {title}\n"
+            "- sections: include codingProblems[], youtubeReferences[], theoryContent[].\n"
+            "- Each item in those arrays MUST have a stable string id (e.g., 'cp-1', 'yt-1', 'th-1') and a human-readable title; include url where relevant.\n"
+            "- Adjust number of codingProblems based on hoursPerDay (1-2h: ~20, 2-3h: 20-30, 3-4h: 30-40, >4h: 40-60).\n"
+            "Context:\n"
+            f"skillLevel: {questionnaire.get('skillLevel')}\n"
+            f"hoursPerDay: {questionnaire.get('hoursPerDay', '2h')}\n"
+            f"programmingLanguage: {questionnaire.get('programmingLanguage', 'python')}\n"
+            'Return JSON: { "sections": { "codingProblems": [...], "youtubeReferences": [...], "theoryContent": [...] } }.'
+        )
+
+    def _round_calls(
+        self,
+        questionnaire: Dict[str, Any],
+        days: int,
+        title: str,
+        outline: str,
+        pending: List[List[int]],
+        want_sections: bool,
+    ) -> List[Tuple[Optional[List[int]], str, Dict[str, Any]]]:
+        """`(day numbers, or None for the sections, prompt, schema)` for each call of one round."""
+        calls = [(nums, self._days_prompt(questionnaire, nums, title, outline, days), DAYS_SCHEMA) for nums in pending]
+        if want_sections:
+            calls.append((None, self._sections_prompt(questionnaire, title), SECTIONS_SCHEMA))
+        return calls
+
+    def _absorb_chunks(
+        self,
+        calls: List[Tuple[Optional[List[int]], str, Dict[str, Any]]],
+        responses: List[Any],
+        by_day: Dict[int, Dict[str, Any]],
+        sections: Dict[str, Any],
+    ) -> List[List[int]]:
+        """Merge one round's replies; returns the day numbers each chunk still lacks."""
+        pending: List[List[int]] = []
+        for (numbers, _, _), response in zip(calls, responses):
+            if numbers is None:
+                parsed, _ = parse_pathway(getattr(response, "text", None) or "")
+                if isinstance(parsed.get("sections"), dict):
+                    sections.update(parsed["sections"])
+                continue
+            if response is not None:
+                by_day.update(self._parse_days_reply(response, numbers))
+            left = [n for n in numbers if n not in by_day]
+            if left:
+                pending.append(left)
+        return pending
+
+    def _finish_chunked(
+        self,
+        questionnaire: Dict[str, Any],
+        key: PathwayKey,
+        days: int,
+        head: Dict[str, Any],
+        by_day: Dict[int, Dict[str, Any]],
+        sections: Dict[str, Any],
+        rounds: List[Tuple[int, int]],
+    ) -> Dict[str, Any]:
+        if not by_day:
+            self._generation.record("fallback")
+            return self._stub_pathway(questionnaire)
+        # rounds: (calls made, days still missing afterwards) per round
+        first_calls, first_missing = rounds[0]
+        calls = sum(n for n, _ in rounds)
+        self._record_outcome(
+            complete=bool(sections) and len(rounds) == 1,
+            missing_before=first_missing,
+            missing_after=rounds[-1][1],
+            calls=calls - first_calls,
+            chunk_calls=calls,
+        )
+        data = self._assemble_pathway(questionnaire, {"title": head.get("title"), "sections": sections}, by_day, days)
+        self._pathway_cache.set(key, data)
+        return data
+
+    def _chunk_call(self, prompt: str, schema: Dict[str, Any]) -> Any:
+        # The user was charged for the outline call; chunks only take process-wide slots
         try:
-            data = json.loads(cleaned)
-        except Exception:
-            data = self._stub_pathway(questionnaire)
+            return self._generate(prompt, None, schema=schema)
+        except (ModelUnavailable, RateLimited):
+            return None
+
+    def _run_rounds(
+        self,
+        questionnaire: Dict[str, Any],
+        days: int,
+        title: str,
+        outline: str,
+        numbers: List[int],
+        sections: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[int, Dict[str, Any]], List[Tuple[int, int]]]:
+        """Days `numbers` (and the sections unless `sections` is None) on the chunk pool.
+
+        Returns the days obtained and, per round, `(calls made, days still missing)`.
+        """
+        by_day: Dict[int, Dict[str, Any]] = {}
+        pending = chunk_ranges(numbers, self._chunk_days)
+        rounds: List[Tuple[int, int]] = []
+        # First round plus one retry of whatever failed or came back short
+        for _ in range(2):
+            calls = self._round_calls(
+                questionnaire, days, title, outline, pending, sections is not None and not sections
+            )
+            if not calls:
+                break
+            responses = list(self._chunk_pool.map(lambda c: self._chunk_call(c[1], c[2]), calls))
+            pending = self._absorb_chunks(calls, responses, by_day, sections if sections is not None else {})
+            rounds.append((len(calls), sum(len(p) for p in pending)))
+        return by_day, rounds
 
-        # Post-process: enforce days count and required fields
+    def _generate_pathway_chunked(
+        self, questionnaire: Dict[str, Any], key: PathwayKey, days: int, user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         try:
-            daily = data.get("schedule", {}).get("daily", [])
-            if not isinstance(daily, list):
-                daily = []
-            current: List[Dict[str, Any]] = []
-            for idx in range(1, days + 1):
-                entry: Dict[str, Any] = {"day": idx, "focus": f"Study Day {idx}", "time": hours, "details": "", "topics": []}
-                if idx - 1 < len(daily):
-                    src = daily[idx - 1] or {}
-                    entry.update({k: src.get(k, entry[k]) for k in ["focus", "time", "details", "topics"]})
-                if not isinstance(entry.get("topics"), list):
-                    entry["topics"] = []
-                current.append(entry)
-            data.setdefault("schedule", {})["daily"] = current
-
-            sections = data.get("sections", {}) or {}
-            sections["codingProblems"] = _ensure_ids(list(sections.get("codingProblems", [])), "cp")
-            sections["youtubeReferences"] = _ensure_ids(list(sections.get("youtubeReferences", [])), "yt")
-            sections["theoryContent"] = _ensure_ids(list(sections.get("theoryContent", [])), "th")
-            data["sections"] = sections
-        except Exception:
-            data = self._stub_pathway(questionnaire)
+            response = self._generate(self._outline_prompt(questionnaire, days), user_id, schema=OUTLINE_SCHEMA)
+        except ModelUnavailable:
+            return self._stub_pathway(questionnaire)
+        head, _ = parse_pathway(getattr(response, "text", None) or "")
+        sections: Dict[str, Any] = {}
+        by_day, rounds = self._run_rounds(
+            questionnaire, days, str(head.get("title") or ""), outline_text(head), list(range(1, days + 1)), sections
+        )
+        return self._finish_chunked(questionnaire, key, days, head, by_day, sections, rounds)
 
-        self._pathway_cache[key] = data
-        return data
+    # Progressive delivery: the first days now, the rest filled in later by number
+
+    def _head_prompt(self, questionnaire: Dict[str, Any], days: int, first: int) -> str:
+        weeks = (days + 6) // 7
+        return (
+            f"You are an AI mentor starting a {days}-day DSA plan. STRICT OUTPUT IN JSON ONLY.\n"
+            f"- weeks must have EXACTLY {weeks} items (week 1..{weeks}), each with a one-line theme.\n"
+            "- Themes build on each other, from the fundamentals for this level to its hardest topics.\n"
+            f"- daily must have EXACTLY {first} items (day 1..{first}), following week 1's theme.\n"
+            "- Each daily item MUST include: day (number), focus (string), time (string), details (2-4 sentences of what to study and practice), topics (array of 3-5 concrete topics).\n"
+            "Context:\n"
+            f"skillLevel: {questionnaire.get('skillLevel')}\n"
+            f"hoursPerDay: {questionnaire.get('hoursPerDay', '2h')}\n"
+            f"programmingLanguage: {questionnaire.get('programmingLanguage', 'python')}\n"
+            f"prepTime: {questionnaire.get('prepTime')}\n"
+            'Return JSON: { "title": "...", "weeks": [{ "week": 1, "theme": "..." }, ...], "daily": [...] }.'
+        )
 
-    def chat(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None) -> str:
+    def generate_pathway_head(
+        self, questionnaire: Dict[str, Any], first_days: int, user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Title, weekly outline and the first `first_days` days from one small call.
+
+        Returns `{"title", "outline", "dayCount", "daily"}`, where `daily` may be short,
+        or None when no model is available (callers fall back to `generate_pathway`).
+        """
         if not self.enabled or self._model is None:
-            last = messages[-1]["content"] if messages else ""
-            return f"[Stub Response]\n\n{last}\n\n- Focus on fundamentals.\n- Practice daily.\n- Review mistakes."
+            return None
+        days = _parse_days(questionnaire)
+        first = max(1, min(first_days, days))
+        try:
+            response = self._generate(self._head_prompt(questionnaire, days, first), user_id, schema=HEAD_SCHEMA)
+        except ModelUnavailable:
+            return None
+        parsed, complete = parse_pathway(getattr(response, "text", None) or "")
+        by_day = collect_days(plan_daily(parsed), list(range(1, first + 1)))
+        if not by_day:
+            return None
+        # Days missing here are not padded: they are filled in with the rest
+        self._generation.record("full" if complete and len(by_day) == first else "repaired")
+        hours = questionnaire.get("hoursPerDay", "2h")
+        return {
+            "title": str(parsed.get("title") or "DSA Pathway"),
+            "outline": outline_text(parsed) or _day_outline(by_day),
+            "dayCount": days,
+            "daily": [normalize_day(n, by_day[n], hours) for n in sorted(by_day)],
+        }
+
+    def generate_days(
+        self,
+        questionnaire: Dict[str, Any],
+        numbers: List[int],
+        title: str,
+        outline: str,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Days `numbers` of an existing plan, written in parallel chunks against its outline.
 
+        Days the model could not produce are left out so a later call can ask again.
+        With `user_id` the request costs one of that user's tokens (RateLimited if
+        none is left); the chunk calls themselves only take process-wide slots.
+        """
+        if not self.enabled or self._model is None or not numbers:
+            return []
+        if user_id:
+            self._limiter.charge(user_id)
+        days = _parse_days(questionnaire)
+        by_day, rounds = self._run_rounds(questionnaire, days, title, outline, sorted(numbers), None)
+        calls = sum(n for n, _ in rounds)
+        self._generation.record(
+            "repaired" if rounds[0][1] else "full",
+            repair_calls=calls - rounds[0][0],
+            days_repaired=rounds[0][1] - rounds[-1][1],
+            chunk_calls=calls,
+        )
+        hours = questionnaire.get("hoursPerDay", "2h")
+        return [normalize_day(n, by_day[n], hours) for n in sorted(by_day)]
+
+    def _generate_pathway_uncached(
+        self, questionnaire: Dict[str, Any], key: PathwayKey, user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        days = _parse_days(questionnaire)
+        if self._chunked(days):
+            return self._generate_pathway_chunked(questionnaire, key, days, user_id)
+        try:
+            response = self._generate(self._pathway_prompt(questionnaire, days), user_id, schema=PATHWAY_SCHEMA)
+        except ModelUnavailable:
+            # Degraded: serve the stub schedule and do not cache it
+            return self._stub_pathway(questionnaire)
+        parsed, by_day, complete = self._first_pass(getattr(response, "text", None) or "", days)
+        if not by_day:
+            self._generation.record("fallback")
+            return self._stub_pathway(questionnaire)
+        missing = [n for n in range(1, days + 1) if n not in by_day]
+        calls = 0
+        if missing:
+            # Ask again for the lost days only, with the recovered ones as the outline
+            calls = 1
+            title = str(parsed.get("title") or "")
+            # The user was charged for the first reply; a refused repair just leaves placeholders
+            try:
+                extra = self._generate(
+                    self._days_prompt(questionnaire, missing, title, _day_outline(by_day), days),
+                    None,
+                    schema=DAYS_SCHEMA,
+                )
+                by_day.update(self._parse_days_reply(extra, missing))
+            except (ModelUnavailable, RateLimited):
+                pass
+        still_missing = sum(1 for n in missing if n not in by_day)
+        self._record_outcome(complete, len(missing), still_missing, calls)
+        data = self._assemble_pathway(questionnaire, parsed, by_day, days)
+        self._pathway_cache.set(key, data)
+        return data
+
+    def cache_stats(self) -> Dict[str, Any]:
+        stats = self._pathway_cache.stats()
+        stats["singleFlight"] = self._inflight.stats()
+        return stats
+
+    def generation_stats(self) -> Dict[str, Any]:
+        return self._generation.stats()
+
+    def limiter_stats(self) -> Dict[str, Any]:
+        return self._limiter.stats()
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        return self._breaker.stats()
+
+    def response_cache_stats(self) -> Dict[str, Any]:
+        return self._responses.stats()
+
+    def context_stats(self) -> Dict[str, Any]:
+        return self._context_builder.stats()
+
+    def _cacheable_question(self, messages: List[Dict[str, str]], use_cache: bool) -> Optional[str]:
+        # Only stateless single-message prompts are shared between requests
+        if not use_cache or len(messages) != 1:
+            return None
+        return messages[0].get("content", "") or None
+
+    def _chat_prompt(self, messages: List[Dict[str, str]], context_text: str = "") -> str:
         parts: List[str] = []
-        if context:
-            parts.append(f"Context: {context}")
+        if context_text:
+            parts.append(f"Context:\n{context_text}")
         for m in messages:
             role = m.get("role", "user")
             content = m.get("content", "")
             parts.append(f"{role.upper()}: {content}")
-        response = self._model.generate_content("\n".join(parts))
-        return getattr(response, "text", "")
\ No newline at end of file
+        return "\n".join(parts)
+
+    def _stub_chat(self, messages: List[Dict[str, str]]) -> str:
+        last = messages[-1]["content"] if messages else ""
+        return f"[Stub Response]\n\n{last}\n\n- Focus on fundamentals.\n- Practice daily.\n- Review mistakes."
+
+    def _degraded_chat(self) -> str:
+        return (
+            "The AI mentor is temporarily unavailable, please try again in a minute.\n\n"
+            "- Keep going with today's topics in your plan.\n- Practice daily.\n- Review mistakes."
+        )
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        context: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
+        if not self.enabled or self._model is None:
+            return self._stub_chat(messages)
+
+        # Cached answers are keyed on the same context text the prompt carries
+        context_text = self._context_builder.build(context)
+        question = self._cacheable_question(messages, use_cache)
+        if question:
+            cached = self._responses.get(question, context_text)
+            if cached is not None:
+                return cached
+        try:
+            response = self._generate(self._chat_prompt(messages, context_text), user_id)
+        except ModelUnavailable:
+            return self._degraded_chat()
+        answer = getattr(response, "text", "")
+        if question:
+            self._responses.set(question, context_text, answer)
+        return answer
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        context: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Iterator[str]:
+        """Yield the reply in chunks as the model produces them."""
+        if not self.enabled or self._model is None:
+            # Chunk the stub reply line by line so streaming can be exercised offline
+            for line in self._stub_chat(messages).splitlines(keepends=True):
+                yield line
+            return
+
+        context_text = self._context_builder.build(context)
+        question = self._cacheable_question(messages, use_cache)
+        if question:
+            cached = self._responses.get(question, context_text)
+            if cached is not None:
+                yield cached
+                return
+
+        # The slot is held until the stream is exhausted or the client disconnects
+        with self._limiter.slot(user_id):
+            if not self._breaker.allow():
+                yield self._degraded_chat()
+                return
+            chunks: List[str] = []
+            settled = False
+            try:
+                response = self._model.generate_content(
+                    self._chat_prompt(messages, context_text), stream=True, **self._call_options(self._timeout)
+                )
+                for chunk in response:
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        chunks.append(text)
+                        yield text
+            except GeneratorExit:
+                raise
+            except Exception:
+                settled = True
+                self._breaker.record_failure()
+                if chunks:
+                    raise
+                yield self._degraded_chat()
+                return
+            else:
+                settled = True
+                self._breaker.record_success()
+            finally:
+                if not settled:
+                    # Client went away mid-stream: no verdict on the model, free the half-open probe
+                    self._breaker.release_probe()
+            if question:
+                self._responses.set(question, context_text, "".join(chunks))
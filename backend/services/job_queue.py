@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+JobHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+TERMINAL_STATES = ("done", "failed")
+
+
+class QueueFull(Exception):
+    """Raised by `JobQueue.submit` when the backlog is at capacity."""
+
+    def __init__(self, depth: int, retry_after: float = 5.0) -> None:
+        super().__init__(f"job queue full ({depth} queued)")
+        self.depth = depth
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class JobQueue:
+    """SQLite-backed background job queue shared by every worker process on a node.
+
+    Jobs are claimed with a lease that the owning process renews while the job
+    runs; if that process dies, the lease expires and another worker picks the job
+    up again, up to `max_attempts` runs. Submitting the same `(uid, key)` while a
+    job is queued or running returns the existing job instead of a new one; once
+    it has finished, the same key starts a new job. At most `max_queue` jobs may
+    wait; beyond that `submit` raises QueueFull.
+
+    Worker threads start on first use or on `start()`, so they live in the process
+    that serves requests (not a pre-fork parent). Other processes' completions are
+    seen by polling every `poll_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        handler: JobHandler,
+        workers: int = 4,
+        max_queue: int = 200,
+        lease: float = 300,
+        max_attempts: int = 3,
+        retention: float = 24 * 60 * 60,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self._path = path
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._max_queue = max_queue
+        self._lease = lease
+        self._max_attempts = max(1, max_attempts)
+        self._retention = retention
+        self._poll = poll_interval
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        # Jobs this process is running; their leases are renewed until they finish
+        self._running: Set[str] = set()
+        self._running_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._last_cleanup = 0.0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, uid TEXT NOT NULL, key TEXT NOT NULL,"
+            " status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0, run_after REAL NOT NULL DEFAULT 0,"
+            " lease_until REAL NOT NULL DEFAULT 0, priority INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "priority" not in columns:
+            # Queue files created before priorities existed
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                # Another process added it first
+                pass
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_owner_key ON jobs (uid, key, created_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; multi-statement updates use explicit BEGIN IMMEDIATE
+            conn = sqlite3.connect(self._path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _view(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "uid": row["uid"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+        }
+
+    def _ensure_started(self) -> None:
+        if self._threads or self._closed:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for idx in range(self._workers):
+                thread = threading.Thread(target=self._run, name=f"pathway-job-{idx}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._renew_leases, name="pathway-job-lease", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def start(self) -> None:
+        """Start the workers now, e.g. at boot so jobs queued before a restart resume."""
+        self._ensure_started()
+
+    def submit(self, uid: str, key: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Enqueue a job; returns `(job, created)` where `created` is False for a duplicate."""
+        self._ensure_started()
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE uid = ? AND key = ? AND status IN ('queued', 'running')"
+                " ORDER BY created_at DESC LIMIT 1",
+                (uid, key),
+            ).fetchone()
+            if row is not None:
+                conn.execute("COMMIT")
+                self.deduplicated += 1
+                return self._view(row), False
+            depth = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if depth >= self._max_queue:
+                conn.execute("ROLLBACK")
+                self.rejected += 1
+                raise QueueFull(depth)
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, uid, key, status, payload, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, uid, key, json.dumps(payload), now, now),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        self.submitted += 1
+        with self._cond:
+            self._cond.notify_all()
+        return self.get(job_id) or {}, True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_started()
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._view(row) if row is not None else None
+
+    def find_active(self, uid: str, key: str) -> Optional[Dict[str, Any]]:
+        """The queued or running job for `(uid, key)`, if any."""
+        self._ensure_started()
+        row = self._conn().execute(
+            "SELECT * FROM jobs WHERE uid = ? AND key = ? AND status IN ('queued', 'running')"
+            " ORDER BY created_at DESC LIMIT 1",
+            (uid, key),
+        ).fetchone()
+        return self._view(row) if row is not None else None
+
+    def prioritize(self, job_id: str) -> None:
+        """Run a queued job next, skipping any retry back-off it was waiting out."""
+        now = time.time()
+        self._conn().execute(
+            "UPDATE jobs SET priority = 1, run_after = MIN(run_after, ?), updated_at = ?"
+            " WHERE id = ? AND status = 'queued'",
+            (now, now, job_id),
+        )
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll: return the job once it is finished or `timeout` seconds have passed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in TERMINAL_STATES or remaining <= 0:
+                return job
+            with self._cond:
+                self._cond.wait(min(remaining, self._poll))
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        conn = self._conn()
+        while True:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = 'queued' AND run_after <= ?)"
+                    " OR (status = 'running' AND lease_until < ?)"
+                    " ORDER BY priority DESC, created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["status"] == "running" and row["attempts"] >= self._max_attempts:
+                    # Its worker died on every attempt; stop handing it out
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                        ("worker lost", now, row["id"]),
+                    )
+                    conn.execute("COMMIT")
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                    " lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + self._lease, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            return row
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = 0, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+    def _retry_later(self, job_id: str, delay: float, error: str) -> None:
+        now = time.time()
+        self._conn().execute(
+            "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, lease_until = 0, updated_at = ?"
+            " WHERE id = ?",
+            (error, now + delay, now, job_id),
+        )
+
+    def _renew_leases(self) -> None:
+        # Long chunked generations outlive a single lease; keep ours from being re-claimed
+        interval = max(0.05, self._lease / 3)
+        while not self._closed:
+            with self._cond:
+                self._cond.wait(interval)
+            with self._running_lock:
+                running = list(self._running)
+            if not running:
+                continue
+            now = time.time()
+            try:
+                self._conn().executemany(
+                    "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                    [(now + self._lease, job_id) for job_id in running],
+                )
+            except sqlite3.Error:
+                pass
+
+    def _cleanup(self) -> None:
+        now = time.time()
+        if now - self._last_cleanup < 600:
+            return
+        self._last_cleanup = now
+        self._conn().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (now - self._retention,)
+        )
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                row = self._claim()
+                if row is None:
+                    self._cleanup()
+                    with self._cond:
+                        self._cond.wait(self._poll)
+                    continue
+            except sqlite3.Error:
+                time.sleep(self._poll)
+                continue
+            attempts = row["attempts"] + 1
+            with self._running_lock:
+                self._running.add(row["id"])
+            try:
+                result = self._handler(json.loads(row["payload"]))
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"[:500]
+                if attempts >= self._max_attempts:
+                    self._finish(row["id"], "failed", error=error)
+                    self.failed += 1
+                else:
+                    # Honour a rate limiter's Retry-After, else back off per attempt
+                    delay = float(getattr(exc, "retry_after", 0) or 2 ** attempts)
+                    self._retry_later(row["id"], delay, error)
+                    self.retried += 1
+            else:
+                self._finish(row["id"], "done", result=result)
+                self.completed += 1
+            finally:
+                with self._running_lock:
+                    self._running.discard(row["id"])
+            with self._cond:
+                self._cond.notify_all()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_started()
+        counts = dict(
+            self._conn().execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY status"
+            ).fetchall()
+        )
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "maxQueue": self._max_queue,
+            "workers": self._workers,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
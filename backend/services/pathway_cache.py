@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from ..config import AppConfig
+
+
+PathwayKey = Tuple[str, ...]
+
+
+def _key_str(key: PathwayKey) -> str:
+    return "|".join(key)
+
+
+class PathwayCache:
+    """Base class for pathway cache tiers. Subclasses implement `_get`/`_set`."""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        # Counters are bumped from every request thread
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def _get(self, key: PathwayKey) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _set(self, key: PathwayKey, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get(self, key: PathwayKey) -> Optional[Dict[str, Any]]:
+        try:
+            value = self._get(key)
+        except Exception:
+            value = None
+        self._count("misses" if value is None else "hits")
+        return value
+
+    def set(self, key: PathwayKey, value: Dict[str, Any]) -> None:
+        try:
+            self._set(key, value)
+        except Exception:
+            # A failing tier must never break generation
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {"tier": self.name, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class _CountingTTLCache(TTLCache):
+    def __init__(self, owner: "MemoryPathwayCache", maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._owner = owner
+
+    def popitem(self):  # type: ignore[override]
+        item = super().popitem()
+        self._owner._count("evictions")
+        return item
+
+
+class MemoryPathwayCache(PathwayCache):
+    """Per-process TTL + LRU tier."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 256, ttl: float = 24 * 60 * 60) -> None:
+        super().__init__()
+        self._cache = _CountingTTLCache(self, maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _get(self, key: PathwayKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def _set(self, key: PathwayKey, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+
+class SqlitePathwayCache(PathwayCache):
+    """On-disk tier shared by every worker process on the same node."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, maxsize: int = 1024, ttl: float = 24 * 60 * 60) -> None:
+        super().__init__()
+        self._path = path
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pathway_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS pathway_cache_accessed ON pathway_cache (accessed_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: PathwayKey) -> Optional[Dict[str, Any]]:
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM pathway_cache WHERE key = ?", (_key_str(key),)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            conn.execute("DELETE FROM pathway_cache WHERE key = ?", (_key_str(key),))
+            conn.commit()
+            return None
+        conn.execute("UPDATE pathway_cache SET accessed_at = ? WHERE key = ?", (now, _key_str(key)))
+        conn.commit()
+        return json.loads(row[0])
+
+    def _set(self, key: PathwayKey, value: Dict[str, Any]) -> None:
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO pathway_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (_key_str(key), json.dumps(value), now + self._ttl, now),
+        )
+        conn.execute("DELETE FROM pathway_cache WHERE expires_at <= ?", (now,))
+        overflow = conn.execute("SELECT COUNT(*) FROM pathway_cache").fetchone()[0] - self._maxsize
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM pathway_cache WHERE key IN ("
+                " SELECT key FROM pathway_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._count("evictions", overflow)
+        conn.commit()
+
+
+class FirestorePathwayCache(PathwayCache):
+    """Optional tier shared across nodes, stored in the `pathwayCache` collection."""
+
+    name = "firestore"
+
+    def __init__(self, db: Any, ttl: float = 24 * 60 * 60) -> None:
+        super().__init__()
+        self._db = db
+        self._ttl = ttl
+
+    def _doc(self, key: PathwayKey):
+        # Document ids cannot contain '/'
+        return self._db.pathway_cache.document(_key_str(key).replace("/", "_"))
+
+    def _get(self, key: PathwayKey) -> Optional[Dict[str, Any]]:
+        snap = self._doc(key).get()
+        if not snap.exists:
+            return None
+        data = snap.to_dict() or {}
+        if float(data.get("expiresAt", 0)) <= time.time():
+            return None
+        return json.loads(data.get("value") or "null")
+
+    def _set(self, key: PathwayKey, value: Dict[str, Any]) -> None:
+        self._doc(key).set({"value": json.dumps(value), "expiresAt": time.time() + self._ttl})
+
+
+class TieredPathwayCache(PathwayCache):
+    """Looks tiers up in order and back-fills faster tiers on a hit in a slower one."""
+
+    name = "tiered"
+
+    def __init__(self, tiers: List[PathwayCache]) -> None:
+        super().__init__()
+        self._tiers = tiers
+
+    def _get(self, key: PathwayKey) -> Optional[Dict[str, Any]]:
+        for idx, tier in enumerate(self._tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self._tiers[:idx]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def _set(self, key: PathwayKey, value: Dict[str, Any]) -> None:
+        for tier in self._tiers:
+            tier.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        out = super().stats()
+        out["tiers"] = [tier.stats() for tier in self._tiers]
+        return out
+
+
+def build_pathway_cache(config: AppConfig, db: Any = None) -> PathwayCache:
+    """Build the tier stack named by `config.pathway_cache_backends` (e.g. "memory,sqlite")."""
+    tiers: List[PathwayCache] = []
+    for name in [n.strip().lower() for n in config.pathway_cache_backends.split(",") if n.strip()]:
+        if name == "memory":
+            tiers.append(MemoryPathwayCache(maxsize=config.pathway_cache_size, ttl=config.pathway_cache_ttl))
+        elif name == "sqlite":
+            tiers.append(SqlitePathwayCache(
+                config.pathway_cache_path, maxsize=config.pathway_cache_size, ttl=config.pathway_cache_ttl
+            ))
+        elif name == "firestore" and db is not None:
+            tiers.append(FirestorePathwayCache(db, ttl=config.pathway_cache_ttl))
+    if not tiers:
+        tiers.append(MemoryPathwayCache(maxsize=config.pathway_cache_size, ttl=config.pathway_cache_ttl))
+    return tiers[0] if len(tiers) == 1 else TieredPathwayCache(tiers)
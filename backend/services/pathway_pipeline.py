@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+from ..config import AppConfig
+from ..content_catalog import build_schedule_resources, get_curated_sections
+from ..db import Database, fa_firestore
+from ..pathway_storage import decode_plan, encode_plan
+from .gemini_client import GeminiClient, plan_days
+from .pathway_repository import PathwayRepository
+from .pathway_schema import chunk_ranges
+from .single_flight import SingleFlight
+
+
+# Concurrent fills of the same days of one pathway share a single generation
+_fills = SingleFlight()
+
+
+def _language(questionnaire: Dict[str, Any]) -> str:
+    return str(questionnaire.get("programmingLanguage", "python"))
+
+
+def _enrich(language: str, daily: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Day-specific resources from the memoized catalog; no model involved
+    resources = build_schedule_resources(language, daily)
+    return [{**day, "resources": links} for day, links in zip(daily, resources)]
+
+
+def _store_pathway(
+    db: Database,
+    pathways: PathwayRepository,
+    cfg: AppConfig,
+    user_uid: str,
+    questionnaire: Dict[str, Any],
+    plan: Dict[str, Any],
+    day_count: int,
+    user_email: Optional[str] = None,
+    user_name: Optional[str] = None,
+    fill: Optional[Dict[str, Any]] = None,
+) -> str:
+    user_doc_ref = db.users.document(user_uid)
+    record = {
+        "questionnaire": questionnaire,
+        # Summary fields so listings never need the plan blob
+        "title": plan["title"],
+        "dayCount": day_count,
+        "plan": encode_plan(plan, _language(questionnaire), compress_threshold=cfg.pathway_compress_threshold),
+        "progress": {"completedItemIds": []},
+        # Plain value (unlike createdAt) so cached records can tell which day the user is on
+        "startDate": datetime.now(timezone.utc).date().isoformat(),
+        "createdAt": fa_firestore.SERVER_TIMESTAMP,
+        "updatedAt": fa_firestore.SERVER_TIMESTAMP,
+    }
+    if fill:
+        record["fill"] = fill
+    # Pathway record and user upsert go out as one atomic commit
+    pathway_ref = user_doc_ref.collection("pathways").document()
+    batch = db.batch()
+    batch.set(pathway_ref, record)
+    # Ensure user document exists (doc id = uid) and point it at the new pathway instead of
+    # duplicating the plan; drop any legacy snapshot
+    batch.set(
+        user_doc_ref,
+        {
+            "email": user_email,
+            "name": user_name or "User",
+            "profileComplete": True,
+            "activePathwayId": pathway_ref.id,
+            "currentPathway": fa_firestore.DELETE_FIELD,
+            "updatedAt": fa_firestore.SERVER_TIMESTAMP,
+            "createdAt": fa_firestore.SERVER_TIMESTAMP,
+        },
+        merge=True,
+    )
+    batch.commit()
+    pathways.record_created(user_uid, pathway_ref.id, record)
+    return pathway_ref.id
+
+
+def create_pathway(
+    db: Database,
+    gemini: GeminiClient,
+    pathways: PathwayRepository,
+    cfg: AppConfig,
+    user_uid: str,
+    questionnaire: Dict[str, Any],
+    user_email: Optional[str] = None,
+    user_name: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Generate, enrich and store a pathway; returns `(pathway_id, plan)`.
+
+    Needs no request context, so it runs both inline in `/generate` and on the
+    background job workers.
+    """
+    # Generate schedule/title via LLM
+    plan_llm = gemini.generate_pathway(questionnaire, user_id=user_uid)
+
+    # Enrich each day with day-specific resources
+    enriched_daily = _enrich(_language(questionnaire), list((plan_llm.get("schedule") or {}).get("daily", [])))
+
+    # Replace sections with curated content based on combination
+    plan = {
+        "title": plan_llm.get("title") or "DSA Pathway",
+        "schedule": {"daily": enriched_daily},
+        "sections": get_curated_sections(questionnaire),
+    }
+    pathway_id = _store_pathway(
+        db, pathways, cfg, user_uid, questionnaire, plan, len(enriched_daily),
+        user_email=user_email, user_name=user_name,
+    )
+    return pathway_id, plan
+
+
+def create_pathway_progressive(
+    db: Database,
+    gemini: GeminiClient,
+    pathways: PathwayRepository,
+    cfg: AppConfig,
+    user_uid: str,
+    questionnaire: Dict[str, Any],
+    user_email: Optional[str] = None,
+    user_name: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any], List[int]]:
+    """Store a pathway with only its first days written; returns `(pathway_id, plan, pending days)`.
+
+    One small model call gives the title, a weekly outline and the first
+    `pathway_progressive_days` days; the curated sections need no model. The
+    outline is kept on the record (`fill`) so `fill_pathway_days` can write the
+    rest later. Plans shorter than `pathway_progressive_min_days` (or every plan,
+    when that is 0), a cached full plan, or no model at all go through `create_pathway`.
+    """
+    head = None
+    min_days = cfg.pathway_progressive_min_days
+    if 0 < min_days <= plan_days(questionnaire) and gemini.cached_pathway(questionnaire) is None:
+        head = gemini.generate_pathway_head(questionnaire, cfg.pathway_progressive_days, user_id=user_uid)
+    if head is None:
+        pathway_id, plan = create_pathway(
+            db, gemini, pathways, cfg, user_uid, questionnaire, user_email=user_email, user_name=user_name
+        )
+        return pathway_id, plan, []
+
+    plan = {
+        "title": head["title"],
+        "schedule": {"daily": _enrich(_language(questionnaire), head["daily"])},
+        "sections": get_curated_sections(questionnaire),
+    }
+    ready = {day["day"] for day in head["daily"]}
+    pending = [n for n in range(1, head["dayCount"] + 1) if n not in ready]
+    fill = {"status": "pending", "outline": head["outline"]} if pending else None
+    pathway_id = _store_pathway(
+        db, pathways, cfg, user_uid, questionnaire, plan, head["dayCount"],
+        user_email=user_email, user_name=user_name, fill=fill,
+    )
+    return pathway_id, plan, pending
+
+
+def pending_days(record: Dict[str, Any]) -> List[int]:
+    """Day numbers of a progressively delivered pathway that are not written yet."""
+    if (record.get("fill") or {}).get("status") != "pending":
+        return []
+    daily = (decode_plan(record.get("plan")).get("schedule") or {}).get("daily", [])
+    ready = {day.get("day") for day in daily if isinstance(day, dict)}
+    return [n for n in range(1, int(record.get("dayCount") or 0) + 1) if n not in ready]
+
+
+def _merge_days(
+    db: Database,
+    gemini: GeminiClient,
+    pathways: PathwayRepository,
+    cfg: AppConfig,
+    user_uid: str,
+    pathway_id: str,
+    new_days: List[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    ref = pathways.doc_ref(user_uid, pathway_id)
+
+    @fa_firestore.transactional
+    def merge(transaction: Any) -> Optional[Dict[str, Any]]:
+        snap = ref.get(transaction=transaction)
+        if not snap.exists:
+            return None
+        data = snap.to_dict() or {}
+        plan = decode_plan(data.get("plan"))
+        by_day = {
+            day["day"]: day
+            for day in (plan.get("schedule") or {}).get("daily", [])
+            if isinstance(day, dict) and isinstance(day.get("day"), int)
+        }
+        for day in new_days:
+            # The background fill and on-demand requests may race: whoever stored a day first wins
+            by_day.setdefault(day["day"], day)
+        plan["schedule"] = {"daily": [by_day[n] for n in sorted(by_day)]}
+        total = int(data.get("dayCount") or len(by_day))
+        done = all(n in by_day for n in range(1, total + 1))
+        fill = {**(data.get("fill") or {}), "status": "done" if done else "pending"}
+        language = _language(data.get("questionnaire") or {})
+        transaction.update(ref, {
+            "plan": encode_plan(plan, language, compress_threshold=cfg.pathway_compress_threshold),
+            "fill": fill,
+            "updatedAt": fa_firestore.SERVER_TIMESTAMP,
+        })
+        return {**data, "plan": plan, "fill": fill}
+
+    updated = merge(db.transaction())
+    if updated is None:
+        return None
+    pathways.record_updated(user_uid, pathway_id, updated)
+    if updated["fill"]["status"] == "done":
+        # The whole schedule exists now: later identical questionnaires get it from the cache
+        plan = updated["plan"]
+        gemini.prime_pathway(updated.get("questionnaire") or {}, {
+            "title": plan.get("title"),
+            "schedule": {"daily": [{k: v for k, v in day.items() if k != "resources"} for day in plan["schedule"]["daily"]]},
+            "sections": plan.get("sections") or {},
+        })
+    return updated
+
+
+def fill_pathway_days(
+    db: Database,
+    gemini: GeminiClient,
+    pathways: PathwayRepository,
+    cfg: AppConfig,
+    user_uid: str,
+    pathway_id: str,
+    numbers: Optional[List[int]] = None,
+    user_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Write pending days (all of them, or those in `numbers`) of a progressive pathway.
+
+    Returns the updated record (plan decoded), the unchanged record if there was
+    nothing to do or the model produced nothing, or None if the pathway is gone.
+    Runs on the job workers for the background fill and inline for `/days`, which
+    passes `user_id` so the request is charged to the user's rate limit. Days are
+    stored one round of chunk calls at a time, so early days land before the rest.
+    """
+    found = pathways.get(user_uid, pathway_id)
+    if found is None:
+        return None
+    data = found["data"]
+    pending = pending_days(data)
+    wanted = pending if numbers is None else [n for n in numbers if n in set(pending)]
+    if not wanted:
+        return data
+    return _fills.do(
+        (user_uid, found["id"], tuple(wanted)),
+        lambda: _fill(db, gemini, pathways, cfg, user_uid, found["id"], data, wanted, user_id),
+    )
+
+
+def _fill(
+    db: Database,
+    gemini: GeminiClient,
+    pathways: PathwayRepository,
+    cfg: AppConfig,
+    user_uid: str,
+    pathway_id: str,
+    data: Dict[str, Any],
+    wanted: List[int],
+    user_id: Optional[str],
+) -> Dict[str, Any]:
+    questionnaire = data.get("questionnaire") or {}
+    title = str((data.get("plan") or {}).get("title") or "")
+    outline = str((data.get("fill") or {}).get("outline") or "")
+    per_round = max(1, cfg.pathway_chunk_days) * max(1, cfg.pathway_chunk_workers)
+    for index, numbers in enumerate(chunk_ranges(wanted, per_round)):
+        # One charge per request, not per round
+        days = gemini.generate_days(questionnaire, numbers, title, outline, user_id=user_id if index == 0 else None)
+        if not days:
+            continue
+        updated = _merge_days(db, gemini, pathways, cfg, user_uid, pathway_id, _enrich(_language(questionnaire), days))
+        if updated is None:
+            break
+        data = updated
+    return data
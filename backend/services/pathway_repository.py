@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from ..db import Database, fa_firestore
+from ..pathway_storage import decode_plan
+
+
+_MISSING = object()
+
+
+def _cacheable(record: Dict[str, Any]) -> Dict[str, Any]:
+    # Server-side sentinels (SERVER_TIMESTAMP, DELETE_FIELD) are not real values
+    data = {k: v for k, v in record.items() if k not in ("createdAt", "updatedAt")}
+    return _decoded(data)
+
+
+def _decoded(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Cache the expanded plan so compact/compressed storage is decoded once per load
+    if "plan" in data:
+        data = {**data, "plan": decode_plan(data.get("plan"))}
+    return data
+
+
+class PathwayRepository:
+    """Read path for a user's newest pathway with a per-uid, write-through cache.
+
+    Each worker keeps its own cache, so entries carry a short TTL to bound
+    staleness when another worker writes for the same user.
+    """
+
+    def __init__(self, db: Database, maxsize: int = 2048, ttl: float = 60) -> None:
+        self._db = db
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key: Tuple[str, str]) -> Any:
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def _store(self, key: Tuple[str, str], value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def latest(self, uid: str) -> Optional[Dict[str, Any]]:
+        """Active `users/{uid}/pathways` doc as `{"id": ..., "data": {...}}`, or None.
+
+        Follows the `activePathwayId` pointer on the user doc; users created before the
+        pointer existed fall back to the newest-by-createdAt query once and get backfilled.
+        """
+        key = (uid, "latest")
+        cached = self._cached(key)
+        if cached is not _MISSING:
+            return cached
+        user_ref = self._db.users.document(uid)
+        snap = user_ref.get()
+        user_data = (snap.to_dict() or {}) if snap.exists else {}
+        self._store((uid, "snapshot"), user_data.get("currentPathway") or None)
+
+        value = None
+        pathway_id = user_data.get("activePathwayId")
+        if pathway_id:
+            doc = self.doc_ref(uid, pathway_id).get()
+            if doc.exists:
+                value = {"id": doc.id, "data": _decoded(doc.to_dict() or {})}
+        if value is None:
+            query = user_ref.collection("pathways").order_by(
+                "createdAt", direction=fa_firestore.Query.DESCENDING
+            ).limit(1)
+            docs = list(query.stream())
+            if docs:
+                value = {"id": docs[0].id, "data": _decoded(docs[0].to_dict() or {})}
+                self._db.set_later(user_ref, {"activePathwayId": docs[0].id}, merge=True)
+        self._store(key, value)
+        return value
+
+    def active_id(self, uid: str) -> Optional[str]:
+        """Id of the active pathway without loading its plan when the pointer is set."""
+        with self._lock:
+            current = self._cache.get((uid, "latest"))
+        if current:
+            return current["id"]
+        snap = self._db.users.document(uid).get()
+        pathway_id = (snap.to_dict() or {}).get("activePathwayId") if snap.exists else None
+        if pathway_id:
+            return pathway_id
+        latest = self.latest(uid)
+        return latest["id"] if latest else None
+
+    def snapshot(self, uid: str) -> Optional[Dict[str, Any]]:
+        """Legacy `currentPathway` snapshot on the user doc, or None.
+
+        New pathways only store the `activePathwayId` pointer; this covers users whose
+        plan predates the pathways subcollection.
+        """
+        key = (uid, "snapshot")
+        cached = self._cached(key)
+        if cached is not _MISSING:
+            return cached
+        snap = self._db.users.document(uid).get()
+        value = None
+        if snap.exists:
+            value = (snap.to_dict() or {}).get("currentPathway") or None
+        self._store(key, value)
+        return value
+
+    def get(self, uid: str, pathway_id: str) -> Optional[Dict[str, Any]]:
+        """A specific pathway as `{"id": ..., "data": {...}}`; "current" means the active one."""
+        if pathway_id == "current":
+            return self.latest(uid)
+        with self._lock:
+            latest = self._cache.get((uid, "latest"))
+        if latest and latest["id"] == pathway_id:
+            return latest
+        doc = self.doc_ref(uid, pathway_id).get()
+        if not doc.exists:
+            return None
+        return {"id": doc.id, "data": _decoded(doc.to_dict() or {})}
+
+    def doc_ref(self, uid: str, pathway_id: str):
+        return self._db.users.document(uid).collection("pathways").document(pathway_id)
+
+    # Write-through hooks called after the corresponding Firestore write succeeds
+    def record_created(self, uid: str, pathway_id: str, record: Dict[str, Any]) -> None:
+        self._store((uid, "latest"), {"id": pathway_id, "data": _cacheable(record)})
+
+    def record_updated(self, uid: str, pathway_id: str, record: Dict[str, Any]) -> None:
+        """Replace the cached record if it is the active pathway (e.g. after days were filled in)."""
+        with self._lock:
+            current = self._cache.get((uid, "latest"))
+            if current and current.get("id") == pathway_id:
+                self._cache[(uid, "latest")] = {"id": pathway_id, "data": _cacheable(record)}
+
+    def record_progress(self, uid: str, pathway_id: str, item_ids: List[str]) -> Optional[List[str]]:
+        """Union `item_ids` into the cached progress; returns the completed list, or None if not cached."""
+        with self._lock:
+            current = self._cache.get((uid, "latest"))
+            if not current or current.get("id") != pathway_id:
+                return None
+            data = copy.copy(current["data"])
+            progress = dict(data.get("progress") or {})
+            completed = list(dict.fromkeys([*progress.get("completedItemIds", []), *item_ids]))
+            progress["completedItemIds"] = completed
+            data["progress"] = progress
+            self._cache[(uid, "latest")] = {"id": pathway_id, "data": data}
+            return completed
+
+    def invalidate(self, uid: str) -> None:
+        with self._lock:
+            self._cache.pop((uid, "latest"), None)
+            self._cache.pop((uid, "snapshot"), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._cache),
+            }
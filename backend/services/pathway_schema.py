@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Response schemas for Gemini's JSON output mode (OpenAPI subset, upper-case types)
+_STRING = {"type": "STRING"}
+DAY_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "day": {"type": "INTEGER"},
+        "focus": _STRING,
+        "time": _STRING,
+        "details": _STRING,
+        "topics": {"type": "ARRAY", "items": _STRING},
+    },
+    "required": ["day", "focus", "topics"],
+}
+_ITEMS = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"id": _STRING, "title": _STRING, "url": _STRING},
+        "required": ["id", "title"],
+    },
+}
+_SECTIONS = {
+    "type": "OBJECT",
+    "properties": {"codingProblems": _ITEMS, "youtubeReferences": _ITEMS, "theoryContent": _ITEMS},
+}
+PATHWAY_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "title": _STRING,
+        "schedule": {
+            "type": "OBJECT",
+            "properties": {"daily": {"type": "ARRAY", "items": DAY_SCHEMA}},
+            "required": ["daily"],
+        },
+        "sections": _SECTIONS,
+    },
+    "required": ["title", "schedule", "sections"],
+}
+DAYS_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {"daily": {"type": "ARRAY", "items": DAY_SCHEMA}},
+    "required": ["daily"],
+}
+# Chunked generation: a small outline call, then days and sections in parallel
+OUTLINE_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "title": _STRING,
+        "weeks": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"week": {"type": "INTEGER"}, "theme": _STRING},
+                "required": ["week", "theme"],
+            },
+        },
+    },
+    "required": ["title", "weeks"],
+}
+# Progressive delivery: the outline plus the first days in one small call
+HEAD_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "title": _STRING,
+        "weeks": OUTLINE_SCHEMA["properties"]["weeks"],
+        "daily": {"type": "ARRAY", "items": DAY_SCHEMA},
+    },
+    "required": ["title", "weeks", "daily"],
+}
+SECTIONS_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {"sections": _SECTIONS},
+    "required": ["sections"],
+}
+
+SECTION_KEYS = ("codingProblems", "youtubeReferences", "theoryContent")
+
+_LEADING_FENCE_RE = re.compile(r"^\s*```[A-Za-z0-9_-]*\s*")
+_TRAILING_FENCE_RE = re.compile(r"\s*```\s*$")
+_DECODER = json.JSONDecoder()
+
+
+def strip_fences(text: str) -> str:
+    return _TRAILING_FENCE_RE.sub("", _LEADING_FENCE_RE.sub("", text or "")).strip()
+
+
+def _key_end(text: str, key: str, start: int = 0) -> int:
+    match = re.compile(r'"%s"\s*:' % re.escape(key)).search(text, start)
+    return match.end() if match else -1
+
+
+def _scan_array(text: str, start: int) -> List[Any]:
+    """Complete elements of the JSON array opening at or after `start`.
+
+    Stops quietly at the first element that does not decode, which is where a
+    truncated reply was cut off.
+    """
+    pos = text.find("[", start)
+    if pos < 0:
+        return []
+    pos += 1
+    items: List[Any] = []
+    while pos < len(text):
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            value, pos = _DECODER.raw_decode(text, pos)
+        except ValueError:
+            break
+        items.append(value)
+    return items
+
+
+def _scan_string(text: str, key: str) -> Optional[str]:
+    pos = _key_end(text, key)
+    if pos < 0:
+        return None
+    while pos < len(text) and text[pos] in " \t\r\n":
+        pos += 1
+    try:
+        value, _ = _DECODER.raw_decode(text, pos)
+    except ValueError:
+        return None
+    return value if isinstance(value, str) else None
+
+
+def parse_pathway(text: str) -> Tuple[Dict[str, Any], bool]:
+    """Best-effort parse of a pathway reply; returns `(data, complete)`.
+
+    Well-formed JSON (fenced or followed by chatter) parses as a whole. Otherwise
+    the title, every complete day entry and every complete section item before
+    the point of truncation are recovered and `complete` is False.
+    """
+    cleaned = strip_fences(text)
+    start = cleaned.find("{")
+    if start >= 0:
+        try:
+            data, _ = _DECODER.raw_decode(cleaned, start)
+            if isinstance(data, dict):
+                return data, True
+        except ValueError:
+            pass
+    daily_at = _key_end(cleaned, "daily")
+    weeks_at = _key_end(cleaned, "weeks")
+    sections: Dict[str, Any] = {}
+    for key in SECTION_KEYS:
+        pos = _key_end(cleaned, key)
+        if pos >= 0:
+            sections[key] = [it for it in _scan_array(cleaned, pos) if isinstance(it, dict)]
+    data = {
+        "title": _scan_string(cleaned, "title"),
+        "schedule": {"daily": _scan_array(cleaned, daily_at) if daily_at >= 0 else []},
+        "sections": sections,
+    }
+    if weeks_at >= 0:
+        data["weeks"] = _scan_array(cleaned, weeks_at)
+    return data, False
+
+
+def plan_daily(data: Dict[str, Any]) -> Any:
+    schedule = data.get("schedule")
+    daily = schedule.get("daily") if isinstance(schedule, dict) else None
+    # Days-only replies ({"daily": [...]}) carry the list at the top level
+    return daily if daily is not None else data.get("daily")
+
+
+def outline_text(data: Dict[str, Any]) -> str:
+    weeks = data.get("weeks") if isinstance(data.get("weeks"), list) else []
+    return "\n".join(
+        f"Week {w.get('week')}: {w.get('theme')}" for w in weeks if isinstance(w, dict) and w.get("theme")
+    )
+
+
+def chunk_ranges(numbers: Sequence[int], size: int) -> List[List[int]]:
+    """`numbers` (in order) split into runs of at most `size`."""
+    size = max(1, size)
+    numbers = list(numbers)
+    return [numbers[i : i + size] for i in range(0, len(numbers), size)]
+
+
+def collect_days(daily: Any, numbers: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Usable day entries keyed by day number.
+
+    `numbers` are the days that were asked for, in order; an entry whose own `day`
+    is missing or not one of them takes the number at its position instead.
+    """
+    wanted = set(numbers)
+    by_day: Dict[int, Dict[str, Any]] = {}
+    if not isinstance(daily, list):
+        return by_day
+    for position, src in enumerate(daily):
+        if not isinstance(src, dict):
+            continue
+        topics = src.get("topics")
+        if not (isinstance(topics, list) and topics) and not src.get("focus"):
+            continue
+        number = src.get("day")
+        if not isinstance(number, int) or number not in wanted or number in by_day:
+            number = numbers[position] if position < len(numbers) else None
+        if number is not None and number not in by_day:
+            by_day[number] = src
+    return by_day
+
+
+def normalize_day(number: int, src: Optional[Dict[str, Any]], hours: Any) -> Dict[str, Any]:
+    src = src or {}
+    topics = src.get("topics")
+    return {
+        "day": number,
+        "focus": str(src.get("focus") or f"Study Day {number}"),
+        "time": str(src.get("time") or hours),
+        "details": str(src.get("details") or ""),
+        "topics": [str(t) for t in topics] if isinstance(topics, list) else [],
+    }
+
+
+class GenerationStats:
+    """How pathway replies were used: whole, repaired from a partial parse, or replaced by the stub."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.full = 0
+        self.repaired = 0
+        self.fallback = 0
+        self.repair_calls = 0
+        self.days_repaired = 0
+        self.days_padded = 0
+        self.chunked = 0
+        self.chunk_calls = 0
+
+    def record(
+        self,
+        outcome: str,
+        repair_calls: int = 0,
+        days_repaired: int = 0,
+        days_padded: int = 0,
+        chunk_calls: int = 0,
+    ) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.repair_calls += repair_calls
+            self.days_repaired += days_repaired
+            self.days_padded += days_padded
+            if chunk_calls:
+                self.chunked += 1
+                self.chunk_calls += chunk_calls
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.full + self.repaired + self.fallback
+            rate = (lambda n: round(n / total, 4) if total else 0.0)
+            return {
+                "full": self.full,
+                "repaired": self.repaired,
+                "fallback": self.fallback,
+                "fullRate": rate(self.full),
+                "repairRate": rate(self.repaired),
+                "fallbackRate": rate(self.fallback),
+                "repairCalls": self.repair_calls,
+                "daysRepaired": self.days_repaired,
+                "daysPadded": self.days_padded,
+                "chunked": self.chunked,
+                "chunkCalls": self.chunk_calls,
+            }
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from ..pathway_storage import pathway_version
+from .response_cache import context_fingerprint
+
+
+_SECTION_LABELS = (
+    ("codingProblems", "coding problems"),
+    ("youtubeReferences", "videos"),
+    ("theoryContent", "theory"),
+)
+_UPCOMING_DAYS = 3
+_RECENT_ITEMS = 5
+
+
+def _start_date(data: Dict[str, Any]) -> Optional[date]:
+    value = data.get("startDate") or data.get("createdAt")
+    try:
+        if isinstance(value, str):
+            return date.fromisoformat(value[:10])
+        if hasattr(value, "to_datetime"):
+            value = value.to_datetime()
+        if isinstance(value, datetime):
+            return value.astimezone(timezone.utc).date()
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def chat_context(latest: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Model context for a `PathwayRepository.latest` record.
+
+    `version` changes whenever the plan or its progress does, so it can key caches
+    without hashing the plan; `currentDay` is counted from the pathway's start date.
+    """
+    if not latest:
+        return None
+    data = latest.get("data") or {}
+    plan = data.get("plan") or {}
+    progress = data.get("progress") or {}
+    day_count = len((plan.get("schedule") or {}).get("daily", []))
+    current_day = 1
+    started = _start_date(data)
+    if started is not None:
+        current_day = (datetime.now(timezone.utc).date() - started).days + 1
+    current_day = max(1, min(current_day, day_count or 1))
+    return {
+        "plan": plan,
+        "progress": progress,
+        "currentDay": current_day,
+        "version": pathway_version(str(latest.get("id")), data),
+    }
+
+
+def _day_line(day: Dict[str, Any], label: str) -> str:
+    topics = ", ".join(str(t) for t in (day.get("topics") or []))
+    focus = str(day.get("focus") or "").strip()
+    line = f"{label} Day {day.get('day')}"
+    if focus:
+        line += f" ({focus})"
+    return f"{line}: {topics}" if topics else line
+
+
+class PromptContextBuilder:
+    """Compact, size-capped plan summary for chat prompts.
+
+    Instead of the whole plan (every resource URL and section item) the prompt gets
+    the title, today's and the next few days' topics, completion per section and the
+    most recently completed items, dropping the least useful lines first once
+    `max_chars` is reached. Results are memoized per context version and day.
+    """
+
+    def __init__(self, max_chars: int = 2000, maxsize: int = 1024) -> None:
+        self._max_chars = max_chars
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, context: Dict[str, Any]) -> Tuple[str, Any]:
+        version = context.get("version") or context_fingerprint(context)
+        return (str(version), context.get("currentDay"))
+
+    def build(self, context: Optional[Dict[str, Any]]) -> str:
+        if not context:
+            return ""
+        key = self._key(context)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        text = self._render(context)
+        with self._lock:
+            self._cache[key] = text
+        return text
+
+    def _render(self, context: Dict[str, Any]) -> str:
+        plan = context.get("plan") or {}
+        if not isinstance(plan, dict):
+            return str(plan)[: self._max_chars]
+        daily = [d for d in (plan.get("schedule") or {}).get("daily", []) if isinstance(d, dict)]
+        sections = plan.get("sections") or {}
+        completed = list((context.get("progress") or {}).get("completedItemIds", []))
+        done = set(completed)
+        current = int(context.get("currentDay") or 1)
+
+        # In priority order; lines further down are dropped first when over budget
+        lines: List[str] = [f"Plan: {plan.get('title') or 'DSA Pathway'} ({len(daily)} days, on day {current})"]
+        upcoming = [d for d in daily if isinstance(d.get("day"), int) and d["day"] >= current]
+        if upcoming:
+            lines.append(_day_line(upcoming[0], "Today:"))
+        counts = []
+        titles: Dict[str, str] = {}
+        for key, label in _SECTION_LABELS:
+            items = [it for it in (sections.get(key) or []) if isinstance(it, dict)]
+            for it in items:
+                if it.get("id"):
+                    titles[it["id"]] = str(it.get("title") or it["id"])
+            if items:
+                counts.append(f"{label} {sum(1 for it in items if it.get('id') in done)}/{len(items)}")
+        if counts:
+            lines.append("Completed: " + ", ".join(counts))
+        for day in upcoming[1 : 1 + _UPCOMING_DAYS]:
+            lines.append(_day_line(day, "Upcoming:"))
+        recent = [titles.get(item_id, item_id) for item_id in completed[-_RECENT_ITEMS:]]
+        if recent:
+            lines.append("Recently completed: " + "; ".join(reversed(recent)))
+
+        while len(lines) > 1 and len("\n".join(lines)) > self._max_chars:
+            lines.pop()
+        return "\n".join(lines)[: self._max_chars]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._cache),
+            }
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from cachetools import TTLCache
+
+
+class RateLimited(Exception):
+    """Raised when a model call is refused; `retry_after` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self) -> float:
+        """Take one token. Returns 0 on success, else seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate if self._rate > 0 else 60.0
+
+    def refund(self) -> None:
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + 1)
+
+
+class ModelLimiter:
+    """Global and per-user token buckets plus a cap on in-flight model calls.
+
+    A call that finds no free slot waits at most `max_wait` seconds and is then
+    refused, so excess traffic gets a fast 429 instead of queueing behind a slow
+    upstream. A rate of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 0,
+        global_burst: float = 0,
+        user_rate: float = 0,
+        user_burst: float = 0,
+        max_inflight: int = 0,
+        max_wait: float = 2.0,
+    ) -> None:
+        self._global = TokenBucket(global_rate, max(1.0, global_burst or global_rate)) if global_rate > 0 else None
+        self._user_rate = user_rate
+        self._user_burst = max(1.0, user_burst or user_rate)
+        # Idle users' buckets are full again after capacity/rate seconds, so they can be dropped
+        ttl = max(60.0, self._user_burst / user_rate) if user_rate > 0 else 60.0
+        self._user_buckets: TTLCache = TTLCache(maxsize=10_000, ttl=ttl)
+        self._user_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_inflight) if max_inflight > 0 else None
+        self._max_wait = max_wait
+        self._stats_lock = threading.Lock()
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"global": 0, "user": 0, "concurrency": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _user_bucket(self, user_id: str) -> TokenBucket:
+        with self._user_lock:
+            bucket = self._user_buckets.get(user_id)
+            if bucket is None:
+                bucket = TokenBucket(self._user_rate, self._user_burst)
+            # Re-insert to refresh the TTL on every use
+            self._user_buckets[user_id] = bucket
+            return bucket
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        with self._stats_lock:
+            self.rejected[reason] += 1
+        raise RateLimited(reason, retry_after)
+
+    def acquire(self, user_id: Optional[str] = None) -> None:
+        user_bucket = self._user_bucket(user_id) if user_id and self._user_rate > 0 else None
+        if user_bucket is not None:
+            wait = user_bucket.try_take()
+            if wait:
+                self._reject("user", wait)
+        if self._global is not None:
+            wait = self._global.try_take()
+            if wait:
+                if user_bucket is not None:
+                    user_bucket.refund()
+                self._reject("global", wait)
+        if self._slots is not None:
+            started = time.monotonic()
+            with self._stats_lock:
+                self.waiting += 1
+            try:
+                ok = self._slots.acquire(timeout=self._max_wait)
+            finally:
+                waited = time.monotonic() - started
+                with self._stats_lock:
+                    self.waiting -= 1
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+            if not ok:
+                # Nothing was sent upstream, so give the rate tokens back
+                if user_bucket is not None:
+                    user_bucket.refund()
+                if self._global is not None:
+                    self._global.refund()
+                self._reject("concurrency", self._max_wait)
+        with self._stats_lock:
+            self.inflight += 1
+            self.admitted += 1
+
+    def charge(self, user_id: str) -> None:
+        """Take one of the user's tokens for work whose model calls run on process-wide slots."""
+        if self._user_rate <= 0:
+            return
+        wait = self._user_bucket(user_id).try_take()
+        if wait:
+            self._reject("user", wait)
+
+    def release(self) -> None:
+        with self._stats_lock:
+            self.inflight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def slot(self, user_id: Optional[str] = None) -> Iterator[None]:
+        self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            waits = self.admitted + self.rejected["concurrency"]
+            return {
+                "inflight": self.inflight,
+                "queueDepth": self.waiting,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "avgWaitMs": round(1000 * self._wait_total / waits, 2) if waits else 0.0,
+                "maxWaitMs": round(1000 * self._wait_max, 2),
+            }
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import struct
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+from cachetools import TTLCache
+
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_TOKEN_RE = re.compile(r"[a-z0-9+#']+")
+_IRREGULAR_NOT = {"cannot": "can", "can't": "can", "won't": "will", "shan't": "shall"}
+# Flip a question's meaning, so never stopwords and never ignored when matching
+_NEGATIONS = frozenset("not no never without nor".split())
+_STOPWORDS = frozenset(
+    "a an the and or of to in on for with about is are be do does did can could should would will "
+    "i me my we you your it this that these those how what why when which please explain tell show "
+    "give help need want some any more".split()
+)
+_MERSENNE = (1 << 61) - 1
+
+
+def normalize_text(text: str) -> str:
+    words: List[str] = []
+    for token in _TOKEN_RE.findall(str(text or "").lower().replace("\u2019", "'")):
+        # "don't" -> "do not", "cannot" -> "can not": keep the negation as its own word
+        if token in _IRREGULAR_NOT:
+            words += [_IRREGULAR_NOT[token], "not"]
+        elif token.endswith("n't"):
+            words += _WORD_RE.findall(token[:-3]) + ["not"]
+        else:
+            words += _WORD_RE.findall(token)
+    return " ".join(words)
+
+
+def _shingles(normalized: str) -> FrozenSet[str]:
+    # Content words only: short questions differ mostly in their stopwords
+    words = [w for w in normalized.split() if w not in _STOPWORDS]
+    return frozenset(words or normalized.split())
+
+
+def context_fingerprint(context: Union[str, Dict[str, Any], None]) -> str:
+    """Short digest of what the answer depends on.
+
+    Pass the prompt context text the model actually sees, so answers are shared
+    exactly when the prompts match. A raw context dict is hashed on everything
+    the prompt is built from (plan, completed items in order, current day).
+    Content only, never the pathway id/version, so users with the same plan and
+    progress share answers.
+    """
+    if not context:
+        return "-"
+    if isinstance(context, str):
+        raw = context
+    else:
+        progress = context.get("progress") or {}
+        compact = {
+            "plan": context.get("plan"),
+            "p": list(progress.get("completedItemIds", [])) if isinstance(progress, dict) else [],
+            "c": context.get("currentDay"),
+        }
+        raw = json.dumps(compact, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class _MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 7) -> None:
+        params = hashlib.sha256(f"minhash-{seed}".encode()).digest() * ((num_perm * 16) // 32 + 1)
+        self._perms: List[Tuple[int, int]] = []
+        for i in range(num_perm):
+            a, b = struct.unpack_from("<QQ", params, i * 16)
+            self._perms.append(((a % (_MERSENNE - 1)) + 1, b % _MERSENNE))
+
+    def signature(self, shingles: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles]
+        if not hashes:
+            return tuple(0 for _ in self._perms)
+        return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms)
+
+
+class ResponseCache:
+    """Exact + near-duplicate cache for model replies.
+
+    Entries are keyed by (context fingerprint, normalized text), where the context
+    is the prompt context text (or a raw context dict). Paraphrases are
+    found through a MinHash/LSH index over content words within the same context
+    and accepted only if their exact Jaccard similarity reaches `threshold` and
+    both questions carry the same negations ("when should I not ..." never
+    answers "when should I ...").
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: float = 6 * 60 * 60,
+        threshold: float = 0.75,
+        num_perm: int = 64,
+        bands: int = 32,
+    ) -> None:
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[Tuple[str, str]]] = {}
+        self._threshold = threshold
+        self._hasher = _MinHasher(num_perm)
+        self._rows = max(1, num_perm // bands)
+        self._bands = num_perm // self._rows
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _band_keys(self, fingerprint: str, signature: Tuple[int, ...]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        return [
+            (fingerprint, band, signature[band * self._rows:(band + 1) * self._rows])
+            for band in range(self._bands)
+        ]
+
+    def get(self, text: str, context: Union[str, Dict[str, Any], None] = None) -> Optional[str]:
+        fingerprint = context_fingerprint(context)
+        normalized = normalize_text(text)
+        with self._lock:
+            entry = self._entries.get((fingerprint, normalized))
+            if entry is not None:
+                self.exact_hits += 1
+                return entry[0]
+        shingles = _shingles(normalized)
+        band_keys = self._band_keys(fingerprint, self._hasher.signature(shingles))
+        with self._lock:
+            candidates: Set[Tuple[str, str]] = set()
+            for band_key in band_keys:
+                candidates |= self._buckets.get(band_key, set())
+            best: Optional[str] = None
+            best_score = 0.0
+            for key in candidates:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                other = entry[1]
+                if shingles & _NEGATIONS != other & _NEGATIONS:
+                    continue
+                union = len(shingles | other)
+                score = len(shingles & other) / union if union else 0.0
+                if score >= self._threshold and score > best_score:
+                    best, best_score = entry[0], score
+            if best is not None:
+                self.near_hits += 1
+            else:
+                self.misses += 1
+            return best
+
+    def set(self, text: str, context: Union[str, Dict[str, Any], None], answer: str) -> None:
+        fingerprint = context_fingerprint(context)
+        normalized = normalize_text(text)
+        if not normalized or not answer:
+            return
+        shingles = _shingles(normalized)
+        band_keys = self._band_keys(fingerprint, self._hasher.signature(shingles))
+        key = (fingerprint, normalized)
+        with self._lock:
+            self._entries[key] = (answer, shingles)
+            for band_key in band_keys:
+                bucket = self._buckets.setdefault(band_key, set())
+                # Drop index entries whose cache entry expired or was evicted
+                bucket.difference_update([k for k in bucket if k not in self._entries])
+                bucket.add(key)
+            if len(self._buckets) > 8 * self._bands * (self._entries.maxsize or 1):
+                self._buckets = {
+                    k: {m for m in v if m in self._entries} for k, v in self._buckets.items()
+                }
+                self._buckets = {k: v for k, v in self._buckets.items() if v}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.exact_hits + self.near_hits + self.misses
+            return {
+                "exactHits": self.exact_hits,
+                "nearHits": self.near_hits,
+                "misses": self.misses,
+                "hitRate": round((self.exact_hits + self.near_hits) / total, 4) if total else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls with the same key.
+
+    Within a process, followers wait on the leader's in-flight call and share its
+    result. Across worker processes on one host, `host_lock` serializes leaders on
+    a per-key lock file so the second process can pick the result up from a shared
+    cache tier instead of generating it again. A process that cannot get the lock
+    within `lock_timeout` seconds (e.g. the holder is stuck) proceeds without it.
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None, lock_timeout: Optional[float] = None) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock_dir = lock_dir if lock_dir and fcntl is not None else None
+        if self._lock_dir:
+            os.makedirs(self._lock_dir, exist_ok=True)
+        self._lock_timeout = lock_timeout
+        self.leaders = 0
+        self.coalesced = 0
+        self.host_coalesced = 0
+        self.host_lock_timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    @contextlib.contextmanager
+    def host_lock(self, key: Hashable) -> Iterator[None]:
+        """Exclusive per-key lock shared by every process on the host (no-op if unavailable).
+
+        Gives up after `lock_timeout` seconds and runs the block uncoordinated.
+        """
+        if not self._lock_dir or fcntl is None:
+            yield
+            return
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        path = os.path.join(self._lock_dir, f"{digest}.lock")
+        with open(path, "a+") as fh:
+            if not self._acquire_file(fh.fileno()):
+                with self._lock:
+                    self.host_lock_timeouts += 1
+                yield
+                return
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _acquire_file(self, fd: int) -> bool:
+        if self._lock_timeout is None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            return True
+        deadline = time.monotonic() + self._lock_timeout
+        delay = 0.01
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.25)
+
+    def record_host_coalesced(self) -> None:
+        with self._lock:
+            self.host_coalesced += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "inFlight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "hostCoalesced": self.host_coalesced,
+                "hostLockTimeouts": self.host_lock_timeouts,
+            }
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Firestore rejects WriteBatch commits with more than 500 writes
+_FIRESTORE_BATCH_LIMIT = 500
+
+# Status codes of google.api_core errors worth retrying (409 is Aborted: contention)
+_TRANSIENT_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# (kind, target, data, merge) where kind is "set", "update" or "create"
+WriteOp = Tuple[str, Any, Dict[str, Any], bool]
+
+
+def _is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and code in _TRANSIENT_CODES
+
+
+def apply_op(batch: Any, op: WriteOp) -> None:
+    kind, target, data, merge = op
+    if kind == "set":
+        batch.set(target, data, merge=merge)
+    elif kind == "update":
+        batch.update(target, data)
+    else:
+        raise ValueError(f"Unknown write kind: {kind}")
+
+
+def _bind_document(op: WriteOp) -> WriteOp:
+    kind, target, data, merge = op
+    if kind != "create":
+        return op
+    # `target` is a collection: pick the auto-id once, so a retried batch rewrites
+    # the same document instead of adding a duplicate
+    return ("set", target.document(), data, False)
+
+
+class WriteBehindQueue:
+    """Bounded in-process queue that groups fire-and-forget writes into WriteBatch commits.
+
+    A batch is committed when it reaches `batch_size` writes or `flush_interval`
+    seconds after its first write. Transient errors are retried with jitter; a
+    permanent error (e.g. updating a deleted doc) splits the batch in halves until
+    the bad write is isolated and dropped alone. When the queue is full,
+    `submit` waits up to `put_timeout` and then commits the write on the caller's
+    thread, which pushes back on producers instead of dropping data. Pending
+    writes are flushed at interpreter exit.
+
+    `client` only needs a `batch()` method, so an in-memory fake works in tests.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_queue: int = 10_000,
+        batch_size: int = _FIRESTORE_BATCH_LIMIT,
+        flush_interval: float = 0.25,
+        max_retries: int = 3,
+        put_timeout: float = 0.05,
+    ) -> None:
+        self._client = client
+        self._queue: "queue.Queue[Optional[WriteOp]]" = queue.Queue(maxsize=max_queue)
+        self._batch_size = max(1, min(batch_size, _FIRESTORE_BATCH_LIMIT))
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._put_timeout = put_timeout
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._idle = threading.Condition()
+        self._pending = 0
+        # Counters are bumped by request threads (inline commits) and the flusher
+        self._stats_lock = threading.Lock()
+        self.committed = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.inline = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                # Started lazily so the thread lives in the process that serves requests
+                self._thread = threading.Thread(target=self._run, name="firestore-write-behind", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, op: WriteOp) -> None:
+        op = _bind_document(op)
+        if self._closed:
+            self._commit([op])
+            return
+        self._ensure_started()
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put(op, timeout=self._put_timeout)
+        except queue.Full:
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+            self._count(inline=1)
+            self._commit([op])
+
+    def _collect(self, first: WriteOp) -> List[WriteOp]:
+        ops = [first]
+        deadline = time.monotonic() + self._flush_interval
+        while len(ops) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                op = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if op is None:
+                self._queue.put(None)
+                break
+            ops.append(op)
+        return ops
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def _commit(self, ops: List[WriteOp]) -> bool:
+        """Commit `ops` as one batch; True only if every write landed."""
+        for attempt in range(self._max_retries + 1):
+            try:
+                batch = self._client.batch()
+                for op in ops:
+                    apply_op(batch, op)
+                batch.commit()
+                self._count(committed=len(ops), batches=1)
+                return True
+            except Exception as exc:
+                if not _is_transient(exc):
+                    if len(ops) == 1:
+                        break
+                    # Retrying cannot help: bisect so the other writes still land
+                    mid = len(ops) // 2
+                    left = self._commit(ops[:mid])
+                    return self._commit(ops[mid:]) and left
+                if attempt == self._max_retries:
+                    break
+                self._count(retries=1)
+                time.sleep(min(2.0, 0.1 * (2 ** attempt)) * (0.5 + random.random()))
+        self._count(failed=len(ops))
+        return False
+
+    def _run(self) -> None:
+        while True:
+            op = self._queue.get()
+            if op is None:
+                return
+            ops = self._collect(op)
+            self._commit(ops)
+            with self._idle:
+                self._pending -= len(ops)
+                self._idle.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything submitted so far has been committed (or dropped)."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "committed": self.committed,
+                "batches": self.batches,
+                "retries": self.retries,
+                "failed": self.failed,
+                "inline": self.inline,
+            }
@@ -0,0 +1,102 @@
+"""Cold-start benchmark: import cost per SDK and first-request latency.
+
+    python -m backend.startup_bench [--json]
+
+Each import is timed in a fresh interpreter so module caching does not hide its
+cost; app creation, the first requests and each service's first use are timed
+in this process in the order a cold instance would hit them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+_IMPORTS = (
+    "flask",
+    "cachetools",
+    "google.auth.transport.requests",
+    "firebase_admin.firestore",
+    "google.generativeai",
+    "backend.app",
+)
+
+
+def _fresh_import_seconds(module: str) -> Optional[float]:
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def run() -> Dict[str, Dict[str, Optional[float]]]:
+    imports = {module: _fresh_import_seconds(module) for module in _IMPORTS}
+
+    from .app import create_app
+    from .config import AppConfig
+    from .utils.lazy import LazyService, init_timings
+
+    cfg = AppConfig.from_env()
+    requests: Dict[str, Optional[float]] = {}
+    started = time.perf_counter()
+    app = create_app(cfg)
+    requests["create_app"] = time.perf_counter() - started
+    client = app.test_client()
+    for path in ("/health", "/api/motivation", "/health"):
+        started = time.perf_counter()
+        client.get(path)
+        label = f"GET {path}" if f"GET {path}" not in requests else f"GET {path} (warm)"
+        requests[label] = time.perf_counter() - started
+
+    # First use of each service, as the first authenticated request would trigger it
+    from .db import Database
+    from .services.gemini_client import GeminiClient
+    from .utils.firebase_auth import FirebaseVerifier
+
+    factories = (
+        ("db", lambda: Database(cfg)),
+        ("gemini", lambda: GeminiClient(cfg)),
+        ("firebase", lambda: FirebaseVerifier(cfg)),
+    )
+    services: Dict[str, Optional[float]] = {}
+    for name, factory in factories:
+        try:
+            LazyService(f"bench {name}", factory).resolve()
+        except Exception:
+            services[name] = None
+            continue
+    for name, secs in init_timings().items():
+        services[name.replace("bench ", "")] = secs
+    return {"imports": imports, "requests": requests, "services": services}
+
+
+def _print_table(results: Dict[str, Dict[str, Optional[float]]]) -> None:
+    for section, rows in results.items():
+        print(section)
+        for name, secs in rows.items():
+            value = "failed" if secs is None else f"{1000 * secs:9.1f} ms"
+            print(f"  {name:<40} {value}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start costs.")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+    results = run()
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
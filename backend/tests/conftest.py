@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+import pytest
+
+from backend.config import AppConfig
+
+
+@pytest.fixture
+def make_config(tmp_path) -> Callable[..., AppConfig]:
+    def build(**overrides: Any) -> AppConfig:
+        values: Dict[str, Any] = {
+            "jwt_secret": "test",
+            "gemini_api_key": None,
+            "port": 0,
+            "model_name": "test-model",
+            "firebase_project_id": None,
+            "firebase_credentials_file": None,
+            "pathway_lock_dir": str(tmp_path / "locks"),
+            "gemini_user_rate": 0,
+            "gemini_max_retries": 0,
+        }
+        values.update(overrides)
+        return AppConfig(**values)
+
+    return build
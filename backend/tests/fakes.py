@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, List
+
+
+class FakeModel:
+    """Stands in for a Gemini model: answers `generate_content` from a script of replies.
+
+    A reply is the response text, an exception to raise, or (for `stream=True`) a
+    list of text chunks.
+    """
+
+    def __init__(self, replies: List[Any]) -> None:
+        self.replies = list(replies)
+        self.prompts: List[str] = []
+
+    def generate_content(self, prompt: str, stream: bool = False, **_: Any) -> Any:
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        if stream:
+            return (SimpleNamespace(text=chunk) for chunk in reply)
+        return SimpleNamespace(text=reply)
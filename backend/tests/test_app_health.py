@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from backend.app import create_app
+
+
+def test_health_builds_no_services(make_config, tmp_path):
+    jobs_path = tmp_path / "jobs.sqlite3"
+    app = create_app(make_config(pathway_jobs_path=str(jobs_path)))
+    response = app.test_client().get("/health")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert all(not svc["initialized"] for svc in body["services"].values())
+    assert "pathwayJobs" not in body
+    assert not jobs_path.exists()
+
+
+def test_existing_queue_file_starts_workers_at_boot(make_config, tmp_path):
+    jobs_path = tmp_path / "jobs.sqlite3"
+    jobs_path.touch()
+    app = create_app(make_config(pathway_jobs_path=str(jobs_path)))
+    body = app.test_client().get("/health").get_json()
+    assert body["services"]["jobs"]["initialized"]
+    assert "pathwayJobs" in body
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import time
+
+from backend.services.circuit_breaker import CircuitBreaker
+from backend.services.gemini_client import GeminiClient, ModelUnavailable
+
+from .fakes import FakeModel
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    assert breaker.allow()
+    breaker.record_failure()
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    _open(breaker)
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+    _open(breaker)
+    assert breaker.stats()["state"] == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["shortCircuited"] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    _open(breaker)
+    breaker.record_success()
+    _open(breaker)
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    _open(breaker)
+    assert breaker.allow()
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.OPEN
+    assert breaker.stats()["openedCount"] == 2
+
+
+def test_released_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    _open(breaker)
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def test_release_probe_is_a_no_op_when_closed():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    breaker.release_probe()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+
+
+def test_abandoned_stream_releases_the_probe(make_config):
+    model = FakeModel([RuntimeError("boom"), ["partial ", "answer"], "recovered"])
+    client = GeminiClient(make_config(gemini_breaker_threshold=1, gemini_breaker_cooldown=0), model=model)
+    messages = [{"role": "user", "content": "hi"}]
+    # First call fails and opens the breaker
+    assert "unavailable" in "".join(client.chat_stream(messages, use_cache=False))
+    # The half-open probe is a stream the client walks away from
+    stream = client.chat_stream(messages, use_cache=False)
+    assert next(stream) == "partial "
+    stream.close()
+    assert client.chat(messages, use_cache=False) == "recovered"
+    assert client.breaker_stats()["state"] == CircuitBreaker.CLOSED
+
+
+def test_interrupted_call_releases_the_probe(make_config):
+    model = FakeModel([RuntimeError("boom"), KeyboardInterrupt(), "recovered"])
+    client = GeminiClient(make_config(gemini_breaker_threshold=1, gemini_breaker_cooldown=0), model=model)
+    try:
+        client._generate("prompt")
+    except ModelUnavailable:
+        pass
+    try:
+        client._generate("prompt")
+    except KeyboardInterrupt:
+        pass
+    assert client._generate("prompt").text == "recovered"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import base64
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from backend.utils import firebase_auth
+from backend.utils.firebase_auth import FirebaseVerifier
+
+
+def _token(kid: str, subject: str) -> str:
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": kid}).encode()).decode().rstrip("=")
+    return f"{header}.{subject}.signature"
+
+
+class _Signer:
+    """Stands in for Google's cert endpoint and `google.auth.jwt.decode`."""
+
+    def __init__(self, keys: Dict[str, str]) -> None:
+        self.keys = dict(keys)
+        self.fetches = 0
+        self.decodes: List[Dict[str, str]] = []
+        self.exp_in = 3600.0
+
+    def install(self, verifier: FirebaseVerifier) -> None:
+        def fetch() -> None:
+            self.fetches += 1
+            verifier._certs = dict(self.keys)
+            verifier._certs_fetched_at = time.time()
+            verifier._certs_expiry = time.time() + 3600
+
+        verifier._fetch_certs = fetch  # type: ignore[assignment]
+
+    def decode(self, token: str, certs: Dict[str, str], audience: Any = None) -> Dict[str, Any]:
+        self.decodes.append(certs)
+        kid = firebase_auth._unverified_kid(token)
+        if kid not in certs:
+            raise ValueError("unknown key")
+        return {"user_id": token.split(".")[1], "exp": time.time() + self.exp_in}
+
+
+@pytest.fixture
+def signer(monkeypatch) -> _Signer:
+    signer = _Signer({"k1": "cert-1"})
+    monkeypatch.setattr(firebase_auth, "jwt", SimpleNamespace(decode=signer.decode))
+    return signer
+
+
+def test_claims_are_cached_until_the_token_expires(make_config, signer):
+    verifier = FirebaseVerifier(make_config(firebase_project_id="proj"))
+    signer.install(verifier)
+    signer.exp_in = 0.2
+    token = _token("k1", "alice")
+    assert verifier.verify(token)["user_id"] == "alice"
+    assert verifier.verify(token)["user_id"] == "alice"
+    assert len(signer.decodes) == 1
+    time.sleep(0.3)
+    verifier.verify(token)
+    assert len(signer.decodes) == 2
+    assert verifier.cache_stats()["hits"] == 1
+
+
+def test_claims_cache_is_bounded(make_config, signer):
+    verifier = FirebaseVerifier(make_config(firebase_project_id="proj", firebase_token_cache_size=2))
+    signer.install(verifier)
+    for user in ("alice", "bob", "carol"):
+        verifier.verify(_token("k1", user))
+    assert verifier.cache_stats()["size"] == 2
+    # The least recently used token was evicted and is verified again
+    verifier.verify(_token("k1", "alice"))
+    assert len(signer.decodes) == 4
+
+
+def test_unknown_key_id_refetches_certs(make_config, signer):
+    verifier = FirebaseVerifier(make_config(firebase_project_id="proj"))
+    signer.install(verifier)
+    verifier.verify(_token("k1", "alice"))
+    assert signer.fetches == 1
+    # Google rotated its signing key; the cached set is older than the refetch throttle
+    signer.keys["k2"] = "cert-2"
+    verifier._certs_fetched_at -= 120
+    assert verifier.verify(_token("k2", "bob"))["user_id"] == "bob"
+    assert signer.fetches == 2
+    assert "k2" in signer.decodes[-1]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from backend.services.job_queue import JobQueue, QueueFull
+
+
+class _Retryable(Exception):
+    retry_after = 0.01
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues: List[JobQueue] = []
+
+    def build(handler, **kwargs: Any) -> JobQueue:
+        kwargs.setdefault("poll_interval", 0.02)
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"), handler, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield build
+    for queue in queues:
+        queue.close()
+
+
+def test_runs_a_job_to_completion(make_queue):
+    queue = make_queue(lambda payload: {"echo": payload["n"]}, workers=1)
+    job, created = queue.submit("u1", "k1", {"n": 7})
+    assert created
+    done = queue.wait(job["id"], timeout=5)
+    assert done["status"] == "done"
+    assert done["result"] == {"echo": 7}
+    assert queue.stats()["completed"] == 1
+
+
+def test_duplicate_submission_returns_the_same_job(make_queue):
+    release = threading.Event()
+    queue = make_queue(lambda payload: release.wait(5) and {}, workers=1)
+    try:
+        first, _ = queue.submit("u1", "k1", {})
+        second, created = queue.submit("u1", "k1", {})
+        assert not created
+        assert second["id"] == first["id"]
+        other, created = queue.submit("u2", "k1", {})
+        assert created and other["id"] != first["id"]
+    finally:
+        release.set()
+
+
+def test_finished_job_is_not_deduplicated(make_queue):
+    queue = make_queue(lambda payload: {}, workers=1)
+    first, _ = queue.submit("u1", "k1", {})
+    queue.wait(first["id"], timeout=5)
+    again, created = queue.submit("u1", "k1", {})
+    assert created and again["id"] != first["id"]
+
+
+def test_full_queue_raises(make_queue):
+    release = threading.Event()
+    started = threading.Event()
+
+    def block(payload: Dict[str, Any]) -> Dict[str, Any]:
+        started.set()
+        release.wait(5)
+        return {}
+
+    queue = make_queue(block, workers=1, max_queue=1)
+    try:
+        queue.submit("u1", "running", {})
+        assert started.wait(5)
+        queue.submit("u1", "queued", {})
+        with pytest.raises(QueueFull) as excinfo:
+            queue.submit("u1", "refused", {})
+        assert excinfo.value.depth == 1
+    finally:
+        release.set()
+
+
+def test_failing_job_is_retried_then_marked_failed(make_queue):
+    calls: List[int] = []
+
+    def fail(payload: Dict[str, Any]) -> Dict[str, Any]:
+        calls.append(1)
+        raise _Retryable("upstream busy")
+
+    queue = make_queue(fail, workers=1, max_attempts=2)
+    job, _ = queue.submit("u1", "k1", {})
+    done = queue.wait(job["id"], timeout=5)
+    assert done["status"] == "failed"
+    assert "upstream busy" in done["error"]
+    assert len(calls) == 2
+    assert queue.stats()["retried"] == 1
+
+
+def test_jobs_survive_a_new_queue_on_the_same_file(make_queue):
+    first = make_queue(lambda payload: {"by": "first"}, workers=1)
+    first.close()
+    # Submitted while no worker runs: a later queue instance on the same file picks it up
+    job, _ = first.submit("u1", "k1", {})
+    second = make_queue(lambda payload: {"by": "second"}, workers=1)
+    done = second.wait(job["id"], timeout=5)
+    assert done["status"] == "done"
+    assert done["result"] == {"by": "second"}
+
+
+def test_prioritized_job_runs_next(make_queue):
+    order: List[str] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def record(payload: Dict[str, Any]) -> Dict[str, Any]:
+        if payload["name"] == "blocker":
+            started.set()
+            release.wait(5)
+        order.append(payload["name"])
+        return {}
+
+    queue = make_queue(record, workers=1)
+    try:
+        queue.submit("u1", "blocker", {"name": "blocker"})
+        assert started.wait(5)
+        queue.submit("u1", "first", {"name": "first"})
+        late, _ = queue.submit("u1", "late", {"name": "late"})
+        assert queue.find_active("u1", "late")["id"] == late["id"]
+        queue.prioritize(late["id"])
+    finally:
+        release.set()
+    queue.wait(late["id"], timeout=5)
+    assert order[:2] == ["blocker", "late"]
+
+
+def test_find_active_ignores_finished_jobs(make_queue):
+    queue = make_queue(lambda payload: {}, workers=1)
+    job, _ = queue.submit("u1", "k1", {})
+    queue.wait(job["id"], timeout=5)
+    assert queue.find_active("u1", "k1") is None
+
+
+def test_lease_is_renewed_while_a_slow_job_runs(make_queue):
+    calls: List[int] = []
+
+    def slow(payload: Dict[str, Any]) -> Dict[str, Any]:
+        calls.append(1)
+        time.sleep(0.6)
+        return {}
+
+    # The job outlives its lease several times over; the idle worker must not re-claim it
+    queue = make_queue(slow, workers=2, lease=0.15)
+    job, _ = queue.submit("u1", "k1", {})
+    assert queue.wait(job["id"], timeout=5)["status"] == "done"
+    assert len(calls) == 1
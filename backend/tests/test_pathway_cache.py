@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import threading
+
+from backend.services.pathway_cache import MemoryPathwayCache, SqlitePathwayCache, TieredPathwayCache
+
+
+def test_concurrent_lookups_are_all_counted():
+    cache = MemoryPathwayCache()
+    cache.set(("beginner",), {"title": "T"})
+
+    def lookup() -> None:
+        for _ in range(2000):
+            cache.get(("beginner",))
+            cache.get(("advanced",))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] == 16000
+    assert stats["misses"] == 16000
+
+
+def test_evictions_are_counted_per_tier(tmp_path):
+    memory = MemoryPathwayCache(maxsize=1)
+    sqlite = SqlitePathwayCache(str(tmp_path / "cache.sqlite3"), maxsize=2)
+    cache = TieredPathwayCache([memory, sqlite])
+    for level in ("a", "b", "c"):
+        cache.set((level,), {"title": level})
+    tiers = cache.stats()["tiers"]
+    assert tiers[0]["evictions"] == 2
+    assert tiers[1]["evictions"] == 1
+    # A hit in the slower tier back-fills the faster one
+    assert cache.get(("b",)) == {"title": "b"}
+    assert memory.stats()["misses"] == 1
+    assert sqlite.stats()["hits"] == 1
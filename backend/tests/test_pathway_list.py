@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+from flask import Flask, g, request
+
+from backend.routes.pathway import pathway_bp
+
+
+class _Snap:
+    def __init__(self, doc_id: str, data: Optional[Dict[str, Any]], field_paths: Optional[List[str]] = None) -> None:
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+        self.field_paths = field_paths
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return self._data
+
+
+class _Ref:
+    def __init__(self, collection: "_Pathways", doc_id: str) -> None:
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self, field_paths: Optional[List[str]] = None) -> _Snap:
+        self._collection.reads.append((self.id, field_paths))
+        return _Snap(self.id, self._collection.docs.get(self.id), field_paths)
+
+
+class _Query:
+    def __init__(self, collection: "_Pathways") -> None:
+        self._collection = collection
+        self._after: Optional[str] = None
+        self._limit = 0
+
+    def select(self, fields: List[str]) -> "_Query":
+        return self
+
+    def start_after(self, snap: _Snap) -> "_Query":
+        self._after = snap.id
+        return self
+
+    def limit(self, n: int) -> "_Query":
+        self._limit = n
+        return self
+
+    def stream(self):
+        ids = sorted(self._collection.docs, key=lambda i: self._collection.docs[i]["createdAt"], reverse=True)
+        if self._after is not None:
+            ids = ids[ids.index(self._after) + 1:]
+        # Projected rows: summary fields only
+        for doc_id in ids[: self._limit]:
+            data = self._collection.docs[doc_id]
+            yield _Snap(doc_id, {k: v for k, v in data.items() if k != "plan" or "format" in v})
+
+
+class _Pathways:
+    def __init__(self, docs: Dict[str, Dict[str, Any]]) -> None:
+        self.docs = docs
+        self.reads: List[Any] = []
+
+    def document(self, doc_id: str) -> _Ref:
+        return _Ref(self, doc_id)
+
+    def order_by(self, field: str, direction: Any = None) -> _Query:
+        return _Query(self)
+
+    def count(self):
+        return SimpleNamespace(get=lambda: [[SimpleNamespace(value=len(self.docs))]])
+
+
+class _Db:
+    def __init__(self, pathways: _Pathways) -> None:
+        self._pathways = pathways
+        self.users = SimpleNamespace(
+            document=lambda uid: SimpleNamespace(collection=lambda name: self._pathways)
+        )
+        self.batched: List[Any] = []
+        self.backfilled: Dict[str, Dict[str, Any]] = {}
+
+    def get_all(self, refs: List[_Ref], field_paths: Optional[List[str]] = None):
+        self.batched.append(([ref.id for ref in refs], field_paths))
+        return [_Snap(ref.id, self._pathways.docs[ref.id], field_paths) for ref in refs]
+
+    def update_later(self, ref: _Ref, data: Dict[str, Any]) -> None:
+        self.backfilled[ref.id] = data
+
+
+def _docs() -> Dict[str, Dict[str, Any]]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    docs: Dict[str, Dict[str, Any]] = {}
+    for n in range(5):
+        docs[f"p{n}"] = {"title": f"Plan {n}", "dayCount": 7, "createdAt": start + timedelta(days=n)}
+    # Written before the summary fields existed: a plain plan dict
+    docs["legacy"] = {
+        "createdAt": start - timedelta(days=1),
+        "plan": {"title": "Old plan", "schedule": {"daily": [{"day": 1}, {"day": 2}]}, "sections": {}},
+    }
+    return docs
+
+
+@pytest.fixture
+def client(make_config):
+    pathways = _Pathways(_docs())
+    db = _Db(pathways)
+    cfg = make_config(firebase_project_id="proj")
+    app = Flask(__name__)
+    app.register_blueprint(pathway_bp)
+
+    @app.before_request
+    def inject() -> None:
+        setattr(request, "app_ctx_db", db)
+        setattr(request, "app_ctx_config", cfg)
+        g.firebase_user = {"uid": "u1"}
+
+    test_client = app.test_client()
+    test_client.db = db  # type: ignore[attr-defined]
+    test_client.pathways = pathways  # type: ignore[attr-defined]
+    return test_client
+
+
+def _get(client, query: str = "") -> Dict[str, Any]:
+    response = client.get(f"/api/pathway/list{query}", headers={"Authorization": "Bearer token"})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_pages_follow_the_cursor_and_report_the_full_total(client):
+    first = _get(client, "?limit=4")
+    assert [item["id"] for item in first["items"]] == ["p4", "p3", "p2", "p1"]
+    assert first["count"] == 4
+    assert first["total"] == 6
+    second = _get(client, f"?limit=4&startAfter={first['nextCursor']}")
+    assert [item["id"] for item in second["items"]] == ["p0", "legacy"]
+    assert second["nextCursor"] is None
+    assert second["total"] == 6
+    # The cursor document is read for its ordering field only
+    assert client.pathways.reads == [("p1", ["createdAt"])]
+
+
+def test_legacy_documents_are_summarized_in_one_batched_read(client):
+    body = _get(client, "?limit=10")
+    legacy = body["items"][-1]
+    assert legacy == {"id": "legacy", "title": "Old plan", "days": 2, "createdAt": legacy["createdAt"]}
+    assert client.db.batched == [(["legacy"], ["plan.title", "plan.schedule.daily"])]
+    assert client.db.backfilled == {"legacy": {"title": "Old plan", "dayCount": 2}}
+    assert client.pathways.reads == []
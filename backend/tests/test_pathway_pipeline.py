@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from backend.services import pathway_pipeline
+from backend.services.gemini_client import GeminiClient
+from backend.services.rate_limiter import RateLimited
+
+from .fakes import FakeModel
+
+
+QUESTIONNAIRE = {"skillLevel": "beginner", "hoursPerDay": "1-2", "programmingLanguage": "python", "prepTime": "1 month"}
+
+
+def _record(pending: List[int]) -> Dict[str, Any]:
+    written = [{"day": n, "topics": [f"t{n}"]} for n in range(1, 31) if n not in pending]
+    return {
+        "questionnaire": QUESTIONNAIRE,
+        "dayCount": 30,
+        "plan": {"title": "T", "schedule": {"daily": written}},
+        "fill": {"status": "pending", "outline": "Week 1: basics"},
+    }
+
+
+class _Pathways:
+    def __init__(self, record: Dict[str, Any]) -> None:
+        self.record = record
+
+    def get(self, uid: str, pathway_id: str) -> Optional[Dict[str, Any]]:
+        return {"id": pathway_id, "data": self.record}
+
+
+class _Gemini:
+    """Counts generate_days calls; each one blocks until `release` is set."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[int]] = []
+        self.release = threading.Event()
+
+    def generate_days(self, questionnaire, numbers, title, outline, user_id=None):
+        self.calls.append(list(numbers))
+        self.release.wait(5)
+        return [{"day": n, "topics": [f"t{n}"]} for n in numbers]
+
+
+@pytest.fixture
+def merged(monkeypatch) -> List[List[int]]:
+    rounds: List[List[int]] = []
+
+    def merge(db, gemini, pathways, cfg, uid, pathway_id, days):
+        rounds.append([day["day"] for day in days])
+        return {**pathways.record, "merged": len(rounds)}
+
+    monkeypatch.setattr(pathway_pipeline, "_merge_days", merge)
+    monkeypatch.setattr(pathway_pipeline, "_enrich", lambda language, days: days)
+    return rounds
+
+
+def test_concurrent_fills_of_the_same_days_share_one_generation(make_config, merged):
+    gemini = _Gemini()
+    pathways = _Pathways(_record([8, 9, 10]))
+    cfg = make_config()
+    results: List[Any] = []
+
+    def fill() -> None:
+        results.append(pathway_pipeline.fill_pathway_days(None, gemini, pathways, cfg, "u1", "p1", [8, 9, 10]))
+
+    threads = [threading.Thread(target=fill) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while not gemini.calls:
+        time.sleep(0.01)
+    # Let the other threads join the in-flight fill
+    time.sleep(0.05)
+    gemini.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert gemini.calls == [[8, 9, 10]]
+    assert len(results) == 3
+    assert merged == [[8, 9, 10]]
+
+
+def test_fill_is_stored_a_round_at_a_time(make_config, merged):
+    gemini = _Gemini()
+    gemini.release.set()
+    pending = list(range(8, 31))
+    cfg = make_config(pathway_chunk_days=5, pathway_chunk_workers=2)
+    pathway_pipeline.fill_pathway_days(None, gemini, _Pathways(_record(pending)), cfg, "u1", "p1")
+    assert gemini.calls == [pending[0:10], pending[10:20], pending[20:]]
+    assert len(merged) == 3
+
+
+def test_on_demand_days_are_charged_to_the_user(make_config):
+    client = GeminiClient(
+        make_config(gemini_user_rate=0.001, gemini_user_burst=1),
+        model=FakeModel(['{"daily": [{"day": 8, "topics": ["a"]}]}']),
+    )
+    assert [day["day"] for day in client.generate_days(QUESTIONNAIRE, [8], "T", "", user_id="alice")] == [8]
+    with pytest.raises(RateLimited):
+        client.generate_days(QUESTIONNAIRE, [9], "T", "", user_id="alice")
+
+
+@pytest.mark.parametrize(
+    "prep_time, min_days, progressive",
+    [("1 week", 15, False), ("1 month", 15, True), ("1 month", 0, False)],
+)
+def test_progressive_only_for_long_plans(make_config, monkeypatch, prep_time, min_days, progressive):
+    heads: List[int] = []
+
+    class Gemini:
+        def cached_pathway(self, questionnaire):
+            return None
+
+        def generate_pathway_head(self, questionnaire, first_days, user_id=None):
+            heads.append(first_days)
+            return None
+
+    monkeypatch.setattr(pathway_pipeline, "create_pathway", lambda *args, **kwargs: ("p1", {}))
+    cfg = make_config(pathway_progressive_min_days=min_days)
+    questionnaire = {**QUESTIONNAIRE, "prepTime": prep_time}
+    assert pathway_pipeline.create_pathway_progressive(None, Gemini(), None, cfg, "u1", questionnaire) == ("p1", {}, [])
+    assert bool(heads) == progressive
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+
+from backend.services.gemini_client import GeminiClient
+from backend.services.pathway_schema import chunk_ranges, collect_days, parse_pathway, plan_daily
+
+from .fakes import FakeModel
+
+
+QUESTIONNAIRE = {"skillLevel": "beginner", "hoursPerDay": "1-2", "programmingLanguage": "python", "prepTime": "1 week"}
+
+
+def _day(n: int) -> dict:
+    return {"day": n, "focus": f"Focus {n}", "time": "1h", "details": "Study.", "topics": [f"topic-{n}"]}
+
+
+def _truncated_reply(complete_days: int) -> str:
+    text = json.dumps({
+        "title": "Python Basics",
+        "schedule": {"daily": [_day(n) for n in range(1, complete_days + 2)]},
+        "sections": {"codingProblems": [{"id": "cp-1", "title": "Two Sum"}]},
+    })
+    # Cut inside the last day entry, as a reply that hit the output limit would be
+    return text[: text.rindex('"focus"')]
+
+
+def test_parse_pathway_accepts_fenced_json():
+    data, complete = parse_pathway('```json\n{"title": "T", "schedule": {"daily": []}}\n```')
+    assert complete
+    assert data["title"] == "T"
+
+
+def test_parse_pathway_recovers_complete_days_before_truncation():
+    data, complete = parse_pathway(_truncated_reply(4))
+    assert not complete
+    assert data["title"] == "Python Basics"
+    assert [day["day"] for day in plan_daily(data)] == [1, 2, 3, 4]
+
+
+def test_collect_days_renumbers_by_position_and_skips_empty_entries():
+    daily = [{"topics": ["a"]}, {"day": 9, "topics": ["b"]}, {"day": 3}, {"day": 3, "focus": "dup"}]
+    by_day = collect_days(daily, [2, 3, 4])
+    assert sorted(by_day) == [2, 3]
+    assert by_day[2]["topics"] == ["a"]
+    assert by_day[3]["topics"] == ["b"]
+
+
+def test_chunk_ranges():
+    assert chunk_ranges([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert chunk_ranges([], 3) == []
+
+
+def test_truncated_reply_is_repaired_with_one_call(make_config):
+    repair = json.dumps({"daily": [_day(n) for n in (5, 6, 7)]})
+    model = FakeModel([_truncated_reply(4), repair])
+    client = GeminiClient(make_config(), model=model)
+    plan = client.generate_pathway(QUESTIONNAIRE, user_id="alice")
+    assert [day["topics"] for day in plan["schedule"]["daily"]] == [[f"topic-{n}"] for n in range(1, 8)]
+    assert "Write ONLY these days: 5, 6, 7." in model.prompts[1]
+    stats = client.generation_stats()
+    assert stats["repaired"] == 1
+    assert stats["daysRepaired"] == 3
+    assert client.cached_pathway(QUESTIONNAIRE) == plan
+
+
+def test_repair_is_not_charged_to_the_user(make_config):
+    repair = json.dumps({"daily": [_day(n) for n in (5, 6, 7)]})
+    model = FakeModel([_truncated_reply(4), repair])
+    # One call per user: the first reply uses it up
+    client = GeminiClient(make_config(gemini_user_rate=0.001, gemini_user_burst=1), model=model)
+    plan = client.generate_pathway(QUESTIONNAIRE, user_id="alice")
+    assert [day["focus"] for day in plan["schedule"]["daily"]][4:] == ["Focus 5", "Focus 6", "Focus 7"]
+
+
+def test_refused_repair_falls_back_to_placeholders(make_config):
+    model = FakeModel([_truncated_reply(4)])
+    # One call for the whole process: the repair is refused
+    client = GeminiClient(make_config(gemini_global_rate=0.001, gemini_global_burst=1), model=model)
+    plan = client.generate_pathway(QUESTIONNAIRE, user_id="alice")
+    daily = plan["schedule"]["daily"]
+    assert [day["day"] for day in daily] == list(range(1, 8))
+    assert daily[3]["focus"] == "Focus 4"
+    assert daily[4]["focus"] == "Study Day 5"
+    assert client.generation_stats()["daysPadded"] == 3
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from backend.services.rate_limiter import ModelLimiter, RateLimited, TokenBucket
+
+
+def test_token_bucket_reports_wait_when_empty():
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.try_take() == 0
+    assert bucket.try_take() == 0
+    assert bucket.try_take() > 0
+    bucket.refund()
+    assert bucket.try_take() == 0
+
+
+def test_user_bucket_refuses_after_burst():
+    limiter = ModelLimiter(user_rate=0.01, user_burst=2)
+    for _ in range(2):
+        with limiter.slot("alice"):
+            pass
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.acquire("alice")
+    assert excinfo.value.reason == "user"
+    assert excinfo.value.retry_after >= 1
+    # Other users and anonymous (process-wide) calls are unaffected
+    with limiter.slot("bob"):
+        pass
+    with limiter.slot(None):
+        pass
+    assert limiter.stats()["rejected"]["user"] == 1
+
+
+def test_global_refusal_refunds_the_user_token():
+    limiter = ModelLimiter(global_rate=0.01, global_burst=1, user_rate=0.01, user_burst=1)
+    with limiter.slot(None):
+        pass
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.acquire("alice")
+    assert excinfo.value.reason == "global"
+    # Nothing was sent, so Alice's own token came back
+    assert limiter._user_bucket("alice").try_take() == 0
+
+
+def test_concurrency_cap_refuses_after_max_wait():
+    limiter = ModelLimiter(max_inflight=1, max_wait=0.05)
+    limiter.acquire()
+    try:
+        with pytest.raises(RateLimited) as excinfo:
+            limiter.acquire()
+        assert excinfo.value.reason == "concurrency"
+    finally:
+        limiter.release()
+    with limiter.slot():
+        assert limiter.stats()["inflight"] == 1
+    assert limiter.stats()["inflight"] == 0
+
+
+def test_waiting_caller_gets_the_released_slot():
+    limiter = ModelLimiter(max_inflight=1, max_wait=2.0)
+    limiter.acquire()
+    admitted = threading.Event()
+
+    def wait_for_slot() -> None:
+        with limiter.slot():
+            admitted.set()
+
+    thread = threading.Thread(target=wait_for_slot)
+    thread.start()
+    assert not admitted.wait(0.05)
+    limiter.release()
+    thread.join(2.0)
+    assert admitted.is_set()
+    assert limiter.stats()["admitted"] == 2
+
+
+def test_charge_takes_only_a_user_token():
+    limiter = ModelLimiter(user_rate=0.01, user_burst=1, max_inflight=1)
+    limiter.charge("alice")
+    with pytest.raises(RateLimited):
+        limiter.charge("alice")
+    assert limiter.stats()["inflight"] == 0
+    ModelLimiter().charge("alice")
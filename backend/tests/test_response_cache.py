@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from backend.services.gemini_client import GeminiClient
+from backend.services.response_cache import ResponseCache, context_fingerprint
+
+from .fakes import FakeModel
+
+
+def _context(version: str, completed=("cp-1",), current_day: int = 3):
+    return {
+        "version": version,
+        "currentDay": current_day,
+        "plan": {
+            "title": "Python DSA",
+            "schedule": {"daily": [{"day": 1, "topics": ["arrays", "strings"]}, {"day": 2, "topics": ["hashing"]}]},
+        },
+        "progress": {"completedItemIds": list(completed)},
+    }
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = ResponseCache()
+    cache.set("What is a hash map?", None, "A key/value table.")
+    assert cache.get("what is a HASH map", None) == "A key/value table."
+    assert cache.stats()["exactHits"] == 1
+
+
+def test_near_duplicate_hit():
+    cache = ResponseCache(threshold=0.6)
+    cache.set("explain binary search on sorted arrays", None, "Halve the range each step.")
+    assert cache.get("can you explain binary search for sorted arrays please", None) == "Halve the range each step."
+    assert cache.stats()["nearHits"] == 1
+
+
+def test_negated_question_never_matches_the_plain_one():
+    cache = ResponseCache(threshold=0.5)
+    cache.set("when should I use recursion", None, "For tree-shaped problems.")
+    assert cache.get("when should I not use recursion", None) is None
+    assert cache.get("when shouldn't I use recursion", None) is None
+    cache.set("when should I not use recursion", None, "When the depth is unbounded.")
+    assert cache.get("when shouldn\u2019t I use recursion?", None) == "When the depth is unbounded."
+
+
+def test_unrelated_question_misses():
+    cache = ResponseCache()
+    cache.set("explain binary search", None, "Halve the range each step.")
+    assert cache.get("how do heaps work", None) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_different_plan_content_misses():
+    cache = ResponseCache()
+    cache.set("what should I do today", _context("a"), "Arrays.")
+    assert cache.get("what should I do today", _context("a", current_day=4)) is None
+    assert cache.get("what should I do today", _context("a", completed=("cp-1", "cp-2"))) is None
+
+
+def test_users_with_the_same_plan_share_answers():
+    cache = ResponseCache()
+    cache.set("what should I do today", _context("uid-1/pathway-1@3"), "Arrays.")
+    assert cache.get("what should I do today", _context("uid-2/pathway-9@7")) == "Arrays."
+
+
+def test_fingerprint_covers_day_focus_and_sections():
+    base = _context("a")
+    focused = _context("a")
+    focused["plan"]["schedule"]["daily"][0]["focus"] = "Two pointers"
+    sectioned = _context("a")
+    sectioned["plan"]["sections"] = {"codingProblems": [{"id": "cp-1", "title": "Two Sum"}]}
+    fingerprints = {context_fingerprint(c) for c in (base, focused, sectioned)}
+    assert len(fingerprints) == 3
+
+
+def test_chat_answers_are_keyed_on_the_prompt_context(make_config):
+    model = FakeModel(["Arrays.", "Two pointers."])
+    client = GeminiClient(make_config(), model=model)
+    messages = [{"role": "user", "content": "what should I do today"}]
+    focused = _context("v1", current_day=1)
+    focused["plan"]["schedule"]["daily"][0]["focus"] = "Two pointers"
+    assert client.chat(messages, context=_context("v0", current_day=1)) == "Arrays."
+    # Same topics, different focus: the prompt differs, so the cached answer must not be reused
+    assert client.chat(messages, context=focused) == "Two pointers."
+    assert client.chat(messages, context=_context("v2", current_day=1)) == "Arrays."
+    assert len(model.prompts) == 2
+
+
+def test_fingerprint_ignores_version():
+    assert context_fingerprint(_context("v1")) == context_fingerprint(_context("v2"))
+    assert context_fingerprint(None) == "-"
+
+
+def test_empty_answers_are_not_cached():
+    cache = ResponseCache()
+    cache.set("hello", None, "")
+    assert cache.get("hello", None) is None
+    assert cache.stats()["size"] == 0
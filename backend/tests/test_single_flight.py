@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+from backend.services import single_flight
+from backend.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls: List[int] = []
+    results: List[int] = []
+
+    def work() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while not calls:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [1]
+    assert results == [42, 42, 42]
+    assert flight.stats()["coalesced"] == 2
+
+
+@pytest.mark.skipif(single_flight.fcntl is None, reason="needs fcntl")
+def test_host_lock_gives_up_after_the_timeout(tmp_path):
+    holder = SingleFlight(lock_dir=str(tmp_path))
+    waiter = SingleFlight(lock_dir=str(tmp_path), lock_timeout=0.1)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold() -> None:
+        with holder.host_lock("k"):
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    try:
+        assert held.wait(5)
+        started = time.monotonic()
+        with waiter.host_lock("k"):
+            waited = time.monotonic() - started
+        assert 0.1 <= waited < 2
+        assert waiter.stats()["hostLockTimeouts"] == 1
+    finally:
+        release.set()
+        thread.join(5)
+    # Once free, the lock is taken normally
+    with waiter.host_lock("k"):
+        pass
+    assert waiter.stats()["hostLockTimeouts"] == 1
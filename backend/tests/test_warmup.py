@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+
+from backend.warmup import _try_builder_lock, load_artifact, write_artifact
+
+
+def test_artifact_round_trip_leaves_no_temp_files(tmp_path):
+    path = str(tmp_path / "warmup" / "artifact.json")
+    entries = [{"questionnaire": {"prepTime": "1 week"}, "count": 3, "plan": {"title": "T"}}]
+    write_artifact(path, entries, "test-model")
+    assert load_artifact(path) == entries
+    assert os.listdir(os.path.dirname(path)) == ["artifact.json"]
+
+
+def test_only_one_builder_per_host(tmp_path):
+    path = str(tmp_path / "artifact.json")
+    first = _try_builder_lock(path)
+    assert first is not None
+    try:
+        assert _try_builder_lock(path) is None
+    finally:
+        first.close()
+    # The holder went away: the next round may take over
+    second = _try_builder_lock(path)
+    assert second is not None
+    second.close()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+from backend.services.write_behind import WriteBehindQueue
+
+
+class _ApiError(Exception):
+    def __init__(self, code: int) -> None:
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+class _FakeBatch:
+    def __init__(self, client: "_FakeClient") -> None:
+        self._client = client
+        self._writes: List[Tuple[str, Any, Dict[str, Any]]] = []
+
+    def set(self, target: Any, data: Dict[str, Any], merge: bool = False) -> None:
+        self._writes.append(("set", target, data))
+
+    def update(self, target: Any, data: Dict[str, Any]) -> None:
+        self._writes.append(("update", target, data))
+
+    def commit(self) -> None:
+        self._client.commit(self._writes)
+
+
+class _FakeClient:
+    """Firestore stand-in: `missing` targets fail permanently, `flaky` commits fail transiently."""
+
+    def __init__(self, missing=(), flaky: int = 0) -> None:
+        self.missing = set(missing)
+        self.flaky = flaky
+        self.stored: List[Any] = []
+        self.commits = 0
+        self._lock = threading.Lock()
+
+    def batch(self) -> _FakeBatch:
+        return _FakeBatch(self)
+
+    def commit(self, writes: List[Tuple[str, Any, Dict[str, Any]]]) -> None:
+        with self._lock:
+            self.commits += 1
+            if self.flaky:
+                self.flaky -= 1
+                raise _ApiError(503)
+            if any(target in self.missing for _, target, _ in writes):
+                raise _ApiError(404)
+            self.stored.extend(target for _, target, _ in writes)
+
+
+def _queue(client: _FakeClient, **kwargs: Any) -> WriteBehindQueue:
+    kwargs.setdefault("flush_interval", 0.05)
+    return WriteBehindQueue(client, **kwargs)
+
+
+class _FakeCollection:
+    def __init__(self) -> None:
+        self.ids = 0
+
+    def document(self) -> str:
+        self.ids += 1
+        return f"auto-{self.ids}"
+
+
+def test_retried_create_keeps_its_document_id():
+    client = _FakeClient(flaky=2)
+    collection = _FakeCollection()
+    queue = _queue(client, max_retries=3)
+    queue.submit(("create", collection, {"n": 1}, False))
+    assert queue.flush(5)
+    assert client.stored == ["auto-1"]
+    assert collection.ids == 1
+    assert queue.stats()["retries"] == 2
+    queue.close()
+
+
+def test_groups_writes_into_batches():
+    client = _FakeClient()
+    queue = _queue(client, batch_size=10, flush_interval=0.2)
+    for n in range(5):
+        queue.submit(("update", f"doc-{n}", {"n": n}, False))
+    assert queue.flush(5)
+    assert sorted(client.stored) == [f"doc-{n}" for n in range(5)]
+    assert queue.stats()["committed"] == 5
+    assert client.commits < 5
+    queue.close()
+
+
+def test_transient_error_is_retried():
+    client = _FakeClient(flaky=1)
+    queue = _queue(client, max_retries=2)
+    queue.submit(("set", "doc-1", {}, True))
+    assert queue.flush(5)
+    assert client.stored == ["doc-1"]
+    stats = queue.stats()
+    assert stats["retries"] == 1
+    assert stats["failed"] == 0
+    queue.close()
+
+
+def test_permanent_error_drops_only_the_bad_write():
+    client = _FakeClient(missing={"doc-3"})
+    queue = _queue(client, batch_size=8, flush_interval=0.2)
+    for n in range(8):
+        queue.submit(("update", f"doc-{n}", {}, False))
+    assert queue.flush(5)
+    assert sorted(client.stored) == sorted(f"doc-{n}" for n in range(8) if n != 3)
+    stats = queue.stats()
+    assert stats["committed"] == 7
+    assert stats["failed"] == 1
+    assert stats["retries"] == 0
+    queue.close()
+
+
+def test_full_queue_commits_inline():
+    client = _FakeClient()
+    queue = _queue(client, max_queue=1, put_timeout=0.0, flush_interval=0.5)
+    for n in range(20):
+        queue.submit(("set", f"doc-{n}", {}, False))
+    assert queue.flush(5)
+    assert len(client.stored) == 20
+    assert queue.stats()["inline"] > 0
+    queue.close()
+
+
+def test_closed_queue_writes_synchronously():
+    client = _FakeClient()
+    queue = _queue(client)
+    queue.close()
+    queue.submit(("set", "doc-1", {}, False))
+    assert client.stored == ["doc-1"]
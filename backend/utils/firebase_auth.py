@@ -1,56 +1,229 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
 from typing import Any, Dict, Optional, Callable, TypeVar, cast
 from functools import wraps
-from flask import request, jsonify
-from google.oauth2 import id_token
-from google.auth.transport import requests
-
+from flask import g, jsonify, request
+from cachetools import TLRUCache
 from ..config import AppConfig
+from .lazy import LazyModule
+
+
+# google-auth's transport pulls in `requests`; only token verification needs it
+google_exceptions = LazyModule("google.auth.exceptions")
+jwt = LazyModule("google.auth.jwt")
+requests = LazyModule("google.auth.transport.requests")
+
+
+# Public x509 certs used to sign Firebase ID tokens
+_FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+_DEFAULT_CERTS_TTL = 60 * 60  # used when the response carries no max-age
+_CERTS_REFRESH_MARGIN = 5 * 60  # refresh in the background this long before expiry
+_MIN_REFETCH_INTERVAL = 60  # throttle refetches triggered by unknown key ids
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _unverified_kid(token: str) -> Optional[str]:
+    try:
+        header_segment = token.split(".", 1)[0]
+        padded = header_segment + "=" * (-len(header_segment) % 4)
+        return cast(Optional[str], json.loads(base64.urlsafe_b64decode(padded)).get("kid"))
+    except Exception:
+        return None
+
+
+def _claims_expiry(_key: str, claims: Dict[str, Any], now: float) -> float:
+    try:
+        return float(claims.get("exp", now))
+    except Exception:
+        return now
 
 
 class FirebaseVerifier:
     def __init__(self, config: AppConfig) -> None:
         self._project_id: Optional[str] = config.firebase_project_id
-        self._request = requests.Request()
+        self._request: Any = None
+        # Verified claims keyed by sha256(token); each entry expires at the token's own `exp`
+        self._claims: TLRUCache = TLRUCache(
+            maxsize=config.firebase_token_cache_size, ttu=_claims_expiry, timer=time.time
+        )
+        self._claims_lock = threading.Lock()
+        self._certs: Optional[Dict[str, str]] = None
+        self._certs_expiry: float = 0.0
+        self._certs_fetched_at: float = 0.0
+        self._certs_lock = threading.Lock()
+        self._certs_refreshing = False
+        self.hits = 0
+        self.misses = 0
 
     @property
     def enabled(self) -> bool:
         return bool(self._project_id)
 
+    def _fetch_certs(self) -> None:
+        if self._request is None:
+            self._request = requests.Request()
+        response = self._request(_FIREBASE_CERTS_URL, method="GET")
+        if response.status != 200:
+            raise google_exceptions.TransportError(
+                f"Could not fetch certificates at {_FIREBASE_CERTS_URL}"
+            )
+        data = response.data.decode("utf-8") if isinstance(response.data, bytes) else response.data
+        certs = json.loads(data)
+        cache_control = response.headers.get("cache-control") or response.headers.get("Cache-Control") or ""
+        match = _MAX_AGE_RE.search(cache_control)
+        ttl = int(match.group(1)) if match else _DEFAULT_CERTS_TTL
+        with self._certs_lock:
+            self._certs = certs
+            self._certs_fetched_at = time.time()
+            self._certs_expiry = self._certs_fetched_at + ttl
+
+    def _refresh_certs_in_background(self) -> None:
+        with self._certs_lock:
+            if self._certs_refreshing:
+                return
+            self._certs_refreshing = True
+
+        def run() -> None:
+            try:
+                self._fetch_certs()
+            except Exception:
+                # Keep serving the previous certs; the next call will try again
+                pass
+            finally:
+                with self._certs_lock:
+                    self._certs_refreshing = False
+
+        threading.Thread(target=run, name="firebase-certs-refresh", daemon=True).start()
+
+    def _get_certs(self) -> Dict[str, str]:
+        certs, expiry = self._certs, self._certs_expiry
+        if certs is None:
+            # Only the very first verification in the process blocks on the network
+            self._fetch_certs()
+            return cast(Dict[str, str], self._certs)
+        if time.time() >= expiry - _CERTS_REFRESH_MARGIN:
+            self._refresh_certs_in_background()
+        return certs
+
     def verify(self, token: str) -> Dict[str, Any]:
         if not self.enabled:
             raise ValueError("Firebase verification not configured")
-        payload = id_token.verify_firebase_token(token, self._request, audience=self._project_id)
-        return payload or {}
+        key = _token_key(token)
+        with self._claims_lock:
+            cached = self._claims.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        certs = self._get_certs()
+        kid = _unverified_kid(token)
+        if kid and kid not in certs and time.time() - self._certs_fetched_at > _MIN_REFETCH_INTERVAL:
+            # Signing key rotated before the cached set expired
+            self._fetch_certs()
+            certs = cast(Dict[str, str], self._certs)
+        payload = jwt.decode(token, certs=certs, audience=self._project_id) or {}
+        with self._claims_lock:
+            self.misses += 1
+            self._claims[key] = payload
+        return payload
+
+    def cache_stats(self) -> Dict[str, Any]:
+        with self._claims_lock:
+            size = len(self._claims)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": size,
+            "certsExpiresIn": max(0, int(self._certs_expiry - time.time())) if self._certs else 0,
+        }
 
 
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Route auth policies. Views declare one with `auth_policy`/`firebase_required`,
+# blueprints with `set_blueprint_policy`; anything undeclared is OPTIONAL.
+PUBLIC = "public"  # never touches the token or the request services
+OPTIONAL = "optional"  # identity attached if a valid bearer token is present
+FIREBASE = "firebase"  # a valid Firebase ID token is required
+
+_BLUEPRINT_POLICIES: Dict[str, str] = {}
+
+
+def auth_policy(policy: str) -> Callable[[F], F]:
+    def decorate(func: F) -> F:
+        setattr(func, "auth_policy", policy)
+        return func
+    return decorate
+
+
+def set_blueprint_policy(blueprint: Any, policy: str) -> None:
+    """Default policy for every view of `blueprint` that declares none itself."""
+    _BLUEPRINT_POLICIES[blueprint.name] = policy
+
+
+def policy_for_request(view: Optional[Callable[..., Any]]) -> str:
+    policy = getattr(view, "auth_policy", None)
+    if policy:
+        return cast(str, policy)
+    return _BLUEPRINT_POLICIES.get(request.blueprint or "", OPTIONAL)
+
+
+def _bearer_token() -> Optional[str]:
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    return auth_header.split(" ", 1)[1]
+
+
+def authenticate() -> Optional[Dict[str, Any]]:
+    """Verify the request's bearer token at most once; the identity lives in `g.firebase_user`."""
+    if "firebase_user" in g:
+        return cast(Optional[Dict[str, Any]], g.firebase_user)
+    g.firebase_user = None
+    token = _bearer_token()
+    verifier: Optional[FirebaseVerifier] = getattr(request, "app_ctx_firebase", None)
+    if token is None or verifier is None:
+        return None
+    try:
+        payload = verifier.verify(token)
+    except Exception:
+        return None
+    g.firebase_user = {
+        "uid": payload.get("user_id"),
+        "email": payload.get("email"),
+        "name": payload.get("name"),
+        "picture": payload.get("picture"),
+    }
+    return cast(Dict[str, Any], g.firebase_user)
+
+
 def firebase_required(func: F) -> F:
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any):
-        verifier: FirebaseVerifier = getattr(request, "app_ctx_firebase", None)
-        if not verifier or not verifier.enabled:
+        config = getattr(request, "app_ctx_config", None)
+        if config is None or not config.firebase_project_id:
             return jsonify({"error": "Auth not configured"}), 500
-        auth_header = request.headers.get("Authorization", "")
-        if not auth_header.startswith("Bearer "):
+        if _bearer_token() is None:
             return jsonify({"error": "Missing bearer token"}), 401
-        token = auth_header.split(" ", 1)[1]
-        try:
-            payload = verifier.verify(token)
-        except Exception:
+        if authenticate() is None:
             return jsonify({"error": "Invalid token"}), 401
-        setattr(request, "firebase_user", {
-            "uid": payload.get("user_id"),
-            "email": payload.get("email"),
-            "name": payload.get("name"),
-            "picture": payload.get("picture"),
-        })
         return func(*args, **kwargs)
+    setattr(wrapper, "auth_policy", FIREBASE)
     return cast(F, wrapper)
 
 
+def current_user() -> Dict[str, Any]:
+    return cast(Dict[str, Any], g.get("firebase_user") or {})
+
+
 def get_firebase_email() -> Optional[str]:
-    user = getattr(request, "firebase_user", None) or {}
-    return cast(Optional[str], user.get("email"))
\ No newline at end of file
+    return cast(Optional[str], current_user().get("email"))
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+# Seconds spent building each lazy service or importing each lazy module, by name
+_INIT_SECONDS: Dict[str, float] = {}
+
+
+def init_timings() -> Dict[str, float]:
+    return dict(_INIT_SECONDS)
+
+
+class LazyModule:
+    """Module proxy that imports `name` on first attribute access.
+
+    Keeps heavy SDKs (Firestore's gRPC stack, google-auth transports) out of the
+    import path of code that only needs them on some requests.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            started = time.perf_counter()
+            # importlib holds the import lock, so concurrent first uses import once
+            self._module = importlib.import_module(self._name)
+            _INIT_SECONDS.setdefault(f"import {self._name}", time.perf_counter() - started)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+
+class LazyService(Generic[T]):
+    """Thread-safe proxy that builds its service on first use.
+
+    Attribute access is forwarded to the service, so callers can hold the proxy
+    wherever they would hold the instance.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]) -> None:
+        self._name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._instance is not None
+
+    def resolve(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                self._instance = self._factory()
+                _INIT_SECONDS[self._name] = time.perf_counter() - started
+            return self._instance
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
@@ -0,0 +1,204 @@
+"""Precomputed pathways for the most requested questionnaire combinations.
+
+The warm-up artifact is a JSON file of `{questionnaire, count, plan}` entries.
+Loading it primes `GeminiClient`'s pathway cache so those combinations skip the
+model call; building it counts stored questionnaires and generates the top-N.
+
+Rebuild offline with:
+
+    python -m backend.warmup --top 40 --output /path/to/pathway_warmup.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+
+from .config import AppConfig
+from .services.gemini_client import GeminiClient, pathway_key
+from .services.pathway_cache import PathwayKey
+
+
+ARTIFACT_VERSION = 1
+
+# Questionnaire options offered by the frontend, used when there is no usage data yet
+_SKILL_LEVELS = ("beginner", "intermediate", "advanced")
+_HOURS = ("1-2", "2-3", "3-4", ">4")
+_LANGUAGES = ("python", "java", "cpp", "javascript", "c")
+_PREP_TIMES = ("1 week", "1 month", "3 months")
+
+_USAGE_SCAN_LIMIT = 5000
+
+
+def default_combinations() -> List[Dict[str, Any]]:
+    return [
+        {"skillLevel": level, "hoursPerDay": hours, "programmingLanguage": language, "prepTime": prep}
+        for level, hours, language, prep in itertools.product(_SKILL_LEVELS, _HOURS, _LANGUAGES, _PREP_TIMES)
+    ]
+
+
+def collect_usage(db: Any, limit: int = _USAGE_SCAN_LIMIT) -> List[Tuple[Dict[str, Any], int]]:
+    """Questionnaire combinations of stored pathways, most requested first."""
+    counts: Counter = Counter()
+    samples: Dict[PathwayKey, Dict[str, Any]] = {}
+    query = db.user_pathways.select(["questionnaire"]).limit(limit)
+    for doc in query.stream():
+        questionnaire = (doc.to_dict() or {}).get("questionnaire")
+        if not isinstance(questionnaire, dict):
+            continue
+        key = pathway_key(questionnaire)
+        counts[key] += 1
+        samples.setdefault(key, questionnaire)
+    return [(samples[key], count) for key, count in counts.most_common()]
+
+
+def top_combinations(db: Any, top_n: int) -> List[Tuple[Dict[str, Any], int]]:
+    """Top-N by usage, padded with the frontend's default combinations."""
+    ranked = collect_usage(db) if db is not None else []
+    seen = {pathway_key(q) for q, _ in ranked}
+    for questionnaire in default_combinations():
+        if len(ranked) >= top_n:
+            break
+        if pathway_key(questionnaire) not in seen:
+            ranked.append((questionnaire, 0))
+            seen.add(pathway_key(questionnaire))
+    return ranked[:top_n]
+
+
+def load_artifact(path: str) -> List[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if data.get("version") != ARTIFACT_VERSION:
+        return []
+    return [e for e in data.get("entries", []) if isinstance(e, dict) and e.get("plan")]
+
+
+def prime_from_artifact(gemini: GeminiClient, path: str) -> int:
+    """Seed the pathway cache from the artifact; returns the number of entries loaded."""
+    entries = load_artifact(path)
+    for entry in entries:
+        gemini.prime_pathway(entry.get("questionnaire") or {}, entry["plan"])
+    return len(entries)
+
+
+def write_artifact(path: str, entries: List[Dict[str, Any]], model_name: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = {"version": ARTIFACT_VERSION, "generatedAt": time.time(), "model": model_name, "entries": entries}
+    # Write then rename so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def build_artifact(gemini: GeminiClient, db: Any, top_n: int, path: str, model_name: str = "") -> Dict[str, int]:
+    """Generate (or reuse cached) pathways for the top-N combinations and persist them."""
+    entries: List[Dict[str, Any]] = []
+    failed = 0
+    for questionnaire, count in top_combinations(db, top_n):
+        try:
+            gemini.generate_pathway(questionnaire)
+        except Exception:
+            failed += 1
+            continue
+        # Stub fallbacks (model unavailable) are never cached, so only real plans land here
+        plan = gemini.cached_pathway(questionnaire)
+        if plan is None:
+            failed += 1
+            continue
+        entries.append({"questionnaire": questionnaire, "count": count, "plan": plan})
+    if entries:
+        write_artifact(path, entries, model_name)
+    return {"generated": len(entries), "failed": failed}
+
+
+def _try_builder_lock(path: str) -> Optional[IO[str]]:
+    """Non-blocking host-wide lock on `<path>.lock`; returns the held handle, or None.
+
+    The lock lasts as long as the handle stays open, and the OS drops it when the
+    holder exits, so another worker can take over on its next round.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fh = open(path + ".lock", "a+")
+    if fcntl is None:
+        # No flock here: every worker builds, as before
+        return fh
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fh.close()
+        return None
+    return fh
+
+
+def start_background_warmup(cfg: AppConfig, gemini: GeminiClient, db: Any) -> threading.Thread:
+    """Prime from the artifact now and every `pathway_warmup_interval` seconds.
+
+    With `pathway_warmup_top_n` > 0 one worker per host (whichever holds the
+    builder lock) also regenerates the top-N from usage and rewrites the
+    artifact; the others, and every worker otherwise, only read it.
+    """
+    builder: Optional[IO[str]] = None
+
+    def run() -> None:
+        nonlocal builder
+        while True:
+            try:
+                prime_from_artifact(gemini, cfg.pathway_warmup_path)
+                if cfg.pathway_warmup_top_n > 0 and gemini.enabled:
+                    if builder is None:
+                        builder = _try_builder_lock(cfg.pathway_warmup_path)
+                    if builder is not None:
+                        build_artifact(gemini, db, cfg.pathway_warmup_top_n, cfg.pathway_warmup_path, cfg.model_name)
+            except Exception:
+                # Warm-up is best effort; requests still generate on a miss
+                pass
+            time.sleep(max(60, cfg.pathway_warmup_interval))
+
+    thread = threading.Thread(target=run, name="pathway-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the pathway warm-up artifact.")
+    cfg = AppConfig.from_env()
+    parser.add_argument("--top", type=int, default=cfg.pathway_warmup_top_n or 40, help="combinations to precompute")
+    parser.add_argument("--output", default=cfg.pathway_warmup_path, help="artifact path")
+    parser.add_argument("--no-usage", action="store_true", help="skip Firestore; use the default combinations")
+    args = parser.parse_args(argv)
+
+    gemini = GeminiClient(cfg)
+    if not gemini.enabled:
+        parser.error("GEMINI_API_KEY is required to build the artifact")
+    db = None
+    if not args.no_usage:
+        from .db import Database
+        db = Database(cfg)
+    result = build_artifact(gemini, db, args.top, args.output, cfg.model_name)
+    print(f"wrote {result['generated']} pathways to {args.output} ({result['failed']} failed)")
+    return 0 if result["generated"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,6 +9,9 @@ export default function Dashboard() {
   const [pathway, setPathway] = useState<any | null>(null)
   const [tips, setTips] = useState<string[]>([])
   const [list, setList] = useState<PathwayMeta[]>([])
+  const [listTotal, setListTotal] = useState(0)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
@@ -23,6 +26,8 @@ export default function Dashboard() {
       setPathway(p.pathway)
       setTips(m.tips || [])
       setList(l.items || [])
+      setListTotal(l.total || 0)
+      setNextCursor(l.nextCursor || null)
       } finally {
         setLoading(false)
       }
@@ -30,6 +35,19 @@ export default function Dashboard() {
     load()
   }, [])
 
+  // /list is paginated; follow nextCursor for older pathways
+  const loadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const { data } = await api.get(`/api/pathway/list?startAfter=${encodeURIComponent(nextCursor)}`)
+      setList((prev) => [...prev, ...(data.items || [])])
+      setNextCursor(data.nextCursor || null)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const totalItems = useMemo(() => {
     const s = pathway?.sections || {}
     const all = [ ...(s.codingProblems||[]), ...(s.youtubeReferences||[]), ...(s.theoryContent||[]) ]
@@ -74,7 +92,7 @@ export default function Dashboard() {
             <div className="metrics">
               <div className="metric"><div className="metric-value">{totalItems}</div><div className="metric-label">Total Items</div></div>
              
-              <div className="metric"><div className="metric-value">{pathway.schedule?.daily?.length||0}</div><div className="metric-label">Days</div></div>
+              <div className="metric"><div className="metric-value">{pathway.dayCount||pathway.schedule?.daily?.length||0}</div><div className="metric-label">Days</div></div>
             </div>
             <div className="row">
               <Link to="/pathway" className="btn">Open Pathway</Link>
@@ -90,7 +108,7 @@ export default function Dashboard() {
         )}
       </div>
       <div className="card">
-        <h2>Your Pathways ({list.length})</h2>
+        <h2>Your Pathways ({Math.max(listTotal, list.length)})</h2>
         {list.length === 0 ? (
           <p className="muted">No pathways yet.</p>
         ) : (
@@ -106,6 +124,11 @@ export default function Dashboard() {
             ))}
           </ul>
         )}
+        {nextCursor && (
+          <button className="btn secondary small" onClick={() => { void loadMore() }} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
         <h3 style={{marginTop:16}}>Motivational Tips</h3>
         <ul>
           {tips.map((tip, i) => <li key={i}>• {tip}</li>)}
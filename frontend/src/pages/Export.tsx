@@ -1,40 +1,43 @@
-import { useEffect, useRef, useState } from 'react'
+import { useState } from 'react'
 import api from '../api/client'
 
-export default function ExportPage() {
-  const [pathway, setPathway] = useState<any | null>(null)
-  const [exporting, setExporting] = useState(false)
-  const ref = useRef<HTMLDivElement>(null)
+type Format = 'pdf' | 'md' | 'csv'
+
+const LABELS: Record<Format, string> = { pdf: 'PDF', md: 'Markdown', csv: 'CSV' }
 
-  useEffect(() => {
-    api.get('/api/pathway/current').then(({ data }) => setPathway(data.pathway)).catch(console.error)
-  }, [])
+export default function ExportPage() {
+  const [exporting, setExporting] = useState<Format | null>(null)
+  const [error, setError] = useState<string | null>(null)
 
-  const exportPDF = async () => {
-    if (!ref.current) return
-    setExporting(true)
+  const download = async (format: Format) => {
+    setExporting(format)
+    setError(null)
     try {
-      const content = ref.current
-      const blob = new Blob([content.innerText], { type: 'text/plain;charset=utf-8' })
-      const url = URL.createObjectURL(blob)
+      // Rendered server-side and streamed; the browser never builds the document
+      const { data } = await api.get(`/api/pathway/current/export`, { params: { format }, responseType: 'blob' })
+      const url = URL.createObjectURL(data)
       const a = document.createElement('a')
       a.href = url
-      a.download = 'plan.txt' // simple fallback; can integrate jsPDF later
+      a.download = `plan.${format}`
       a.click()
       URL.revokeObjectURL(url)
-      alert('Exported (as .txt placeholder). You can integrate jsPDF for PDF rendering.')
+    } catch (e) {
+      console.error(e)
+      setError('Export failed. Please try again.')
     } finally {
-      setExporting(false)
+      setExporting(null)
     }
   }
 
   return (
     <div className="card">
       <h2>Export Plan</h2>
-      <div ref={ref} className="pre">
-        {pathway ? JSON.stringify(pathway, null, 2) : 'Loading...'}
-      </div>
-      <button className="btn" onClick={exportPDF} disabled={exporting}>{exporting ? 'Exporting...' : 'Export as PDF'}</button>
+      {error && <p className="error">{error}</p>}
+      {(Object.keys(LABELS) as Format[]).map((format) => (
+        <button key={format} className="btn" onClick={() => download(format)} disabled={exporting !== null}>
+          {exporting === format ? 'Exporting...' : `Export as ${LABELS[format]}`}
+        </button>
+      ))}
     </div>
   )
-}
\ No newline at end of file
+}
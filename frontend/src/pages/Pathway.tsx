@@ -10,6 +10,7 @@ export default function Pathway() {
   const [pathway, setPathway] = useState<any | null>(null)
   const [loading, setLoading] = useState(true)
   const [exporting, setExporting] = useState(false)
+  const [loadingDays, setLoadingDays] = useState(false)
   const ref = useRef<HTMLDivElement>(null)
 
   const load = async () => {
@@ -24,6 +25,32 @@ export default function Pathway() {
 
   useEffect(() => { load().catch(console.error) }, [])
 
+  // Progressive pathways arrive with the first week; fetch the next missing week on request
+  const loadMoreDays = async () => {
+    const daily: any[] = pathway?.schedule?.daily || []
+    const have = new Set(daily.map((d: any) => d.day))
+    let from = 1
+    while (have.has(from)) from++
+    setLoadingDays(true)
+    try {
+      const to = Math.min(from + 6, pathway.dayCount || from)
+      const fetchDays = () => api.get(`/api/pathway/current/days?from=${from}&to=${to}`)
+      let response = await fetchDays()
+      // The background fill owns these days; wait for it instead of generating them twice
+      for (let attempt = 0; attempt < 12 && response.data.job && !(response.data.days || []).length; attempt++) {
+        const wait = Number(response.headers['retry-after']) || 5
+        await new Promise((resolve) => setTimeout(resolve, wait * 1000))
+        response = await fetchDays()
+      }
+      const data = response.data
+      const merged = [...daily, ...(data.days || []).filter((d: any) => !have.has(d.day))]
+      merged.sort((a: any, b: any) => a.day - b.day)
+      setPathway({ ...pathway, schedule: { ...pathway.schedule, daily: merged } })
+    } finally {
+      setLoadingDays(false)
+    }
+  }
+
   const toggleItem = async (item: SectionItem) => {
     try {
       await api.patch('/api/pathway/progress', { itemId: item.id })
@@ -76,6 +103,8 @@ export default function Pathway() {
   const coding: SectionItem[] = sections.codingProblems || []
   const youtube: SectionItem[] = sections.youtubeReferences || []
   const theory: SectionItem[] = sections.theoryContent || []
+  const loadedDays: number = pathway.schedule?.daily?.length || 0
+  const totalDays: number = pathway.dayCount || loadedDays
 
   return (
     <div className="layout-2">
@@ -128,6 +157,11 @@ export default function Pathway() {
             </div>
           ))}
         </div>
+        {totalDays > loadedDays && (
+          <button className="btn" onClick={() => loadMoreDays().catch(console.error)} disabled={loadingDays} style={{marginTop:12}}>
+            {loadingDays ? 'Loading...' : `Load more days (${loadedDays}/${totalDays})`}
+          </button>
+        )}
 
         <div className="sections">
         </div>
@@ -64,7 +64,10 @@ export default function Questionnaire() {
         programmingLanguage: language,
         prepTime: duration,
       }
-      await api.post('/api/pathway/generate', payload)
+      // Long plans are progressive: the first week comes back at once, the rest is filled in
+      // afterwards. A one-week plan is a single model call either way.
+      const progressive = duration !== '1 week'
+      await api.post(`/api/pathway/generate${progressive ? '?progressive=1' : ''}`, payload)
       navigate('/pathway')
     } catch (err: any) {
       setError(err?.response?.data?.error || 'Failed to generate pathway')